@@ -0,0 +1,413 @@
+import asyncio
+import fcntl
+import json
+import logging
+import math
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from telegram.helpers import escape_markdown
+
+from config import ALERT_SETTINGS, CHART_SETTINGS, TIMEFRAMES
+from data_fetcher import resolver, fetch_token_data
+from indicators import get_latest_signals
+from request_scheduler import priority, PRIORITY_BACKGROUND
+from streaming_indicators import IndicatorState
+from support_resistance import LevelTracker
+from timeframes import candle_seconds
+
+ALERT_CONDITIONS = ("rsi", "macd", "levels")
+
+RSI_OVERBOUGHT = 70
+RSI_OVERSOLD = 30
+
+# (token_address, timeframe)
+WatchKey = Tuple[str, str]
+
+# Sends a Markdown message to a chat
+Notifier = Callable[[int, str], Awaitable[None]]
+
+@dataclass
+class AlertEvent:
+    condition: str
+    message: str
+
+@dataclass
+class Watch:
+    """
+    One watched token and timeframe, shared by every chat subscribed to it.
+
+    The candles are fetched once per check and the indicator state is
+    advanced once per closed candle, however many chats are subscribed.
+    """
+    token_address: str
+    timeframe: str
+    subscribers: Dict[int, Set[str]] = field(default_factory=dict)  # chat_id -> conditions
+    state: Optional[IndicatorState] = None
+    levels: Optional[LevelTracker] = None
+    symbol: str = ""
+    next_check: float = 0.0
+    retries: int = 0
+
+    @property
+    def key(self) -> WatchKey:
+        return (self.token_address, self.timeframe)
+
+    @property
+    def interval(self) -> int:
+        settings = TIMEFRAMES[self.timeframe]
+        return candle_seconds(settings["endpoint"], settings.get("aggregate", 1))
+
+    def next_close(self, now: float) -> float:
+        """Time at which the currently forming candle closes, plus the ingestion grace period."""
+        return (math.floor(now / self.interval) + 1) * self.interval + ALERT_SETTINGS["close_grace"]
+
+def detect_alert_events(previous: Dict[str, float], latest: Dict[str, float],
+                        support_levels: List[float], resistance_levels: List[float]) -> List[AlertEvent]:
+    """
+    Compare indicator values of two consecutive closed candles.
+
+    Args:
+        previous: Latest values before the candle (see IndicatorState.latest())
+        latest: Latest values after the candle
+        support_levels: Support price levels
+        resistance_levels: Resistance price levels
+
+    Returns:
+        Events for RSI crossing 30/70, MACD crossovers and price crossing a level
+    """
+    events = []
+
+    prev_rsi, rsi = previous['rsi'], latest['rsi']
+    if not (math.isnan(prev_rsi) or math.isnan(rsi)):
+        if prev_rsi < RSI_OVERBOUGHT <= rsi:
+            events.append(AlertEvent("rsi", f"RSI crossed above {RSI_OVERBOUGHT} ({rsi:.1f}, overbought)"))
+        elif prev_rsi >= RSI_OVERBOUGHT > rsi:
+            events.append(AlertEvent("rsi", f"RSI fell back below {RSI_OVERBOUGHT} ({rsi:.1f})"))
+        if prev_rsi > RSI_OVERSOLD >= rsi:
+            events.append(AlertEvent("rsi", f"RSI crossed below {RSI_OVERSOLD} ({rsi:.1f}, oversold)"))
+        elif prev_rsi <= RSI_OVERSOLD < rsi:
+            events.append(AlertEvent("rsi", f"RSI recovered above {RSI_OVERSOLD} ({rsi:.1f})"))
+
+    # Same classification as the chart caption
+    macd = get_latest_signals(latest)['MACD']
+    if 'Crossover' in macd:
+        events.append(AlertEvent("macd", f"MACD {macd}"))
+
+    prev_close, close = previous['close'], latest['close']
+    if not math.isnan(prev_close):
+        for kind, levels in (("support", support_levels), ("resistance", resistance_levels)):
+            for level in levels:
+                if prev_close < level <= close:
+                    events.append(AlertEvent("levels", f"Price crossed above {kind} {level:.6g} ({close:.6g})"))
+                elif prev_close > level >= close:
+                    events.append(AlertEvent("levels", f"Price crossed below {kind} {level:.6g} ({close:.6g})"))
+
+    return events
+
+class AlertEngine:
+    """
+    Background checker for alert subscriptions.
+
+    Watches wake up when their candle closes. Every watch due at the same
+    time is checked in one batch: candles are fetched concurrently (bounded
+    by `max_concurrency`, at background priority so interactive /chart
+    requests go first), each watch's indicator state advances by its newly
+    closed candles in O(1) per candle, and the resulting events go to every
+    subscriber of that watch. Notification latency is therefore bounded by
+    the candle close plus one fetch, not by the number of subscribers.
+
+    Subscriptions are persisted to a JSON file; indicator state is rebuilt
+    from candle history on the first check after a restart. Several
+    processes (webhook workers) may share the file: changes are made under
+    a file lock on the latest saved subscriptions, and the process running
+    the checker picks up other processes' changes within `reload_interval`.
+    """
+
+    def __init__(self, path: str = ALERT_SETTINGS["path"]):
+        self.path = path
+        self.watches: Dict[WatchKey, Watch] = {}
+        self._notify: Optional[Notifier] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._mtime: Optional[float] = None
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self):
+        """Replace the subscriptions with the saved ones, keeping the state of unchanged watches."""
+        mtime = self._file_mtime()
+        entries = []
+        if mtime is not None:
+            try:
+                with open(self.path) as f:
+                    entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.error(f"Could not load alert subscriptions from {self.path}: {e}")
+                return
+        self._mtime = mtime
+
+        subscribers: Dict[WatchKey, Dict[int, Set[str]]] = {}
+        for entry in entries:
+            if entry["timeframe"] in TIMEFRAMES:
+                key = (entry["token_address"], entry["timeframe"])
+                subscribers.setdefault(key, {}).setdefault(entry["chat_id"], set()).update(entry["conditions"])
+        for key in list(self.watches):
+            if key not in subscribers:
+                del self.watches[key]
+        for key, chats in subscribers.items():
+            watch = self.watches.get(key)
+            if watch is None:
+                watch = self.watches[key] = Watch(*key)
+            watch.subscribers = chats
+
+    def _reload_if_changed(self) -> bool:
+        """Load the subscriptions again if another process saved them. Returns True if reloaded."""
+        if self._file_mtime() == self._mtime:
+            return False
+        self._load()
+        return True
+
+    @contextmanager
+    def _locked(self):
+        """Hold the store's file lock and work on the latest saved subscriptions."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self.path}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self._reload_if_changed()
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _save(self):
+        entries = [
+            {"chat_id": chat_id, "token_address": watch.token_address,
+             "timeframe": watch.timeframe, "conditions": sorted(conditions)}
+            for watch in self.watches.values()
+            for chat_id, conditions in watch.subscribers.items()
+        ]
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
+        self._mtime = self._file_mtime()
+
+    def _add(self, chat_id: int, token_address: str, timeframe: str, conditions) -> Watch:
+        key = (token_address, timeframe)
+        watch = self.watches.get(key)
+        if watch is None:
+            watch = self.watches[key] = Watch(token_address, timeframe)
+        watch.subscribers.setdefault(chat_id, set()).update(conditions)
+        return watch
+
+    def subscribe(self, chat_id: int, token_address: str, timeframe: str,
+                  conditions: Optional[List[str]] = None, symbol: str = "") -> Watch:
+        """
+        Subscribe a chat to alerts for a token and timeframe.
+
+        Args:
+            chat_id: Telegram chat to notify
+            token_address: Token address
+            timeframe: Timeframe key from TIMEFRAMES
+            conditions: Any of ALERT_CONDITIONS (default: all)
+            symbol: Token symbol for notifications (optional)
+
+        Returns:
+            The watch the chat was added to
+
+        Raises:
+            ValueError: If the chat already has the maximum number of alerts
+        """
+        with self._locked():
+            existing = self.watches.get((token_address, timeframe))
+            is_new = existing is None or chat_id not in existing.subscribers
+            if is_new and len(self.subscriptions(chat_id)) >= ALERT_SETTINGS["max_per_chat"]:
+                raise ValueError(f"At most {ALERT_SETTINGS['max_per_chat']} alerts per chat")
+            watch = self._add(chat_id, token_address, timeframe, conditions or ALERT_CONDITIONS)
+            if symbol:
+                watch.symbol = symbol
+            self._save()
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return watch
+
+    def unsubscribe(self, chat_id: int, token_address: Optional[str] = None,
+                    timeframe: Optional[str] = None) -> int:
+        """
+        Remove a chat's alerts, optionally only for one token and/or timeframe.
+
+        Returns:
+            Number of subscriptions removed
+        """
+        removed = 0
+        with self._locked():
+            for key, watch in list(self.watches.items()):
+                if token_address is not None and watch.token_address != token_address:
+                    continue
+                if timeframe is not None and watch.timeframe != timeframe:
+                    continue
+                if watch.subscribers.pop(chat_id, None) is not None:
+                    removed += 1
+                if not watch.subscribers:
+                    del self.watches[key]
+            if removed:
+                self._save()
+        return removed
+
+    def subscriptions(self, chat_id: int) -> List[Tuple[Watch, Set[str]]]:
+        """List a chat's subscriptions as (watch, conditions) pairs."""
+        self._reload_if_changed()
+        return [(watch, watch.subscribers[chat_id]) for watch in self.watches.values()
+                if chat_id in watch.subscribers]
+
+    async def check(self, watch: Watch, now: Optional[float] = None) -> List[AlertEvent]:
+        """
+        Fetch a watch's candles and advance its state by any newly closed candles.
+
+        The first check only builds the indicator state and levels; events
+        are reported from the next closed candle on.
+
+        Returns:
+            Events triggered by the new candles
+        """
+        now = time.time() if now is None else now
+        context = await resolver.resolve(watch.token_address)
+        if not context.exists or not context.pools:
+            logging.warning(f"Alert watch {watch.key}: token or pools not found")
+            return []
+        watch.symbol = context.symbol
+
+        df, _ = await fetch_token_data(context, watch.timeframe)
+        if df is None or df.empty:
+            return []
+
+        # The last candle may still be forming
+        timestamps = df.index.values.astype('datetime64[s]').astype('int64')
+        closed = df[timestamps + watch.interval <= now]
+        if closed.empty:
+            return []
+        closed_ts = timestamps[:len(closed)]
+
+        if watch.state is None:
+            watch.state = IndicatorState.from_frame(closed)
+            watch.levels = LevelTracker.from_frame(
+                closed.iloc[-CHART_SETTINGS["window_size"]:],
+                window=CHART_SETTINGS["support_resistance_window"],
+                threshold=CHART_SETTINGS["support_resistance_threshold"],
+                capacity=CHART_SETTINGS["window_size"]
+            )
+            return []
+
+        events = []
+        new = closed[closed_ts > watch.state.last_timestamp]
+        for ts, row in zip(closed_ts[closed_ts > watch.state.last_timestamp], new.itertuples()):
+            # Levels from before this candle, which it may have crossed
+            support_levels, resistance_levels = watch.levels.levels()
+            previous = watch.state.latest()
+            latest = watch.state.update(row.close, timestamp=int(ts))
+            watch.levels.update(row.high, row.low, row.volume, timestamp=int(ts))
+            events.extend(detect_alert_events(previous, latest,
+                                              [level.price for level in support_levels],
+                                              [level.price for level in resistance_levels]))
+        return events
+
+    def _expects_new_candle(self, watch: Watch, now: float) -> bool:
+        """Whether a candle has closed since the last one the state has seen."""
+        if watch.state is None or watch.state.last_timestamp is None:
+            return False
+        last_closed_open = (math.floor(now / watch.interval) - 1) * watch.interval
+        return watch.state.last_timestamp < last_closed_open
+
+    async def _notify_subscribers(self, watch: Watch, events: List[AlertEvent]):
+        name = escape_markdown(watch.symbol or f"{watch.token_address[:8]}...")
+        timeframe_name = TIMEFRAMES[watch.timeframe]["name"]
+        for chat_id, conditions in list(watch.subscribers.items()):
+            lines = [event.message for event in events if event.condition in conditions]
+            if not lines:
+                continue
+            # Markdown can't escape inside an entity, so the name stays outside the bold span
+            text = f"🔔 {name} *({timeframe_name})*\n" + "\n".join(f"• {line}" for line in lines)
+            try:
+                await self._notify(chat_id, text)
+            except Exception as e:
+                logging.error(f"Failed to send alert to chat {chat_id}: {e}")
+
+    async def run_batch(self, watches: List[Watch]):
+        """Check a batch of due watches concurrently and send their notifications."""
+        semaphore = asyncio.Semaphore(ALERT_SETTINGS["max_concurrency"])
+
+        async def run(watch: Watch):
+            async with semaphore:
+                now = time.time()
+                try:
+                    events = await self.check(watch, now)
+                except Exception as e:
+                    logging.error(f"Alert check failed for {watch.key}: {e}")
+                    events = []
+                if self._expects_new_candle(watch, now) and watch.retries < ALERT_SETTINGS["max_retries"]:
+                    # The closed candle hasn't reached the API yet (or the pool had no trades)
+                    watch.retries += 1
+                    watch.next_check = now + ALERT_SETTINGS["retry_interval"]
+                else:
+                    watch.retries = 0
+                    watch.next_check = watch.next_close(now)
+            if events and self._notify is not None:
+                await self._notify_subscribers(watch, events)
+
+        with priority(PRIORITY_BACKGROUND):
+            await asyncio.gather(*(run(watch) for watch in watches))
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            self._reload_if_changed()
+            now = time.time()
+            due = [watch for watch in self.watches.values() if watch.next_check <= now]
+            if due:
+                logging.info(f"Checking {len(due)} alert watches")
+                await self.run_batch(due)
+                continue
+
+            # Wake up periodically to pick up subscriptions made by other processes
+            next_check = min((watch.next_check for watch in self.watches.values()), default=math.inf)
+            timeout = max(min(next_check - now, ALERT_SETTINGS["reload_interval"]), 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self, notify: Notifier, run_checks: bool = True):
+        """
+        Load saved subscriptions and start the background checker, sending alerts through `notify`.
+
+        With `run_checks=False` only the subscriptions are loaded, for
+        processes that manage subscriptions while another process checks them.
+        """
+        self._load()
+        if not run_checks:
+            return
+        self._notify = notify
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop the background checker."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+alert_engine = AlertEngine()
@@ -0,0 +1,119 @@
+"""
+Measure composite candles: the cost of merging pools and of fetching them.
+
+First times `merge_ohlcv` on synthetic pools with missing candles, for a
+few pool counts and history sizes. Then fetches cold tokens against the
+GeckoTerminal stub once from the best single pool and once as a composite
+of the top pools, to show that the pools are fetched in parallel and the
+merge adds little on top.
+
+Usage:
+    python -m benchmarks.bench_composite [--tokens 20] [--latency-ms 50] [--weighting liquidity|volume]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.stub_server import StubGeckoServer
+from benchmarks.synthetic import make_candles
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "n": len(samples),
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p90_ms": round(ordered[int(0.9 * (len(ordered) - 1))] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+def bench_merge(pools: int, candles: int, repeats: int, volume_weighted: bool) -> Dict[str, float]:
+    from timeframes import merge_ohlcv
+
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(pools):
+        frame = make_candles(candles, seed=i)
+        # Thinner pools miss more candles (no trades in that interval)
+        keep = rng.random(candles) >= 0.1 * i
+        frames.append(frame[keep])
+    weights = [1_000_000 / (i + 1) for i in range(pools)]
+
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        merge_ohlcv(frames, weights, volume_weighted=volume_weighted)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+async def run_tokens(prefix: str, count: int, composite: bool) -> List[float]:
+    from config import COMPOSITE_SETTINGS
+    from data_fetcher import resolver, fetch_token_data
+
+    COMPOSITE_SETTINGS["enabled"] = composite
+    latencies = []
+    for i in range(count):
+        context = await resolver.resolve(f"{prefix}{i:04d}".ljust(44, "1"))
+        started = time.perf_counter()
+        df, pool = await fetch_token_data(context, "1h")
+        latencies.append(time.perf_counter() - started)
+        if df is None:
+            print(f"Token {i} failed", flush=True)
+        elif composite and not pool["id"].startswith("composite"):
+            print(f"Token {i} fell back to a single pool", flush=True)
+    return latencies
+
+async def main_async(args) -> dict:
+    from http_client import close_client
+    from request_scheduler import scheduler
+
+    try:
+        return {
+            "single_pool": summarize(await run_tokens("SingleBench", args.tokens, composite=False)),
+            "composite": summarize(await run_tokens("CompositeBench", args.tokens, composite=True)),
+        }
+    finally:
+        await scheduler.close()
+        await close_client()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=20, help="Cold tokens per mode")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Stub latency per API response")
+    parser.add_argument("--repeats", type=int, default=200, help="Merges timed per size")
+    parser.add_argument("--weighting", choices=("liquidity", "volume"), default="liquidity")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    stub = StubGeckoServer(latency_ms=args.latency_ms)
+    url = stub.start()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.environ.update(
+            TELEGRAM_TOKEN=os.environ.get("TELEGRAM_TOKEN", "123456:benchmark"),
+            GECKO_API_BASE=url,
+            API_CALLS_PER_MINUTE="1000000",
+            API_BURST="100000",
+            CANDLE_STORE_PATH=os.path.join(data_dir, "candles.sqlite3"),
+            COMPOSITE_WEIGHTING=args.weighting,
+        )
+        result = {"weighting": args.weighting, "merge": {}}
+        for pools, candles in ((3, 300), (5, 1000), (10, 1000)):
+            result["merge"][f"{pools}x{candles}"] = bench_merge(pools, candles, args.repeats,
+                                                               args.weighting == "volume")
+        try:
+            result["fetch"] = asyncio.run(main_async(args))
+        finally:
+            stub.stop()
+
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Offline end-to-end /chart benchmark against a local stub of the GeckoTerminal API.
+
+Times each stage of a chart request separately and the whole request end to
+end, and writes the results as JSON so runs can be compared across commits.
+No network access is needed: API responses are replayed from
+benchmarks/fixtures/ (see benchmarks.record_fixtures).
+
+Usage:
+    python -m benchmarks.bench_e2e [--iterations 10] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.stub_server import StubGeckoServer
+
+TIMEFRAME = "1h"
+
+class StageTimer:
+    """Collects wall-clock samples per named stage."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.sizes: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float):
+        self.samples.setdefault(stage, []).append(seconds * 1000)
+
+    def measure(self, stage: str, func, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.add(stage, time.perf_counter() - start)
+        return result
+
+    async def measure_async(self, stage: str, coro):
+        start = time.perf_counter()
+        result = await coro
+        self.add(stage, time.perf_counter() - start)
+        return result
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for stage, samples in self.samples.items():
+            ordered = sorted(samples)
+            result[stage] = {
+                "n": len(samples),
+                "mean_ms": round(statistics.mean(samples), 3),
+                "p50_ms": round(statistics.median(samples), 3),
+                "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 3),
+                "min_ms": round(ordered[0], 3),
+                "max_ms": round(ordered[-1], 3),
+            }
+        return result
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run_benchmark(iterations: int, timer: StageTimer):
+    # Imported after the environment points the bot at the stub server
+    import matplotlib
+    matplotlib.use("Agg")
+
+    from config import TIMEFRAMES, CHART_SETTINGS
+    from data_fetcher import (
+        check_token_exists, get_top_pools_for_token, fetch_pool_ohlcv_data, get_pool_address,
+        get_token_chart_data,
+    )
+    from indicators import add_indicators
+    from support_resistance import detect_support_resistance
+    from charting import generate_token_chart, render_token_chart, prepare_chart_data, chart_title
+    from renderer import get_template, encode_png
+    from render_pool import start_render_pool, shutdown_render_pool
+    from ohlcv_cache import ohlcv_cache
+    from request_scheduler import scheduler
+    from http_client import close_client
+    from candle_store import candle_store
+
+    endpoint = TIMEFRAMES[TIMEFRAME]["endpoint"]
+    aggregate = TIMEFRAMES[TIMEFRAME].get("aggregate", 1)
+    await start_render_pool()
+
+    # Warm-up run so imports, fonts, the chart template and the connection pool are ready
+    await get_token_chart_data("WarmupToken111111111111111111111111111111", TIMEFRAME)
+    render_token_chart(await fetch_pool_ohlcv_data(
+        "solana", "WarmupPool", endpoint, aggregate=aggregate), "Warmup", TIMEFRAME)
+
+    try:
+        for i in range(iterations):
+            # Fresh token and pool addresses per iteration, so API, cache and store stages run cold
+            token = f"BenchToken{i:04d}{int(time.time() * 1000) % 10 ** 8:08d}".ljust(44, "1")
+
+            await timer.measure_async("check_token_exists", check_token_exists(token))
+            pools = await timer.measure_async("get_top_pools_for_token", get_top_pools_for_token(token))
+            pool_address = get_pool_address(pools[0])
+
+            df = await timer.measure_async("fetch_pool_ohlcv_data_cold", fetch_pool_ohlcv_data(
+                "solana", pool_address, endpoint, aggregate=aggregate))
+            ohlcv_cache.discard(("solana", pool_address, endpoint, aggregate))
+            await timer.measure_async("fetch_pool_ohlcv_data_store", fetch_pool_ohlcv_data(
+                "solana", pool_address, endpoint, aggregate=aggregate))
+            await timer.measure_async("fetch_pool_ohlcv_data_cached", fetch_pool_ohlcv_data(
+                "solana", pool_address, endpoint, aggregate=aggregate))
+
+            with_indicators = timer.measure("add_indicators", add_indicators, df)
+            window = with_indicators.iloc[-CHART_SETTINGS["window_size"]:]
+            timer.measure("detect_support_resistance", detect_support_resistance, window)
+            timer.measure("prepare_chart_data", prepare_chart_data, df)
+
+            timer.measure("generate_token_chart", generate_token_chart, df, token, TIMEFRAME, "BENCH / SOL")
+            timer.measure("render_token_chart", render_token_chart, df, token, TIMEFRAME, "BENCH / SOL")
+
+            # Rasterizing and PNG encoding alone, on a fully set up fast-renderer figure
+            window_df, support, resistance, patterns, _ = prepare_chart_data(df)
+            template = get_template()
+            template._draw(window_df, chart_title(token, TIMEFRAME), support, resistance, patterns)
+            try:
+                image = timer.measure("png_encode", encode_png, template.figure)
+                timer.sizes["png_kb"] = round(len(image) / 1024, 1)
+            finally:
+                template._clear()
+
+            # Whole /chart pipeline minus Telegram: cold (new token), then fully cached
+            cold_token = token[:-1] + "2"
+            await timer.measure_async("e2e_cold", get_token_chart_data(cold_token, TIMEFRAME))
+            await timer.measure_async("e2e_cached", get_token_chart_data(cold_token, TIMEFRAME))
+    finally:
+        await ohlcv_cache.close()
+        await scheduler.close()
+        await close_client()
+        await shutdown_render_pool()
+        candle_store.close()
+
+def compare(current: Dict, baseline: Dict):
+    """Print per-stage p50 changes against a baseline result file."""
+    print(f"{'stage':<30} {'base p50':>10} {'p50':>10} {'change':>8}", file=sys.stderr)
+    for stage, stats in current["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if base is None:
+            print(f"{stage:<30} {'-':>10} {stats['p50_ms']:>10.2f}", file=sys.stderr)
+            continue
+        change = (stats["p50_ms"] / base["p50_ms"] - 1) * 100 if base["p50_ms"] else 0.0
+        print(f"{stage:<30} {base['p50_ms']:>10.2f} {stats['p50_ms']:>10.2f} {change:>+7.1f}%", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--api-latency-ms", type=float, default=0.0,
+                        help="Artificial delay per stub API response")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    stub = StubGeckoServer(latency_ms=args.api_latency_ms)
+    base_url = stub.start()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.environ.setdefault("TELEGRAM_TOKEN", "benchmark")
+        os.environ["GECKO_API_BASE"] = base_url
+        os.environ["API_CALLS_PER_MINUTE"] = "1000000"
+        os.environ["API_BURST"] = "100000"
+        os.environ["CANDLE_STORE_PATH"] = os.path.join(data_dir, "candles.sqlite3")
+
+        timer = StageTimer()
+        try:
+            asyncio.run(run_benchmark(args.iterations, timer))
+        finally:
+            stub.stop()
+
+    from config import CHART_SETTINGS
+    result = {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "timeframe": TIMEFRAME,
+        "history_size": CHART_SETTINGS["history_size"],
+        "window_size": CHART_SETTINGS["window_size"],
+        "renderer": CHART_SETTINGS["renderer"],
+        "api_latency_ms": args.api_latency_ms,
+        "api_requests": stub.requests,
+        "stages": timer.summary(),
+        "sizes": timer.sizes,
+    }
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(result, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Measure OHLCV pool fallback against flaky primary pools.
+
+Runs `fetch_token_data` for cold tokens against the GeckoTerminal stub
+while the best-ranked pool of every token misbehaves, once with hedging
+and once without, and reports the latency distribution of each. A second
+scenario fetches one token repeatedly while its primary pool returns too
+few candles and reports how many of those fetches skipped that pool
+because its circuit breaker had opened.
+
+Usage:
+    python -m benchmarks.bench_fallback [--tokens 30] [--fault slow|error] [--probability 0.3]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.stub_server import StubGeckoServer
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "n": len(samples),
+        "p50_ms": round(statistics.median(samples) * 1000, 1),
+        "p90_ms": round(ordered[int(0.9 * (len(ordered) - 1))] * 1000, 1),
+        "p99_ms": round(ordered[int(0.99 * (len(ordered) - 1))] * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+async def run_tokens(prefix: str, count: int, hedge: bool) -> List[float]:
+    from config import POOL_FALLBACK_SETTINGS
+    from data_fetcher import resolver, fetch_token_data
+
+    POOL_FALLBACK_SETTINGS["hedge"] = hedge
+    latencies = []
+    for i in range(count):
+        context = await resolver.resolve(f"{prefix}{i:04d}".ljust(44, "1"))
+        started = time.perf_counter()
+        df, _ = await fetch_token_data(context, "1h")
+        latencies.append(time.perf_counter() - started)
+        if df is None:
+            print(f"Token {i} failed", flush=True)
+    return latencies
+
+async def run_breaker(stub: StubGeckoServer, repeats: int) -> Dict[str, int]:
+    from data_fetcher import resolver, fetch_token_data, get_pool_address
+    from ohlcv_cache import ohlcv_cache
+    from pool_health import pool_breakers
+
+    token = "BreakerBench".ljust(44, "1")
+    context = await resolver.resolve(token)
+    primary = get_pool_address(context.pools[0])
+    skipped = pool_breakers.skipped
+    served_by_primary = 0
+    for _ in range(repeats):
+        # Start from a fresh context (as after TOKEN_CONTEXT_TTL) with expired frames,
+        # so every round starts at the primary pool unless its breaker is open
+        resolver.invalidate(token)
+        context = await resolver.resolve(token)
+        for pool in context.pools:
+            ohlcv_cache.discard(("solana", get_pool_address(pool), "hour", 1))
+        _, pool = await fetch_token_data(context, "1h")
+        served_by_primary += get_pool_address(pool) == primary
+    return {"rounds": repeats, "primary_skipped": pool_breakers.skipped - skipped,
+            "primary_api_requests": stub.pool_requests[primary], "served_by_primary": served_by_primary,
+            "primary_breaker": pool_breakers.state((primary, "1h"))}
+
+async def main_async(args, stub: StubGeckoServer) -> dict:
+    from http_client import close_client
+    from request_scheduler import scheduler
+
+    result = {"fault": args.fault, "probability": args.probability}
+    try:
+        result["sequential"] = summarize(await run_tokens("SeqBench", args.tokens, hedge=False))
+        result["hedged"] = summarize(await run_tokens("HedgeBench", args.tokens, hedge=True))
+
+        stub.set_pool_fault("P0", rows=3)
+        result["breaker"] = await run_breaker(stub, args.breaker_rounds)
+    finally:
+        await scheduler.close()
+        await close_client()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=30, help="Cold tokens per mode")
+    parser.add_argument("--fault", choices=("slow", "error"), default="slow")
+    parser.add_argument("--probability", type=float, default=0.3, help="Share of primary pool requests affected")
+    parser.add_argument("--slow-ms", type=float, default=3000.0)
+    parser.add_argument("--breaker-rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    stub = StubGeckoServer(latency_ms=20)
+    url = stub.start()
+    if args.fault == "slow":
+        stub.set_pool_fault("P0", args.probability, latency_ms=args.slow_ms)
+    else:
+        stub.set_pool_fault("P0", args.probability, status=500)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.environ.update(
+            TELEGRAM_TOKEN=os.environ.get("TELEGRAM_TOKEN", "123456:benchmark"),
+            GECKO_API_BASE=url,
+            API_CALLS_PER_MINUTE="1000000",
+            API_BURST="100000",
+            CANDLE_STORE_PATH=os.path.join(data_dir, "candles.sqlite3"),
+        )
+        try:
+            result = asyncio.run(main_async(args, stub))
+        finally:
+            stub.stop()
+
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Measure chart-pattern detection time on large candle windows against the per-chart budget.
+
+Usage:
+    python -m benchmarks.bench_patterns [--iterations 200] [--candles 1000] [--budget-ms 10]
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from benchmarks.synthetic import make_candles
+from patterns import detect_patterns
+from support_resistance import detect_levels, find_pivots
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--candles", type=int, default=1000)
+    parser.add_argument("--seeds", type=int, default=5, help="Different random series to cycle through")
+    parser.add_argument("--budget-ms", type=float, default=10.0,
+                        help="Pattern + level detection budget per chart (p95)")
+    args = parser.parse_args()
+
+    frames = [make_candles(args.candles, seed=seed) for seed in range(args.seeds)]
+    arrays = [(df, df['high'].to_numpy(), df['low'].to_numpy()) for df in frames]
+
+    samples, found = [], 0
+    for i in range(args.iterations):
+        df, highs, lows = arrays[i % len(arrays)]
+        start = time.perf_counter()
+        pivots = find_pivots(highs, lows)
+        detect_levels(df, pivots=pivots)
+        patterns = detect_patterns(highs, lows, pivots=pivots)
+        samples.append((time.perf_counter() - start) * 1000)
+        found += len(patterns)
+
+    p95 = sorted(samples)[int(0.95 * (len(samples) - 1))]
+    print(f"{args.candles} candles: mean {statistics.mean(samples):.2f} ms, "
+          f"p50 {statistics.median(samples):.2f} ms, p95 {p95:.2f} ms, "
+          f"{found / args.iterations:.1f} patterns per window")
+    if p95 > args.budget_ms:
+        print(f"FAIL: p95 exceeds the {args.budget_ms:.1f} ms budget")
+        sys.exit(1)
+    print(f"OK: within the {args.budget_ms:.1f} ms budget")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Compare per-chart render time of the mplfinance path and the fast template renderer.
+
+Usage:
+    python -m benchmarks.bench_render [--iterations 20] [--candles 300]
+"""
+import argparse
+import os
+import statistics
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+
+os.environ.setdefault("TELEGRAM_TOKEN", "benchmark")
+
+from benchmarks.synthetic import make_candles
+from charting import generate_token_chart, render_token_chart
+
+def time_renderer(render, df, iterations: int):
+    # One untimed run so imports, fonts and the template are warm
+    render(df, "BenchmarkToken1111111111111111111111111111", "1h", pool_name="BENCH / SOL")
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        image, _ = render(df, "BenchmarkToken1111111111111111111111111111", "1h", pool_name="BENCH / SOL")
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, len(image)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--candles", type=int, default=300)
+    args = parser.parse_args()
+
+    df = make_candles(args.candles)
+    print(f"{'renderer':<12} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'png KB':>8}")
+    for name, render in (("mplfinance", generate_token_chart), ("fast", render_token_chart)):
+        samples, size = time_renderer(render, df, args.iterations)
+        p95 = sorted(samples)[int(0.95 * (len(samples) - 1))]
+        print(f"{name:<12} {statistics.mean(samples):>9.1f} {statistics.median(samples):>9.1f} "
+              f"{p95:>9.1f} {size / 1024:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Measure how long a fresh process takes to import the bot.
+
+Imports `bot` in new interpreter processes (so nothing is cached in
+memory), reports the median and worst import time, lists the slowest
+modules from `python -X importtime`, and checks that the modules the bot
+defers (matplotlib, mplfinance, scipy) were not loaded. Exits with status 1
+if the median exceeds the budget or a deferred module was imported.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 7] [--budget-ms 1000] [--top 15]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFERRED = ("matplotlib", "mplfinance", "scipy")
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import bot
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "loaded": sorted(name for name in %r if name in sys.modules)}))
+""" % (DEFERRED,)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _env() -> Dict[str, str]:
+    return dict(os.environ, TELEGRAM_TOKEN=os.environ.get("TELEGRAM_TOKEN", "123456:benchmark"))
+
+def measure_import() -> dict:
+    """Import the bot once in a fresh interpreter."""
+    output = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=_env(),
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def slowest_modules(top: int) -> List[Tuple[str, float]]:
+    """Cumulative import time (ms) of the slowest top-level dependencies of `bot`, from -X importtime."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import bot"], cwd=ROOT, env=_env(),
+                            capture_output=True, text=True, check=True).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            # Keep modules imported directly by bot or its first-level imports
+            depth = (len(name) - len(name.lstrip())) // 2
+            if depth <= 2:
+                modules.append((name.strip(), int(cumulative) / 1000))
+    return sorted(modules, key=lambda item: item[1], reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7, help="Fresh processes to time")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1000")))
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    runs = [measure_import() for _ in range(args.runs)]
+    samples = [run["seconds"] * 1000 for run in runs]
+    loaded = sorted({name for run in runs for name in run["loaded"]})
+    result = {
+        "runs": args.runs,
+        "median_ms": round(statistics.median(samples), 1),
+        "max_ms": round(max(samples), 1),
+        "budget_ms": args.budget_ms,
+        "deferred_modules_loaded": loaded,
+        "slowest_modules_ms": {name: round(ms, 1) for name, ms in slowest_modules(args.top)},
+    }
+    print(json.dumps(result, indent=2))
+
+    if result["median_ms"] > args.budget_ms or loaded:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
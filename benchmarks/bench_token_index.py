@@ -0,0 +1,126 @@
+"""
+Measure the local token metadata index.
+
+Indexes a synthetic token list of the given size from a local file, times
+lookups of listed and unlisted addresses, and resolves cold tokens against
+the GeckoTerminal stub with and without the index to show the API requests
+and latency saved by skipping the existence check for listed tokens.
+
+Usage:
+    python -m benchmarks.bench_token_index [--size 100000] [--tokens 20] [--latency-ms 50]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.stub_server import StubGeckoServer
+
+BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+def summarize(samples: List[float], scale: float = 1000) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "n": len(samples),
+        "p50": round(statistics.median(samples) * scale, 3),
+        "p90": round(ordered[int(0.9 * (len(ordered) - 1))] * scale, 3),
+        "max": round(ordered[-1] * scale, 3),
+    }
+
+def listed_address(i: int) -> str:
+    return f"Listed{i:04d}".ljust(44, "1")
+
+def write_token_list(path: str, size: int, listed: List[str]) -> List[str]:
+    rng = random.Random(0)
+    addresses = ["".join(rng.choice(BASE58) for _ in range(44)) for _ in range(size - len(listed))]
+    tokens = [{"chainId": 101, "address": address, "symbol": f"T{i}", "name": f"Token {i}", "decimals": 9}
+              for i, address in enumerate(addresses + listed)]
+    with open(path, "w") as f:
+        json.dump({"name": "bench", "tokens": tokens}, f)
+    return addresses
+
+async def resolve_tokens(count: int, stub: StubGeckoServer) -> Dict[str, object]:
+    from data_fetcher import resolver
+
+    requests = stub.requests
+    latencies = []
+    for i in range(count):
+        token = listed_address(i)
+        resolver.invalidate(token)
+        started = time.perf_counter()
+        context = await resolver.resolve(token)
+        latencies.append(time.perf_counter() - started)
+        assert context.exists and context.pools
+    return {"resolve_ms": summarize(latencies), "api_requests": stub.requests - requests,
+            "symbol": context.symbol}
+
+async def main_async(args, stub: StubGeckoServer) -> dict:
+    from config import TOKEN_INDEX_SETTINGS
+    from http_client import close_client
+    from request_scheduler import scheduler
+    from token_index import token_index
+
+    result = {"size": args.size}
+    try:
+        started = time.perf_counter()
+        assert await token_index.refresh(force=True)
+        result["build_s"] = round(time.perf_counter() - started, 3)
+        result["index_bytes"] = os.path.getsize(token_index.path)
+
+        unlisted = [address[::-1] for address in args.addresses]
+        for name, addresses in (("lookup_hit_us", args.addresses), ("lookup_miss_us", unlisted)):
+            samples = []
+            for address in addresses:
+                started = time.perf_counter()
+                token_index.lookup(address)
+                samples.append(time.perf_counter() - started)
+            result[name] = summarize(samples, scale=1e6)
+
+        for mode, enabled in (("without_index", False), ("with_index", True)):
+            TOKEN_INDEX_SETTINGS["enabled"] = enabled
+            result[mode] = await resolve_tokens(args.tokens, stub)
+    finally:
+        await token_index.close()
+        await scheduler.close()
+        await close_client()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000, help="Tokens in the synthetic list")
+    parser.add_argument("--tokens", type=int, default=20, help="Cold tokens resolved per mode")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Stub latency per API response")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    stub = StubGeckoServer(latency_ms=args.latency_ms)
+    url = stub.start()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        list_path = os.path.join(data_dir, "tokens.json")
+        listed = [listed_address(i) for i in range(args.tokens)]
+        args.addresses = write_token_list(list_path, args.size, listed)[:1000]
+        os.environ.update(
+            TELEGRAM_TOKEN=os.environ.get("TELEGRAM_TOKEN", "123456:benchmark"),
+            GECKO_API_BASE=url,
+            API_CALLS_PER_MINUTE="1000000",
+            API_BURST="100000",
+            CANDLE_STORE_PATH=os.path.join(data_dir, "candles.sqlite3"),
+            TOKEN_INDEX_PATH=os.path.join(data_dir, "tokens.sqlite3"),
+            TOKEN_LIST_PATH=list_path,
+        )
+        try:
+            result = asyncio.run(main_async(args, stub))
+        finally:
+            stub.stop()
+
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Run the bot in webhook mode against a fake Telegram Bot API and the GeckoTerminal stub.
+
+Starts `bot.py` as a subprocess (BOT_MODE=webhook), waits for it to register
+its webhook, delivers /start and /chart updates to it the way Telegram does,
+measures the time until each reply reaches the fake API, then presses a
+timeframe button on every chart (after --click-delay seconds, giving the
+background prefetch time to render it), and finally stops the bot with
+SIGTERM and checks that it shuts down cleanly.
+
+Usage:
+    python -m benchmarks.bench_webhook [--updates 20] [--workers 1] [--telegram-latency-ms 0] [--click-delay 5]
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.fake_telegram import FakeTelegramServer, callback_update, command_update, post_update
+from benchmarks.stub_server import StubGeckoServer
+
+SECRET = "benchmark-secret"
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "n": len(samples),
+        "p50_ms": round(statistics.median(samples) * 1000, 1),
+        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+def reply_latencies(telegram: FakeTelegramServer, sent: Dict[int, float], method: str) -> List[float]:
+    """Time from delivering each chat's update to the first `method` call for that chat."""
+    latencies = []
+    for chat_id, sent_at in sent.items():
+        replies = [at for at, called, params in telegram.calls
+                   if called == method and params.get("chat_id") == chat_id and at >= sent_at]
+        if replies:
+            latencies.append(min(replies) - sent_at)
+    return latencies
+
+def deliver(webhook_url: str, updates: List[dict], concurrency: int) -> Dict[int, float]:
+    """Post updates concurrently; returns the send time per chat."""
+    sent = {}
+
+    def send(update):
+        message = update["message"] if "message" in update else update["callback_query"]["message"]
+        sent[message["chat"]["id"]] = time.monotonic()
+        status = post_update(webhook_url, update, SECRET, client=client)
+        if status != 200:
+            print(f"Webhook answered {status}", file=sys.stderr)
+
+    # Keep-alive connections, like Telegram's (up to WEBHOOK_MAX_CONNECTIONS)
+    with httpx.Client(limits=httpx.Limits(max_connections=concurrency)) as client:
+        with ThreadPoolExecutor(concurrency) as executor:
+            list(executor.map(send, updates))
+    return sent
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--updates", type=int, default=20, help="Updates of each kind to deliver")
+    parser.add_argument("--workers", type=int, default=1, help="Webhook worker processes")
+    parser.add_argument("--concurrency", type=int, default=10, help="Parallel webhook deliveries")
+    parser.add_argument("--telegram-latency-ms", type=float, default=0.0)
+    parser.add_argument("--click-delay", type=float, default=5.0,
+                        help="Seconds between the chart replies and the timeframe button presses")
+    parser.add_argument("--click-timeframe", default="4h")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    gecko = StubGeckoServer()
+    telegram = FakeTelegramServer(latency_ms=args.telegram_latency_ms)
+    gecko_url = gecko.start()
+    telegram.start()
+
+    port = free_port()
+    webhook_url = f"http://127.0.0.1:{port}/telegram"
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = dict(
+            os.environ,
+            TELEGRAM_TOKEN="123456:benchmark",
+            TELEGRAM_API_BASE=telegram.api_base,
+            GECKO_API_BASE=gecko_url,
+            API_CALLS_PER_MINUTE="1000000",
+            API_BURST="100000",
+            CANDLE_STORE_PATH=os.path.join(data_dir, "candles.sqlite3"),
+            ALERT_STORE_PATH=os.path.join(data_dir, "alerts.json"),
+            BOT_MODE="webhook",
+            WEBHOOK_URL=webhook_url,
+            WEBHOOK_HOST="127.0.0.1",
+            WEBHOOK_PORT=str(port),
+            WEBHOOK_SECRET=SECRET,
+            WEBHOOK_WORKERS=str(args.workers),
+            HTTP_SERVER_PORT=str(free_port()),
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        started = time.monotonic()
+        bot = subprocess.Popen([sys.executable, "bot.py"], cwd=root, env=env)
+        result = {"workers": args.workers, "telegram_latency_ms": args.telegram_latency_ms}
+        try:
+            if not telegram.wait_for("setWebhook", timeout=args.timeout):
+                raise RuntimeError("Bot did not register its webhook")
+            registered = time.monotonic()
+            result["startup_ms"] = round((registered - started) * 1000, 1)
+            assert telegram.webhook["url"] == webhook_url and telegram.webhook["secret_token"] == SECRET
+            time.sleep(0.5)  # Other workers bind the port independently of worker 0's registration
+
+            # Rejected without the secret token
+            result["unauthorized_status"] = post_update(webhook_url, command_update(1, "/start"))
+
+            updates = [command_update(i + 1, "/start", chat_id=1000 + i) for i in range(args.updates)]
+            sent = deliver(webhook_url, updates, args.concurrency)
+            telegram.wait_for("sendMessage", count=args.updates, timeout=args.timeout)
+            result["start_reply"] = summarize(reply_latencies(telegram, sent, "sendMessage"))
+
+            tokens = [f"WebhookBench{i:04d}".ljust(44, "1") for i in range(args.updates)]
+            updates = [command_update(args.updates + i + 1, f"/chart {token}", chat_id=5000 + i)
+                       for i, token in enumerate(tokens)]
+            sent = deliver(webhook_url, updates, args.concurrency)
+            telegram.wait_for("editMessageCaption", count=args.updates, timeout=args.timeout)
+            result["chart_reply"] = summarize(reply_latencies(telegram, sent, "editMessageCaption"))
+
+            # A timeframe button press answers with a new photo
+            time.sleep(args.click_delay)
+            updates = [callback_update(2 * args.updates + i + 1, f"tf_{args.click_timeframe}_{token}",
+                                       message_id=1, chat_id=5000 + i)
+                       for i, token in enumerate(tokens)]
+            sent = deliver(webhook_url, updates, args.concurrency)
+            telegram.wait_for("sendPhoto", count=args.updates, timeout=args.timeout)
+            result["timeframe_reply"] = summarize(reply_latencies(telegram, sent, "sendPhoto"))
+        finally:
+            stopping = time.monotonic()
+            bot.send_signal(signal.SIGTERM)
+            try:
+                result["exit_code"] = bot.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                bot.kill()
+                result["exit_code"] = "killed"
+            result["shutdown_ms"] = round((time.monotonic() - stopping) * 1000, 1)
+            telegram.stop()
+            gecko.stop()
+
+    print(json.dumps(result, indent=2))
+    if result.get("exit_code") != 0:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
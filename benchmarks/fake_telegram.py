@@ -0,0 +1,214 @@
+"""
+Local fake of the Telegram Bot API for running the bot offline.
+
+Point the bot at it with TELEGRAM_API_BASE=<base_url>/bot. It answers the
+methods the bot uses (getMe, setWebhook, sendMessage, sendPhoto, edits,
+answerCallbackQuery, getUpdates for polling) with minimal valid objects and
+records every call, so a test can post an update to the bot's webhook and
+wait for the reply.
+"""
+import email.parser
+import email.policy
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+import httpx
+
+BOT_USER = {"id": 100000001, "is_bot": True, "first_name": "Fake Chart Bot", "username": "fake_chart_bot"}
+USER = {"id": 42, "is_bot": False, "first_name": "Tester"}
+
+def _parse_form(content_type: str, body: bytes) -> Dict[str, Any]:
+    """Decode a Bot API request body (urlencoded or multipart, values JSON encoded)."""
+    params: Dict[str, Any] = {}
+    if content_type.startswith("multipart/form-data"):
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if part.get_filename():
+                params[name] = part.get_payload(decode=True)
+            else:
+                params[name] = part.get_payload(decode=True).decode()
+    elif body:
+        params = {name: values[0] for name, values in parse_qs(body.decode()).items()}
+
+    for name, value in params.items():
+        if isinstance(value, str):
+            try:
+                params[name] = json.loads(value)
+            except ValueError:
+                pass
+    return params
+
+def command_update(update_id: int, text: str, chat_id: int = USER["id"]) -> Dict[str, Any]:
+    """A private-chat message update, e.g. command_update(1, "/chart <address>")."""
+    command = text.split()[0] if text.startswith("/") else None
+    message = {
+        "message_id": update_id,
+        "date": int(time.time()),
+        "chat": {"id": chat_id, "type": "private"},
+        "from": USER,
+        "text": text,
+    }
+    if command:
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(command)}]
+    return {"update_id": update_id, "message": message}
+
+def callback_update(update_id: int, data: str, message_id: int, chat_id: int = USER["id"]) -> Dict[str, Any]:
+    """A callback query update for an inline button on a bot message."""
+    return {"update_id": update_id, "callback_query": {
+        "id": str(update_id),
+        "from": USER,
+        "chat_instance": str(chat_id),
+        "data": data,
+        "message": {"message_id": message_id, "date": int(time.time()),
+                    "chat": {"id": chat_id, "type": "private"}, "from": BOT_USER, "text": "chart"},
+    }}
+
+def post_update(webhook_url: str, update: Dict[str, Any], secret_token: Optional[str] = None,
+                client: Optional[httpx.Client] = None, timeout: float = 10) -> int:
+    """Deliver an update to a bot's webhook the way Telegram does. Returns the HTTP status."""
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret_token} if secret_token else {}
+    if client is None:
+        return httpx.post(webhook_url, json=update, headers=headers, timeout=timeout).status_code
+    return client.post(webhook_url, json=update, headers=headers, timeout=timeout).status_code
+
+class FakeTelegramServer:
+    """
+    Threaded fake Bot API server on 127.0.0.1.
+
+    Args:
+        latency_ms: Artificial delay per API call, to approximate Telegram round trips
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.calls: List[Tuple[float, str, Dict[str, Any]]] = []  # (time, method, params)
+        self.webhook: Optional[Dict[str, Any]] = None
+        self._updates: List[Dict[str, Any]] = []
+        self._message_ids = itertools.count(1000)
+        self._file_ids = itertools.count(1)
+        self._changed = threading.Condition()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_base(self) -> str:
+        """Value for TELEGRAM_API_BASE."""
+        return f"{self.base_url}/bot"
+
+    def queue_update(self, update: Dict[str, Any]):
+        """Make an update available to a polling bot (getUpdates)."""
+        with self._changed:
+            self._updates.append(update)
+            self._changed.notify_all()
+
+    def _message(self, params: Dict[str, Any], **extra) -> Dict[str, Any]:
+        message_id = params.get("message_id") or next(self._message_ids)
+        return {"message_id": message_id, "date": int(time.time()), "from": BOT_USER,
+                "chat": {"id": params.get("chat_id", USER["id"]), "type": "private"}, **extra}
+
+    def _photo(self) -> List[Dict[str, Any]]:
+        file_id = f"photo{next(self._file_ids)}"
+        return [{"file_id": file_id, "file_unique_id": f"u{file_id}", "width": 1200, "height": 1000}]
+
+    def handle(self, method: str, params: Dict[str, Any]) -> Any:
+        """Return the `result` for a Bot API call."""
+        if method == "getMe":
+            return BOT_USER
+        if method == "setWebhook":
+            self.webhook = params
+            return True
+        if method in ("deleteWebhook", "answerCallbackQuery", "setMyCommands", "close", "logOut"):
+            return True
+        if method == "getUpdates":
+            offset = int(params.get("offset", 0) or 0)
+            deadline = time.monotonic() + min(float(params.get("timeout", 0) or 0), 1.0)
+            with self._changed:
+                while True:
+                    updates = [update for update in self._updates if update["update_id"] >= offset]
+                    remaining = deadline - time.monotonic()
+                    if updates or remaining <= 0:
+                        return updates
+                    self._changed.wait(remaining)
+        if method == "sendMessage":
+            return self._message(params, text=params.get("text", ""))
+        if method == "sendPhoto":
+            return self._message(params, photo=self._photo(), caption=params.get("caption", ""))
+        if method == "editMessageText":
+            return self._message(params, text=params.get("text", ""))
+        if method == "editMessageMedia":
+            return self._message(params, photo=self._photo())
+        if method == "editMessageCaption":
+            return self._message(params, photo=self._photo(), caption=params.get("caption", ""))
+        raise KeyError(method)
+
+    def wait_for(self, method: str, count: int = 1, timeout: float = 30) -> List[Dict[str, Any]]:
+        """Wait until `method` was called at least `count` times; returns the params of those calls."""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                matches = [params for _, called, params in self.calls if called == method]
+                remaining = deadline - time.monotonic()
+                if len(matches) >= count or remaining <= 0:
+                    return matches
+                self._changed.wait(remaining)
+
+    def start(self) -> str:
+        """Start serving in a background thread and return the server URL."""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                # Paths look like /bot<token>/<method>
+                method = self.path.rstrip("/").rsplit("/", 1)[-1]
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                params = _parse_form(self.headers.get("Content-Type", ""), body)
+                if fake.latency:
+                    time.sleep(fake.latency)
+                try:
+                    payload = {"ok": True, "result": fake.handle(method, params)}
+                    status = 200
+                except KeyError:
+                    payload = {"ok": False, "error_code": 404, "description": "Not Found: method not found"}
+                    status = 404
+                with fake._changed:
+                    fake.calls.append((time.monotonic(), method, params))
+                    fake._changed.notify_all()
+                data = json.dumps(payload).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The bot closed a long poll while shutting down
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.base_url
+
+    def stop(self):
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,103 @@
+"""
+Record GeckoTerminal responses for one token into benchmarks/fixtures/ for offline benchmarks.
+
+Usage:
+    python -m benchmarks.record_fixtures --token <token_address>   # live API (needs network)
+    python -m benchmarks.record_fixtures --synthetic               # generated, same response schema
+
+The fixture set is one token response, its pools response and one OHLCV
+response per endpoint (minute/hour/day) for the top pool, with up to 1000
+candles each. The stub server replays them and shifts the timestamps so the
+newest candle is the current one.
+"""
+import argparse
+import json
+import os
+import time
+
+import httpx
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+ENDPOINTS = ("minute", "hour", "day")
+API_BASE = "https://api.geckoterminal.com/api/v2"
+
+SYNTHETIC_TOKEN = "BenchmarkToken1111111111111111111111111111"
+SYNTHETIC_POOLS = [
+    ("BenchPoolA111111111111111111111111111111111", "BENCH / SOL", "1250000.50"),
+    ("BenchPoolB111111111111111111111111111111111", "BENCH / USDC", "430000.25"),
+    ("BenchPoolC111111111111111111111111111111111", "BENCH / USDT", "21000.00"),
+]
+
+def write_fixture(name: str, payload: dict):
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    with open(os.path.join(FIXTURE_DIR, name), "w") as f:
+        json.dump(payload, f, separators=(",", ":"))
+
+def record_live(token_address: str, limit: int):
+    with httpx.Client(base_url=API_BASE, timeout=30, headers={"Accept": "application/json"}) as client:
+        token = client.get(f"/networks/solana/tokens/{token_address}")
+        token.raise_for_status()
+        write_fixture("token.json", token.json())
+
+        pools = client.get(f"/networks/solana/tokens/{token_address}/pools")
+        pools.raise_for_status()
+        write_fixture("pools.json", pools.json())
+
+        pool_id = pools.json()["data"][0]["id"]
+        pool_address = pool_id.split("_", 1)[1]
+        for endpoint in ENDPOINTS:
+            # Stay well within the free tier's 30 calls per minute
+            time.sleep(2)
+            ohlcv = client.get(f"/networks/solana/pools/{pool_address}/ohlcv/{endpoint}",
+                               params={"aggregate": 1, "limit": limit, "currency": "usd"})
+            ohlcv.raise_for_status()
+            write_fixture(f"ohlcv_{endpoint}.json", ohlcv.json())
+
+def record_synthetic(limit: int):
+    from benchmarks.synthetic import make_candles
+
+    write_fixture("token.json", {"data": {
+        "id": f"solana_{SYNTHETIC_TOKEN}",
+        "type": "token",
+        "attributes": {"address": SYNTHETIC_TOKEN, "name": "Benchmark Token", "symbol": "BENCH",
+                       "decimals": 6, "price_usd": "1.0", "total_supply": "1000000000000000"},
+    }})
+
+    write_fixture("pools.json", {"data": [
+        {
+            "id": f"solana_{address}",
+            "type": "pool",
+            "attributes": {"address": address, "name": name, "reserve_in_usd": reserve,
+                           "base_token_price_usd": "1.0", "pool_created_at": "2024-01-01T00:00:00Z"},
+            "relationships": {"base_token": {"data": {"id": f"solana_{SYNTHETIC_TOKEN}", "type": "token"}}},
+        }
+        for address, name, reserve in SYNTHETIC_POOLS
+    ]})
+
+    for seed, (endpoint, freq) in enumerate((("minute", "1min"), ("hour", "1h"), ("day", "1D"))):
+        df = make_candles(limit, seed=seed, freq=freq)
+        ts = df.index.values.astype("datetime64[s]").astype("int64")
+        rows = [[int(t), round(o, 10), round(h, 10), round(l, 10), round(c, 10), round(v, 4)]
+                for t, o, h, l, c, v in zip(ts, df["open"], df["high"], df["low"], df["close"], df["volume"])]
+        write_fixture(f"ohlcv_{endpoint}.json", {
+            "data": {"id": "synthetic", "type": "ohlcv_request_response",
+                     "attributes": {"ohlcv_list": rows[::-1]}},  # API order: newest first
+            "meta": {"base": {"symbol": "BENCH"}, "quote": {"symbol": "SOL"}},
+        })
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--token", help="Token address to record from the live API")
+    source.add_argument("--synthetic", action="store_true", help="Write generated fixtures instead")
+    parser.add_argument("--limit", type=int, default=1000, help="Candles per OHLCV fixture (API max 1000)")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        record_synthetic(args.limit)
+    else:
+        record_live(args.token, args.limit)
+    print(f"Fixtures written to {FIXTURE_DIR}")
+
+if __name__ == "__main__":
+    main()
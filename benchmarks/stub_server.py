@@ -0,0 +1,208 @@
+"""
+Local stand-in for the GeckoTerminal API that replays recorded fixtures.
+
+Serves the three endpoints the bot uses from benchmarks/fixtures/:
+
+    /networks/solana/tokens/{token}               -> token.json
+    /networks/solana/tokens/{token}/pools         -> pools.json
+    /networks/solana/pools/{pool}/ohlcv/{endpoint} -> ohlcv_{endpoint}.json
+
+OHLCV responses honour `limit`, `before_timestamp` and `aggregate`, and the
+recorded candles are shifted so the newest one is the current candle. Any
+token or pool address is accepted and maps to the recorded data; other
+tokens get their own renamed copies of the recorded pools.
+
+Pools can be made slow or flaky with `set_pool_fault`, e.g. to exercise
+the bot's pool fallback.
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.record_fixtures import FIXTURE_DIR, ENDPOINTS
+
+ENDPOINT_SECONDS = {"minute": 60, "hour": 3600, "day": 86400}
+
+_TOKEN = re.compile(r"^/networks/[^/]+/tokens/([^/]+)$")
+_POOLS = re.compile(r"^/networks/[^/]+/tokens/([^/]+)/pools$")
+_OHLCV = re.compile(r"^/networks/[^/]+/pools/([^/]+)/ohlcv/(minute|hour|day)$")
+
+def _shift_to_now(rows: List[List[float]], interval: int) -> List[List[float]]:
+    """Shift candle timestamps so the newest candle is the one forming now (oldest first)."""
+    rows = sorted(rows, key=lambda row: row[0])
+    current = int(time.time()) // interval * interval
+    offset = current - int(rows[-1][0]) if rows else 0
+    return [[int(row[0]) + offset, *row[1:]] for row in rows]
+
+def _aggregate(rows: List[List[float]], period: int) -> List[List[float]]:
+    """Aggregate oldest-first candles into epoch-aligned buckets of `period` seconds."""
+    buckets: Dict[int, List[float]] = {}
+    for ts, o, h, l, c, v in rows:
+        start = int(ts) - int(ts) % period
+        bucket = buckets.get(start)
+        if bucket is None:
+            buckets[start] = [start, o, h, l, c, v]
+        else:
+            bucket[2] = max(bucket[2], h)
+            bucket[3] = min(bucket[3], l)
+            bucket[4] = c
+            bucket[5] += v
+    return [buckets[start] for start in sorted(buckets)]
+
+class StubGeckoServer:
+    """
+    Threaded HTTP server replaying the fixtures on 127.0.0.1.
+
+    Args:
+        fixture_dir: Directory with token.json, pools.json and ohlcv_*.json
+        latency_ms: Artificial delay per response, to approximate network round trips
+    """
+
+    def __init__(self, fixture_dir: str = FIXTURE_DIR, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.requests = 0
+        self.pool_requests: Counter = Counter()  # OHLCV requests per pool address
+        self._faults: Dict[str, Dict[str, Any]] = {}
+        self._random = random.Random(0)
+        self._token = self._load(fixture_dir, "token.json")
+        self._pools = self._load(fixture_dir, "pools.json")
+        self._ohlcv: Dict[str, List[List[float]]] = {}
+        for endpoint in ENDPOINTS:
+            payload = self._load(fixture_dir, f"ohlcv_{endpoint}.json")
+            if payload is not None:
+                rows = payload["data"]["attributes"]["ohlcv_list"]
+                self._ohlcv[endpoint] = _shift_to_now(rows, ENDPOINT_SECONDS[endpoint])
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _load(fixture_dir: str, name: str):
+        path = os.path.join(fixture_dir, name)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _pools_for(self, token_address: str) -> dict:
+        """
+        The recorded pools, renamed per token so that every token address
+        gets its own pools (and so its own, initially cold, candle series).
+        """
+        recorded = self._token["data"]["attributes"].get("address") if self._token else None
+        if token_address == recorded:
+            return self._pools
+        pools = []
+        for i, pool in enumerate(self._pools["data"]):
+            address = f"{token_address[:32]}P{i}"
+            pools.append({**pool, "id": f"solana_{address}",
+                          "attributes": {**pool.get("attributes", {}), "address": address},
+                          "relationships": {"base_token": {"data": {"id": f"solana_{token_address}",
+                                                                    "type": "token"}}}})
+        return {"data": pools}
+
+    def set_pool_fault(self, suffix: str, probability: float = 1.0, latency_ms: float = 0.0,
+                       status: Optional[int] = None, rows: Optional[int] = None):
+        """
+        Degrade OHLCV responses for pools whose address ends with `suffix` (e.g. "P0").
+
+        Args:
+            suffix: Pool address suffix; renamed pools end with P<rank>
+            probability: Share of requests affected (decided per request, seeded)
+            latency_ms: Extra delay for affected requests
+            status: Error status returned instead of data
+            rows: Truncate affected responses to this many candles
+        """
+        self._faults[suffix] = {"probability": probability, "latency": latency_ms / 1000,
+                                "status": status, "rows": rows}
+
+    def _fault_for(self, path: str) -> Optional[Dict[str, Any]]:
+        match = _OHLCV.match(path)
+        if not match:
+            return None
+        pool = match.group(1)
+        self.pool_requests[pool] += 1
+        for suffix, fault in self._faults.items():
+            if pool.endswith(suffix) and self._random.random() < fault["probability"]:
+                return fault
+        return None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def route(self, path: str, query: Dict[str, List[str]]):
+        """Return (status, payload) for a request path and parsed query string."""
+        if _TOKEN.match(path):
+            return (200, self._token) if self._token else (404, {"errors": [{"status": "404"}]})
+        match = _POOLS.match(path)
+        if match:
+            return (200, self._pools_for(match.group(1))) if self._pools else (200, {"data": []})
+        match = _OHLCV.match(path)
+        if match:
+            endpoint = match.group(2)
+            rows = self._ohlcv.get(endpoint)
+            if rows is None:
+                return 404, {"errors": [{"status": "404"}]}
+            aggregate = int(query.get("aggregate", ["1"])[0])
+            limit = min(int(query.get("limit", ["100"])[0]), 1000)
+            if aggregate > 1:
+                rows = _aggregate(rows, ENDPOINT_SECONDS[endpoint] * aggregate)
+            if "before_timestamp" in query:
+                before = int(query["before_timestamp"][0])
+                rows = [row for row in rows if row[0] < before]
+            page = rows[-limit:][::-1]  # Newest first, like the API
+            return 200, {"data": {"id": "stub", "type": "ohlcv_request_response",
+                                  "attributes": {"ohlcv_list": page}}}
+        return 404, {"errors": [{"status": "404", "title": "Not Found"}]}
+
+    def start(self) -> str:
+        """Start serving in a background thread and return the API base URL."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                fault = stub._fault_for(url.path) or {}
+                if fault.get("status"):
+                    status, payload = fault["status"], {"errors": [{"status": str(fault["status"])}]}
+                else:
+                    status, payload = stub.route(url.path, parse_qs(url.query))
+                    if fault.get("rows") is not None and status == 200:
+                        attributes = payload["data"]["attributes"]
+                        attributes["ohlcv_list"] = attributes["ohlcv_list"][:fault["rows"]]
+                body = json.dumps(payload).encode()
+                stub.requests += 1
+                delay = stub.latency + fault.get("latency", 0.0)
+                if delay:
+                    time.sleep(delay)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+def make_candles(n: int = 300, seed: int = 0, start: str = "2024-01-01", freq: str = "1h") -> pd.DataFrame:
+    """
+    Generate a deterministic random-walk OHLCV frame shaped like the fetcher's output.
+
+    Args:
+        n: Number of candles
+        seed: Random seed
+        start: Timestamp of the first candle
+        freq: Candle interval
+
+    Returns:
+        DataFrame indexed by timestamp with open/high/low/close/volume columns
+    """
+    rng = np.random.default_rng(seed)
+    closes = 1.0 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    opens = np.r_[closes[0], closes[:-1]]
+    highs = np.maximum(opens, closes) * (1 + np.abs(rng.normal(0, 0.01, n)))
+    lows = np.minimum(opens, closes) * (1 - np.abs(rng.normal(0, 0.01, n)))
+    volumes = rng.uniform(100, 1000, n)
+    index = pd.date_range(start, periods=n, freq=freq, name='timestamp')
+    return pd.DataFrame({'open': opens, 'high': highs, 'low': lows, 'close': closes, 'volume': volumes},
+                        index=index)
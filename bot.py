@@ -1,18 +1,57 @@
 import logging
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto
+import time
+_import_started = time.perf_counter()
+from typing import Optional
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto, Message
+from telegram.error import BadRequest
 from telegram.ext import (
-    ApplicationBuilder, CommandHandler, ContextTypes,
-    CallbackQueryHandler, ConversationHandler, MessageHandler, filters
+    Application, ApplicationBuilder, CommandHandler, ContextTypes,
+    CallbackQueryHandler, ChatMemberHandler, ConversationHandler, MessageHandler, filters
 )
 
-from config import TELEGRAM_TOKEN, TIMEFRAMES, DEFAULT_TIMEFRAME
-from data_fetcher import get_token_chart_data, get_token_metadata
+from config import (
+    TELEGRAM_TOKEN, TIMEFRAMES, DEFAULT_TIMEFRAME, SCAN_SETTINGS, HTTP_SERVER_SETTINGS, BOT_SETTINGS,
+    ALERT_SETTINGS, STARTUP_SETTINGS, DASHBOARD_SETTINGS, PREFETCH_SETTINGS, TOKEN_INDEX_SETTINGS
+)
+from data_fetcher import get_token_chart_data, get_token_metadata, resolver
+from chart_cache import chart_cache, CachedChart
+from http_client import close_client
+from request_scheduler import scheduler
+from ohlcv_cache import ohlcv_cache
+from render_pool import shutdown_render_pool
+from alerts import alert_engine, ALERT_CONDITIONS
+from scanner import scan_tokens, format_scan_table
 from legend import LEGEND_TEXT
+from metrics import registry, span, timed, metrics_handler, TELEGRAM_SEND_SECONDS
+from http_server import http_server
+from dashboard_api import dashboard_api
+from webhook import run_webhook
+from warmup import start_prewarm, stop_prewarm
+from prefetch import prefetcher
+from token_index import token_index
+
+# Time spent importing this module and its dependencies (heavy ones are deferred)
+IMPORT_SECONDS = time.perf_counter() - _import_started
+registry.callback("bot_import_seconds", "Seconds the bot process spent importing its modules", lambda: IMPORT_SECONDS)
 
 logger = logging.getLogger(__name__)
 
 TIMEFRAME = 0
 TIMEFRAME_PREFIX = "tf_"
+CALLBACK_DATA_MAX = 64  # Telegram's limit for callback_data in bytes
+
+def timeframe_callback_data(timeframe: str, token_address: str) -> str:
+    """
+    Callback data for a timeframe button.
+    
+    The token address is included when it fits, so the button works in
+    whichever process receives the callback (webhook workers don't share
+    user_data).
+    """
+    data = f"{TIMEFRAME_PREFIX}{timeframe}_{token_address}"
+    if len(data.encode()) <= CALLBACK_DATA_MAX:
+        return data
+    return f"{TIMEFRAME_PREFIX}{timeframe}"
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     welcome_text = (
@@ -20,6 +59,10 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "I can generate technical analysis charts for any SPL token on Solana.\n\n"
         "*Commands:*\n"
         "• `/chart <token_address>` - Generate a chart with indicators\n"
+        "• `/alert <token_address> [timeframe] [rsi|macd|levels]` - Get notified of RSI, MACD and support/resistance signals\n"
+        "• `/alerts` - List your alerts\n"
+        "• `/unalert <token_address|all> [timeframe]` - Remove alerts\n"
+        "• `/scan <token_address> ... [timeframe]` - Rank a watchlist by RSI, MACD crossovers and support\n"
         "• `/legend` - Explain chart indicators\n"
         "• `/help` - Show this help message\n\n"
         "Example: `/chart 9n4nbM75f5Ui33ZbPYXn59EwSgE8CGsHtAeTH5YFeJ9E`"
@@ -52,7 +95,7 @@ async def chart(update: Update, context: ContextTypes.DEFAULT_TYPE):
     row = []
     for tf, tf_data in TIMEFRAMES.items():
         text = f"✓ {tf_data['name']}" if tf == timeframe else tf_data['name']
-        row.append(InlineKeyboardButton(text, callback_data=f"{TIMEFRAME_PREFIX}{tf}"))
+        row.append(InlineKeyboardButton(text, callback_data=timeframe_callback_data(tf, token_address)))
         if len(row) == 2:
             keyboard.append(row)
             row = []
@@ -69,16 +112,22 @@ async def chart(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     context.user_data['message_id'] = processing_message.message_id
     
-    await generate_and_send_chart(update, context, token_address, timeframe)
+    chat_id = update.effective_chat.id
+    prefetcher.cancel(chat_id)  # The chat moved on from any previously charted token
+    if await generate_and_send_chart(update, context, token_address, timeframe) and PREFETCH_SETTINGS["enabled"]:
+        # Render the other timeframes in the background so the buttons answer from cache
+        prefetcher.start(chat_id, token_address, timeframe)
 
 async def timeframe_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle timeframe selection callbacks."""
     query = update.callback_query
     await query.answer()
     
-    timeframe = query.data.replace(TIMEFRAME_PREFIX, "")
+    timeframe, _, token_address = query.data[len(TIMEFRAME_PREFIX):].partition("_")
+    if timeframe not in TIMEFRAMES:
+        return
     
-    token_address = context.user_data.get('token_address')
+    token_address = token_address or context.user_data.get('token_address')
     if not token_address:
         await query.edit_message_text("Session expired. Please use /chart command again.")
         return
@@ -91,69 +140,281 @@ async def timeframe_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     await generate_and_send_chart(update, context, token_address, timeframe, is_callback=True)
 
+async def bot_membership(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Stop background work for a chat that blocked or removed the bot."""
+    if update.my_chat_member.new_chat_member.status in ("kicked", "left"):
+        prefetcher.cancel(update.effective_chat.id)
+
+async def send_chart_photo(context: ContextTypes.DEFAULT_TYPE, chat_id: int, chart: CachedChart,
+                           caption: str, message_id: Optional[int] = None):
+    """
+    Send a chart as a new photo, or into an existing message if message_id is given.
+    
+    Charts that were uploaded before are sent by their Telegram file_id. The
+    file_id of a fresh upload is stored in the chart cache for next time.
+    """
+    async def send(photo):
+        if message_id:
+            message = await context.bot.edit_message_media(
+                chat_id=chat_id,
+                message_id=message_id,
+                media=InputMediaPhoto(media=photo)
+            )
+            await context.bot.edit_message_caption(
+                chat_id=chat_id,
+                message_id=message_id,
+                caption=caption,
+                parse_mode='Markdown'
+            )
+            return message
+        return await context.bot.send_photo(
+            chat_id=chat_id,
+            photo=photo,
+            caption=caption,
+            parse_mode='Markdown'
+        )
+    
+    if chart.file_id:
+        try:
+            with timed(TELEGRAM_SEND_SECONDS, method="file_id"):
+                await send(chart.file_id)
+            return
+        except BadRequest as e:
+            # The stored file_id is no longer valid, upload the image again
+            logger.warning(f"Cached file_id rejected, re-uploading chart: {e}")
+            chart_cache.set_file_id(chart.key, None)
+    
+    with timed(TELEGRAM_SEND_SECONDS, method="upload"):
+        message = await send(chart.image)
+    if isinstance(message, Message) and message.photo:
+        chart_cache.set_file_id(chart.key, message.photo[-1].file_id)
+
+# Replies for the error codes get_token_chart_data returns as "<CODE>:<token>"
+CHART_ERROR_REPLIES = {
+    "TOKEN_NOT_FOUND": "❌ Token {} not found.",
+    "NO_POOLS_FOUND": "❌ No trading pools found for {}.",
+    "NO_DATA_AVAILABLE": "❌ No price data available for {}.",
+    "RENDER_BUSY": "⏳ Busy rendering other charts, please try {} again in a moment.",
+}
+
+def chart_error_reply(error: Optional[str]) -> str:
+    """Turn an error code from get_token_chart_data into a reply for the user."""
+    code, _, token = (error or "").partition(":")
+    template = CHART_ERROR_REPLIES.get(code)
+    return template.format(token) if template else "Failed to generate chart."
+
 async def generate_and_send_chart(update: Update, context: ContextTypes.DEFAULT_TYPE,
-                                  token_address: str, timeframe: str, is_callback: bool = False):
-    """Generate and send a chart with the given parameters."""
+                                  token_address: str, timeframe: str, is_callback: bool = False) -> bool:
+    """Generate and send a chart with the given parameters. Returns whether the chart was sent."""
     try:
-        img_path, analysis_text = get_token_chart_data(token_address, timeframe)
+        with span("chart_data"):
+            chart, analysis_text = await get_token_chart_data(token_address, timeframe)
         
-        if img_path and analysis_text:
+        if chart and analysis_text:
             chat_id = update.effective_chat.id
-            
-            with open(img_path, 'rb') as photo:
-                if is_callback:
-                    await context.bot.send_photo(
-                        chat_id=chat_id,
-                        photo=photo,
-                        caption=analysis_text,
-                        parse_mode='Markdown'
-                    )
-                else:
-                    message_id = context.user_data.get('message_id')
-                    if message_id:
-                        await context.bot.edit_message_media(
-                            chat_id=chat_id,
-                            message_id=message_id,
-                            media=InputMediaPhoto(media=photo)
-                        )
-                        await context.bot.edit_message_caption(
-                            chat_id=chat_id,
-                            message_id=message_id,
-                            caption=analysis_text,
-                            parse_mode='Markdown'
-                        )
-                    else:
-                        await context.bot.send_photo(
-                            chat_id=chat_id,
-                            photo=photo,
-                            caption=analysis_text,
-                            parse_mode='Markdown'
-                        )
-        else:
-            await update.message.reply_text("Failed to generate chart.")
+            message_id = None if is_callback else context.user_data.get('message_id')
+            with span("telegram_send"):
+                await send_chart_photo(context, chat_id, chart, analysis_text, message_id=message_id)
+            return True
+        await update.effective_message.reply_text(chart_error_reply(analysis_text))
     except Exception as e:
         logger.error(f"Error generating/sending chart: {e}")
-        await update.message.reply_text("An error occurred while generating the chart.")
+        await update.effective_message.reply_text("An error occurred while generating the chart.")
+    return False
 
-async def main():
-    application = ApplicationBuilder().token(TELEGRAM_TOKEN).build()
+async def alert(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Subscribe the chat to background alerts for a token."""
+    if not context.args:
+        await update.message.reply_text(
+            "Please provide a token address. Example:\n"
+            "`/alert 9n4nbM75f5Ui33ZbPYXn59EwSgE8CGsHtAeTH5YFeJ9E 4h rsi macd`\n"
+            f"Conditions: {', '.join(ALERT_CONDITIONS)} (default: all)",
+            parse_mode='Markdown'
+        )
+        return
+    
+    token_address = context.args[0]
+    timeframe = DEFAULT_TIMEFRAME
+    conditions = []
+    for arg in context.args[1:]:
+        if arg in TIMEFRAMES:
+            timeframe = arg
+        elif arg.lower() in ALERT_CONDITIONS:
+            conditions.append(arg.lower())
+        else:
+            await update.message.reply_text(f"Unknown timeframe or condition: {arg}")
+            return
+    
+    token_context = await resolver.resolve(token_address)
+    if not token_context.exists or not token_context.pools:
+        await update.message.reply_text(f"❌ No trading pools found for {token_address[:8]}...")
+        return
+    
+    try:
+        alert_engine.subscribe(update.effective_chat.id, token_address, timeframe,
+                               conditions or None, symbol=token_context.symbol)
+    except ValueError as e:
+        await update.message.reply_text(f"❌ {e}")
+        return
+    
+    await update.message.reply_text(
+        f"🔔 Alerts enabled for {token_context.symbol} ({TIMEFRAMES[timeframe]['name']}): "
+        f"{', '.join(conditions or ALERT_CONDITIONS)}.\n"
+        "Conditions are checked when each candle closes."
+    )
+
+async def list_alerts(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """List the chat's alert subscriptions."""
+    subscriptions = alert_engine.subscriptions(update.effective_chat.id)
+    if not subscriptions:
+        await update.message.reply_text("You have no alerts. Use /alert <token_address> to add one.")
+        return
+    
+    lines = ["🔔 Your alerts:"]
+    for watch, conditions in subscriptions:
+        name = watch.symbol or watch.token_address[:8] + "..."
+        lines.append(f"• {name} ({TIMEFRAMES[watch.timeframe]['name']}): {', '.join(sorted(conditions))}\n"
+                     f"  {watch.token_address}")
+    await update.message.reply_text("\n".join(lines))
+
+async def unalert(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Remove the chat's alerts for a token (or all of them)."""
+    if not context.args:
+        await update.message.reply_text("Usage: /unalert <token_address|all> [timeframe]")
+        return
+    
+    token_address = None if context.args[0].lower() == 'all' else context.args[0]
+    timeframe = context.args[1] if len(context.args) > 1 and context.args[1] in TIMEFRAMES else None
+    removed = alert_engine.unsubscribe(update.effective_chat.id, token_address, timeframe)
+    await update.message.reply_text(f"Removed {removed} alert(s).")
+
+async def scan(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Scan a watchlist of tokens and reply with a ranked table, updated as results arrive."""
+    timeframe = DEFAULT_TIMEFRAME
+    token_addresses = []
+    for arg in context.args or []:
+        if arg in TIMEFRAMES:
+            timeframe = arg
+        else:
+            token_addresses.append(arg)
+    token_addresses = list(dict.fromkeys(token_addresses))
+    
+    if not token_addresses:
+        await update.message.reply_text(
+            "Please provide one or more token addresses. Example:\n"
+            "`/scan <token_address> <token_address> 4h`",
+            parse_mode='Markdown'
+        )
+        return
+    if len(token_addresses) > SCAN_SETTINGS["max_tokens"]:
+        await update.message.reply_text(f"Please scan at most {SCAN_SETTINGS['max_tokens']} tokens at once.")
+        return
+    
+    timeframe_name = TIMEFRAMES[timeframe]['name']
+    message = await update.message.reply_text(
+        f"🔎 Scanning {len(token_addresses)} tokens ({timeframe_name})..."
+    )
+    
+    results = []
+    last_edit = time.monotonic()
+    async for result in scan_tokens(token_addresses, timeframe):
+        results.append(result)
+        # Show partial results periodically instead of waiting for the slowest token
+        if len(results) < len(token_addresses) and time.monotonic() - last_edit >= SCAN_SETTINGS["update_interval"]:
+            last_edit = time.monotonic()
+            try:
+                await message.edit_text(format_scan_table(results, len(token_addresses), timeframe_name),
+                                        parse_mode='Markdown')
+            except BadRequest as e:
+                logger.warning(f"Could not update scan results: {e}")
+    
+    await message.edit_text(format_scan_table(results, len(token_addresses), timeframe_name),
+                            parse_mode='Markdown')
+
+async def startup(application: Application):
+    """Start the alert engine, token list refreshes, metrics and dashboard endpoints, and warm up the render workers in the background."""
+    if STARTUP_SETTINGS["prewarm"]:
+        start_prewarm()
+    worker = application.bot_data.get("worker", 0)
+    
+    async def notify(chat_id: int, text: str):
+        await application.bot.send_message(chat_id=chat_id, text=text, parse_mode='Markdown')
+    
+    # Every worker manages subscriptions, but only one checks them
+    alert_engine.start(notify, run_checks=ALERT_SETTINGS["enabled"] and worker == 0)
+    
+    # The index file is shared, so one worker keeps it fresh for all
+    if TOKEN_INDEX_SETTINGS["enabled"] and worker == 0:
+        token_index.start()
+    
+    if HTTP_SERVER_SETTINGS["enabled"]:
+        # Each webhook worker serves its own metrics on the next port
+        http_server.port = HTTP_SERVER_SETTINGS["port"] + worker
+        http_server.route("GET", "/metrics", metrics_handler)
+        if DASHBOARD_SETTINGS["enabled"]:
+            dashboard_api.register(http_server)
+        await http_server.start()
+
+async def shutdown(application: Application):
+    """Stop alerts, token list refreshes and the HTTP server and release the shared HTTP client, cache refreshes and render workers when the application stops."""
+    await http_server.close()
+    await stop_prewarm()
+    await prefetcher.close()
+    await alert_engine.close()
+    await token_index.close()
+    await ohlcv_cache.close()
+    await scheduler.close()
+    await close_client()
+    await shutdown_render_pool()
+
+def build_application(worker: int = 0) -> Application:
+    """
+    Build the bot application with all handlers registered.
+    
+    Args:
+        worker: Index of the webhook worker process running it (0 when polling)
+        
+    Returns:
+        Application ready to run
+    """
+    # Handle updates concurrently so one slow chart request doesn't hold up other chats
+    application = (
+        ApplicationBuilder()
+        .token(TELEGRAM_TOKEN)
+        .base_url(BOT_SETTINGS["api_base"])
+        .base_file_url(BOT_SETTINGS["file_base"])
+        .concurrent_updates(BOT_SETTINGS["concurrent_updates"])
+        .post_init(startup)
+        .post_shutdown(shutdown)
+        .build()
+    )
+    application.bot_data["worker"] = worker
 
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("help", help_command))
     application.add_handler(CommandHandler("legend", legend))
     application.add_handler(CommandHandler("chart", chart))
+    application.add_handler(CommandHandler("scan", scan))
+    application.add_handler(CommandHandler("alert", alert))
+    application.add_handler(CommandHandler("alerts", list_alerts))
+    application.add_handler(CommandHandler("unalert", unalert))
     application.add_handler(CallbackQueryHandler(timeframe_callback, pattern=f"^{TIMEFRAME_PREFIX}"))
+    application.add_handler(ChatMemberHandler(bot_membership, ChatMemberHandler.MY_CHAT_MEMBER))
+    
+    return application
 
-    # Run the bot until the user presses Ctrl-C
-    await application.run_polling()
+def main():
+    import_ms = IMPORT_SECONDS * 1000
+    if import_ms > STARTUP_SETTINGS["import_budget_ms"]:
+        logger.warning(f"Importing the bot took {import_ms:.0f} ms (budget {STARTUP_SETTINGS['import_budget_ms']:.0f} ms)")
+    else:
+        logger.info(f"Imported the bot in {import_ms:.0f} ms")
+    
+    if BOT_SETTINGS["mode"] == "webhook":
+        run_webhook(build_application)
+    else:
+        # Run the bot until the user presses Ctrl-C
+        build_application().run_polling(allowed_updates=Update.ALL_TYPES)
 
 if __name__ == "__main__":
-    import nest_asyncio
-    nest_asyncio.apply()
-    import asyncio
-    import sys
-    try:
-        asyncio.run(main())
-    except RuntimeError as e:
-        # If this error still occurs, re-raise it
-        raise
+    main()
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import CANDLE_STORE_SETTINGS, ENDPOINT_SECONDS
+
+# (network, pool_address, endpoint, aggregate)
+SeriesKey = Tuple[str, str, str, int]
+
+# Fetches one page of raw API rows: (limit, before_timestamp) -> [[ts, o, h, l, c, v], ...] or None
+PageFetcher = Callable[[int, Optional[int]], Awaitable[Optional[List[Sequence[float]]]]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    network TEXT NOT NULL,
+    pool TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    aggregate INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume REAL NOT NULL,
+    PRIMARY KEY (network, pool, endpoint, aggregate, ts)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS series (
+    network TEXT NOT NULL,
+    pool TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    aggregate INTEGER NOT NULL,
+    backfill_complete INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (network, pool, endpoint, aggregate)
+) WITHOUT ROWID;
+"""
+
+class CandleStore:
+    """
+    Persistent candle history per pool and timeframe in an embedded SQLite file.
+
+    A series is backfilled once using `before_timestamp` pagination (up to
+    `page_size` candles per request) until the requested depth is stored or
+    the pool's history runs out. After that, syncing only requests the
+    candles newer than the last stored one; the still-forming candle is
+    overwritten on every sync.
+    """
+
+    def __init__(self, path: str = CANDLE_STORE_SETTINGS["path"]):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._sync_locks: Dict[SeriesKey, asyncio.Lock] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={CANDLE_STORE_SETTINGS['mmap_bytes']}")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        """Close the database connection."""
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def write(self, key: SeriesKey, rows: Sequence[Sequence[float]]):
+        """
+        Insert or replace raw candles for a series.
+
+        Args:
+            key: Series key (network, pool_address, endpoint, aggregate)
+            rows: Raw API rows [timestamp, open, high, low, close, volume]
+        """
+        if not rows:
+            return
+        params = [(*key, int(row[0]), float(row[1]), float(row[2]), float(row[3]),
+                   float(row[4]), float(row[5])) for row in rows]
+        with self._db_lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", params
+                )
+
+    def mark_backfill_complete(self, key: SeriesKey):
+        """Record that the API has no older candles for a series."""
+        with self._db_lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?, 1)", key
+                )
+
+    def stats(self, key: SeriesKey) -> Tuple[int, Optional[int], Optional[int], bool]:
+        """
+        Get the stored size of a series.
+
+        Returns:
+            Tuple of (count, oldest_timestamp, newest_timestamp, backfill_complete)
+        """
+        with self._db_lock:
+            conn = self._connect()
+            count, oldest, newest = conn.execute(
+                "SELECT COUNT(*), MIN(ts), MAX(ts) FROM candles "
+                "WHERE network = ? AND pool = ? AND endpoint = ? AND aggregate = ?", key
+            ).fetchone()
+            complete = conn.execute(
+                "SELECT backfill_complete FROM series "
+                "WHERE network = ? AND pool = ? AND endpoint = ? AND aggregate = ?", key
+            ).fetchone()
+        return count, oldest, newest, bool(complete and complete[0])
+
+    def read(self, key: SeriesKey, limit: int) -> Optional[pd.DataFrame]:
+        """
+        Read the most recent candles of a series.
+
+        Args:
+            key: Series key (network, pool_address, endpoint, aggregate)
+            limit: Maximum number of candles to return
+
+        Returns:
+            DataFrame indexed by timestamp (oldest first) or None if the series is empty
+        """
+        with self._db_lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT ts, open, high, low, close, volume FROM candles "
+                "WHERE network = ? AND pool = ? AND endpoint = ? AND aggregate = ? "
+                "ORDER BY ts DESC LIMIT ?", (*key, limit)
+            ).fetchall()
+
+        if not rows:
+            return None
+
+        data = np.array(rows[::-1], dtype=float)
+        df = pd.DataFrame(data[:, 1:], columns=['open', 'high', 'low', 'close', 'volume'],
+                          index=pd.to_datetime(data[:, 0].astype(np.int64), unit='s'))
+        df.index.name = 'timestamp'
+        return df
+
+    async def _backfill(self, key: SeriesKey, before: Optional[int], needed: int,
+                        fetch_page: PageFetcher) -> bool:
+        """
+        Page backwards from `before` until `needed` candles were stored or history ran out.
+
+        Returns:
+            False if a page request failed
+        """
+        page_size = CANDLE_STORE_SETTINGS["page_size"]
+        for _ in range(CANDLE_STORE_SETTINGS["max_backfill_pages"]):
+            if needed <= 0:
+                return True
+            rows = await fetch_page(page_size, before)
+            if rows is None:
+                return False
+            await asyncio.to_thread(self.write, key, rows)
+            if len(rows) < page_size:
+                await asyncio.to_thread(self.mark_backfill_complete, key)
+                return True
+            needed -= len(rows)
+            before = int(min(row[0] for row in rows))
+        return True
+
+    async def sync(self, key: SeriesKey, depth: int, fetch_page: PageFetcher) -> bool:
+        """
+        Bring a series up to date and make sure at least `depth` candles are stored.
+
+        Args:
+            key: Series key (network, pool_address, endpoint, aggregate)
+            depth: Number of candles the caller needs
+            fetch_page: Coroutine fetching one page of raw rows from the API
+
+        Returns:
+            False if an API request failed (stored data is still readable)
+        """
+        lock = self._sync_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            count, oldest, newest, complete = await asyncio.to_thread(self.stats, key)
+
+            if count == 0:
+                logging.info(f"Backfilling candle history for {key}")
+                return await self._backfill(key, None, depth, fetch_page)
+
+            # Fetch everything from the last stored (possibly still forming) candle onwards
+            interval = ENDPOINT_SECONDS.get(key[2], 3600) * key[3]
+            missing = int((time.time() - newest) // interval) + 1
+            page_size = CANDLE_STORE_SETTINGS["page_size"]
+            rows = await fetch_page(min(missing + 1, page_size), None)
+            if rows is None:
+                return False
+            await asyncio.to_thread(self.write, key, rows)
+
+            # A gap longer than one page is filled by paging back to the stored data
+            if rows and missing >= page_size:
+                page_oldest = int(min(row[0] for row in rows))
+                if page_oldest > newest:
+                    gap = int((page_oldest - newest) // interval)
+                    if not await self._backfill(key, page_oldest, gap, fetch_page):
+                        return False
+                    count, oldest, newest, complete = await asyncio.to_thread(self.stats, key)
+
+            if count < depth and not complete:
+                logging.info(f"Extending candle history for {key} ({count}/{depth})")
+                return await self._backfill(key, oldest, depth - count, fetch_page)
+
+            return True
+
+    async def load(self, key: SeriesKey, depth: int, fetch_page: PageFetcher) -> Optional[pd.DataFrame]:
+        """
+        Sync a series and read its most recent `depth` candles.
+
+        Args:
+            key: Series key (network, pool_address, endpoint, aggregate)
+            depth: Number of candles to return
+            fetch_page: Coroutine fetching one page of raw rows from the API
+
+        Returns:
+            DataFrame with OHLCV data or None if nothing is stored
+        """
+        if not await self.sync(key, depth, fetch_page):
+            logging.warning(f"Candle sync failed for {key}, serving stored history")
+        return await asyncio.to_thread(self.read, key, depth)
+
+candle_store = CandleStore()
@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from config import CHART_SETTINGS, CHART_CACHE_SETTINGS
+from metrics import registry, hit_ratio
+
+# (pool_address, token_address, timeframe, last_candle, render_settings)
+ChartKey = Tuple[str, str, str, Tuple[int, float, float], str]
+
+@dataclass
+class CachedChart:
+    key: ChartKey
+    image: bytes
+    caption: str
+    file_id: Optional[str] = None  # Telegram file_id once the image has been uploaded
+
+def render_settings_fingerprint() -> str:
+    """Short hash of the settings that affect how a chart is drawn."""
+    return hashlib.sha1(repr(sorted(CHART_SETTINGS.items())).encode()).hexdigest()[:12]
+
+def chart_key(pool_address: str, token_address: str, timeframe: str, df: pd.DataFrame) -> ChartKey:
+    """
+    Build the cache key for a chart of the given candles.
+
+    The last candle is identified by its timestamp plus its close and volume,
+    so a chart is re-rendered when a new candle opens or the forming one moves.
+
+    Args:
+        pool_address: Pool that served the data
+        token_address: Token address (used in the chart title)
+        timeframe: Chart timeframe
+        df: DataFrame with OHLCV data, oldest first
+
+    Returns:
+        Chart cache key
+    """
+    last = df.iloc[-1]
+    last_candle = (int(df.index[-1].timestamp()), float(last['close']), float(last['volume']))
+    return (pool_address, token_address, timeframe, last_candle, render_settings_fingerprint())
+
+class ChartCache:
+    """
+    LRU cache of rendered charts, bounded by total image size.
+
+    Identical charts requested concurrently are rendered once. After the
+    first upload, the Telegram file_id is stored so repeat requests can send
+    the photo by reference without re-rendering or re-uploading it.
+    """
+
+    def __init__(self, max_bytes: int = CHART_CACHE_SETTINGS["max_bytes"]):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[ChartKey, CachedChart]" = OrderedDict()
+        self._size = 0
+        self._rendering: Dict[ChartKey, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: ChartKey) -> Optional[CachedChart]:
+        """Look up a chart and mark it as recently used."""
+        chart = self._entries.get(key)
+        if chart is not None:
+            self._entries.move_to_end(key)
+        return chart
+
+    def put(self, chart: CachedChart):
+        """Store a chart, evicting least recently used charts if over budget."""
+        old = self._entries.pop(chart.key, None)
+        if old is not None:
+            self._size -= len(old.image)
+        self._entries[chart.key] = chart
+        self._size += len(chart.image)
+
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.image)
+
+    def set_file_id(self, key: ChartKey, file_id: Optional[str]):
+        """Remember (or forget, with None) the Telegram file_id of an uploaded chart."""
+        chart = self._entries.get(key)
+        if chart is not None:
+            chart.file_id = file_id
+
+    async def get_or_render(self, key: ChartKey,
+                            render: Callable[[], Awaitable[Tuple[bytes, str]]]) -> CachedChart:
+        """
+        Return a cached chart or render it, sharing one render between concurrent callers.
+
+        If the caller doing the render is cancelled, the callers waiting on
+        it render the chart themselves instead of being cancelled as well.
+
+        Args:
+            key: Chart cache key
+            render: Coroutine factory returning (image_bytes, caption)
+
+        Returns:
+            CachedChart for the key
+        """
+        while True:
+            chart = self.get(key)
+            if chart is not None:
+                self.hits += 1
+                return chart
+
+            pending = self._rendering.get(key)
+            if pending is None:
+                break
+            try:
+                chart = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The caller rendering it was cancelled, not us: render it ourselves
+                continue
+            self.hits += 1
+            return chart
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._rendering[key] = future
+        try:
+            image, caption = await render()
+            chart = CachedChart(key, image, caption)
+            self.put(chart)
+            future.set_result(chart)
+            return chart
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; mark it retrieved in case there are none
+            future.exception()
+            raise
+        finally:
+            self._rendering.pop(key, None)
+
+chart_cache = ChartCache()
+
+registry.callback("chart_cache_requests_total", "Chart cache lookups by result",
+                  lambda: {("hit",): chart_cache.hits, ("miss",): chart_cache.misses},
+                  kind="counter", labelnames=("result",))
+registry.callback("chart_cache_hit_ratio", "Share of charts served without rendering",
+                  lambda: hit_ratio(chart_cache.hits, chart_cache.misses))
+registry.callback("chart_cache_entries", "Rendered charts held in memory", lambda: len(chart_cache))
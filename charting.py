@@ -1,29 +1,171 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import mplfinance as mpf
-import matplotlib.dates as mdates
-from matplotlib.figure import Figure
-from matplotlib.gridspec import GridSpec
+import io
 import os
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
+from config import CHART_SETTINGS, CHART_DIR, CHART_DEBUG
 from indicators import add_indicators, plot_rsi, plot_macd, get_indicator_signals
-from support_resistance import detect_support_resistance, plot_support_resistance
+from support_resistance import detect_levels, find_pivots, plot_support_resistance
+from patterns import Pattern, detect_patterns, recent_patterns, format_patterns, plot_patterns
+from metrics import span
+
+# matplotlib, mplfinance and the template renderer are imported inside the drawing
+# functions: they take over a second to load, and the bot process only needs the
+# light helpers in this module (render workers import everything when they start)
+
+def _encode_chart(token_address: str, timeframe: str, suffix: str = "") -> bytes:
+    """
+    Encode the current pyplot figure as PNG in memory and close it.
+    
+    In debug mode the image is also written to CHART_DIR.
+    
+    Args:
+        token_address: Token address
+        timeframe: Chart timeframe
+        suffix: Optional file name suffix for debug output (e.g. "_error")
+        
+    Returns:
+        PNG image bytes
+    """
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    with span("encode"):
+        plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+    plt.close()
+    image = buffer.getvalue()
+    
+    if CHART_DEBUG:
+        _write_debug_image(image, token_address, timeframe, suffix)
+    
+    return image
+
+def _write_debug_image(image: bytes, token_address: str, timeframe: str, suffix: str = ""):
+    """Write a rendered chart to CHART_DIR (debug mode only)."""
+    os.makedirs(CHART_DIR, exist_ok=True)
+    img_path = os.path.join(CHART_DIR, f"chart_{token_address[:8]}_{timeframe}{suffix}.png")
+    with open(img_path, 'wb') as f:
+        f.write(image)
+
+INSUFFICIENT_DATA_SIGNALS = {
+    'RSI': 'Neutral (nan)',
+    'MACD': 'Insufficient Data',
+    'Trend': 'Insufficient Data'
+}
+
+ERROR_SIGNALS = {
+    'RSI': 'Error',
+    'MACD': 'Error',
+    'Trend': 'Error'
+}
+
+def prepare_chart_data(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[float], List[float], List[Pattern], Dict[str, str]]:
+    """
+    Compute everything a chart shows: indicators, signals, support/resistance and patterns.
+    
+    Args:
+        df: DataFrame with OHLCV data (full history, oldest first)
+        
+    Returns:
+        Tuple of (window_df, support_levels, resistance_levels, patterns, signals_dict) where
+        window_df is the most recent window with indicator columns and patterns
+        are indexed by position in window_df
+    """
+    # Add indicators over the full history so long periods (e.g. SMA 200) are warmed up
+    with span("indicators"):
+        df = add_indicators(df)
+        
+        # Get signals
+        signals = get_indicator_signals(df)
+    
+    # Only the most recent window is plotted
+    df = df.iloc[-CHART_SETTINGS["window_size"]:].copy()
+    
+    # Detect support and resistance levels; the pivots are shared with pattern detection
+    highs = df['high'].to_numpy(dtype=float)
+    lows = df['low'].to_numpy(dtype=float)
+    with span("support_resistance"):
+        pivots = find_pivots(highs, lows)
+        support, resistance = detect_levels(df, pivots=pivots)
+    support_levels = [level.price for level in support]
+    resistance_levels = [level.price for level in resistance]
+    
+    # Detect chart patterns that are still relevant
+    with span("patterns"):
+        patterns = detect_patterns(highs, lows, tolerance=CHART_SETTINGS["pattern_tolerance"],
+                                   min_score=CHART_SETTINGS["pattern_min_score"], pivots=pivots)
+    patterns = recent_patterns(patterns, len(df), CHART_SETTINGS["pattern_recent"])[:CHART_SETTINGS["pattern_max"]]
+    signals['Patterns'] = format_patterns(patterns)
+    
+    return df, support_levels, resistance_levels, patterns, signals
+
+def chart_title(token_address: str, timeframe: str, pool_name: Optional[str] = None,
+                token_symbol: Optional[str] = None) -> str:
+    """Build the chart title for a token, using a shortened address if the symbol is unknown."""
+    title = f"{token_symbol or token_address[:5] + '...'} ({timeframe}) - Solana SPL Token"
+    if pool_name:
+        title += f" - {pool_name}"
+    return title
+
+def render_token_chart(df: pd.DataFrame, token_address: str, timeframe: str = "1h",
+                       pool_name: str = None, token_symbol: str = None) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Render a token chart with the fast prebuilt-template renderer.
+    
+    Produces the same four panels as generate_token_chart without pyplot,
+    mplfinance or layout passes.
+    
+    Args:
+        df: DataFrame with OHLCV data
+        token_address: Token address
+        timeframe: Chart timeframe (e.g., "1h", "4h", "1d")
+        pool_name: Name of the liquidity pool (optional)
+        token_symbol: Token symbol for the title (optional)
+        
+    Returns:
+        Tuple of (png_bytes, signals_dict)
+    """
+    from renderer import get_template, render_message_image
+
+    if df.empty or len(df) < 5:  # Require at least 5 data points
+        return render_message_image("Insufficient data to generate chart"), dict(INSUFFICIENT_DATA_SIGNALS)
+    
+    window_df, support_levels, resistance_levels, patterns, signals = prepare_chart_data(df)
+    
+    try:
+        image = get_template().render(window_df, chart_title(token_address, timeframe, pool_name, token_symbol),
+                                      support_levels, resistance_levels, patterns)
+    except Exception as e:
+        return render_message_image(f"Error generating chart: {str(e)}", fontsize=12), dict(ERROR_SIGNALS)
+    
+    if CHART_DEBUG:
+        _write_debug_image(image, token_address, timeframe)
+    
+    return image, signals
 
 def generate_token_chart(df: pd.DataFrame, token_address: str, timeframe: str = "1h",
-                         pool_name: str = None) -> Tuple[str, Dict[str, str]]:
+                         pool_name: str = None, token_symbol: str = None) -> Tuple[bytes, Dict[str, str]]:
     """
-    Generate a comprehensive chart for a token with indicators.
+    Generate a comprehensive chart for a token with indicators using mplfinance.
+    
+    This is the original pyplot-based renderer; render_token_chart is the
+    faster equivalent used by default.
     
     Args:
         df: DataFrame with OHLCV data
         token_address: Token address
         timeframe: Chart timeframe (e.g., "1h", "4h", "1d")
         pool_name: Name of the liquidity pool (optional)
+        token_symbol: Token symbol for the title (optional)
         
     Returns:
-        Tuple of (image_path, signals_dict)
+        Tuple of (png_bytes, signals_dict)
     """
+    import matplotlib.pyplot as plt
+    import mplfinance as mpf
+    import matplotlib.dates as mdates
+    from matplotlib.gridspec import GridSpec
+
     # Check if we have enough data
     if df.empty or len(df) < 5:  # Require at least 5 data points
         # Create a basic chart with a message
@@ -32,28 +174,13 @@ def generate_token_chart(df: pd.DataFrame, token_address: str, timeframe: str =
                  horizontalalignment='center', verticalalignment='center', fontsize=14)
         plt.axis('off')
         
-        # Save chart
-        os.makedirs('charts', exist_ok=True)
-        img_path = f"charts/chart_{token_address[:8]}.png"
-        plt.savefig(img_path, dpi=100, bbox_inches='tight')
-        plt.close()
+        # Encode chart
+        image = _encode_chart(token_address, timeframe)
         
         # Return minimal signals
-        signals = {
-            'RSI': 'Neutral (nan)',
-            'MACD': 'Insufficient Data',
-            'Trend': 'Insufficient Data'
-        }
-        return img_path, signals
-    
-    # Add indicators
-    df = add_indicators(df)
+        return image, dict(INSUFFICIENT_DATA_SIGNALS)
     
-    # Detect support and resistance levels
-    support_levels, resistance_levels = detect_support_resistance(df)
-    
-    # Get signals
-    signals = get_indicator_signals(df)
+    df, support_levels, resistance_levels, patterns, signals = prepare_chart_data(df)
     
     # Create figure with subplots
     fig = plt.figure(figsize=(12, 10), constrained_layout=True)
@@ -63,51 +190,51 @@ def generate_token_chart(df: pd.DataFrame, token_address: str, timeframe: str =
     ax1 = fig.add_subplot(gs[0])
     
     # Set title and labels
-    token_symbol = token_address[:5] + "..."  # Placeholder for token symbol
-    title = f"{token_symbol} ({timeframe}) - Solana SPL Token"
-    if pool_name:
-        title += f" - {pool_name}"
-    ax1.set_title(title, fontsize=14)
+    ax1.set_title(chart_title(token_address, timeframe, pool_name, token_symbol), fontsize=14)
     ax1.set_ylabel('Price')
     ax1.grid(True, alpha=0.3)
     
     try:
-        # Plot candlesticks
-        mpf.plot(df, type='candle', style='yahoo', ax=ax1, volume=False, show_nontrading=False)
+        with span("draw"):
+            # Plot candlesticks
+            mpf.plot(df, type='candle', style='yahoo', ax=ax1, volume=False, show_nontrading=False)
+        
+            # Add moving averages if available
+            if not df['sma_20'].isna().all():
+                ax1.plot(df.index, df['sma_20'], color='blue', linewidth=1, label='SMA 20')
+            if not df['sma_50'].isna().all():
+                ax1.plot(df.index, df['sma_50'], color='orange', linewidth=1, label='SMA 50')
         
-        # Add moving averages if available
-        if not df['sma_20'].isna().all():
-            ax1.plot(df.index, df['sma_20'], color='blue', linewidth=1, label='SMA 20')
-        if not df['sma_50'].isna().all():
-            ax1.plot(df.index, df['sma_50'], color='orange', linewidth=1, label='SMA 50')
+            # Add Bollinger Bands if available
+            if not df['bb_upper'].isna().all():
+                ax1.plot(df.index, df['bb_upper'], 'k--', alpha=0.3)
+                ax1.plot(df.index, df['bb_middle'], 'k-', alpha=0.3)
+                ax1.plot(df.index, df['bb_lower'], 'k--', alpha=0.3)
         
-        # Add Bollinger Bands if available
-        if not df['bb_upper'].isna().all():
-            ax1.plot(df.index, df['bb_upper'], 'k--', alpha=0.3)
-            ax1.plot(df.index, df['bb_middle'], 'k-', alpha=0.3)
-            ax1.plot(df.index, df['bb_lower'], 'k--', alpha=0.3)
+            # Add support and resistance levels
+            plot_support_resistance(ax1, support_levels, resistance_levels, df.index[0], df.index[-1])
         
-        # Add support and resistance levels
-        plot_support_resistance(ax1, support_levels, resistance_levels, df.index[0], df.index[-1])
+            # Outline detected chart patterns
+            plot_patterns(ax1, patterns, df.index)
         
-        ax1.legend(loc='upper left')
+            ax1.legend(loc='upper left')
         
-        # Volume subplot
-        ax2 = fig.add_subplot(gs[1], sharex=ax1)
-        mpf.plot(df, type='candle', style='yahoo', ax=ax2, volume=ax2, show_nontrading=False)
-        ax2.set_ylabel('Volume')
+            # Volume subplot
+            ax2 = fig.add_subplot(gs[1], sharex=ax1)
+            mpf.plot(df, type='candle', style='yahoo', ax=ax2, volume=ax2, show_nontrading=False)
+            ax2.set_ylabel('Volume')
         
-        # RSI subplot
-        ax3 = fig.add_subplot(gs[2], sharex=ax1)
-        plot_rsi(ax3, df)
+            # RSI subplot
+            ax3 = fig.add_subplot(gs[2], sharex=ax1)
+            plot_rsi(ax3, df)
         
-        # MACD subplot
-        ax4 = fig.add_subplot(gs[3], sharex=ax1)
-        plot_macd(ax4, df)
+            # MACD subplot
+            ax4 = fig.add_subplot(gs[3], sharex=ax1)
+            plot_macd(ax4, df)
         
-        # Format x-axis dates
-        ax4.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d %H:%M'))
-        plt.xticks(rotation=45)
+            # Format x-axis dates
+            ax4.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d %H:%M'))
+            plt.xticks(rotation=45)
         
     except Exception as e:
         # If plotting fails, add error message to the chart
@@ -115,42 +242,37 @@ def generate_token_chart(df: pd.DataFrame, token_address: str, timeframe: str =
         plt.text(0.5, 0.5, f"Error generating chart: {str(e)}",
                  horizontalalignment='center', verticalalignment='center', fontsize=12)
         plt.axis('off')
-        # Save error chart
-        os.makedirs('charts', exist_ok=True)
-        img_path = f"charts/chart_{token_address[:8]}_error.png"
-        plt.savefig(img_path, dpi=100, bbox_inches='tight')
-        plt.close()
-        return img_path, {
-            'RSI': 'Error',
-            'MACD': 'Error',
-            'Trend': 'Error'
-        }
+        # Encode error chart
+        image = _encode_chart(token_address, timeframe, suffix="_error")
+        return image, dict(ERROR_SIGNALS)
     
     # Adjust layout
     plt.tight_layout()
     
-    # Create directory if it doesn't exist
-    os.makedirs('charts', exist_ok=True)
+    # Encode chart
+    image = _encode_chart(token_address, timeframe)
     
-    # Save chart
-    img_path = f"charts/chart_{token_address[:8]}.png"
-    plt.savefig(img_path, dpi=100, bbox_inches='tight')
-    plt.close()
-    
-    return img_path, signals
+    return image, signals
 
-def format_signals_text(signals: Dict[str, str], token_address: str) -> str:
+def format_signals_text(signals: Dict[str, str], token_address: str, token_symbol: Optional[str] = None) -> str:
     """
     Format signals dictionary into a readable text.
     
     Args:
         signals: Dictionary of signals
         token_address: Token address
+        token_symbol: Token symbol (optional)
         
     Returns:
         Formatted text
     """
-    text = f"*Analysis for {token_address[:8]}...*\n\n"
+    if token_symbol:
+        from telegram.helpers import escape_markdown
+        
+        # Markdown can't escape inside an entity, so the symbol stays outside the bold span
+        text = f"*Analysis for* {escape_markdown(token_symbol)} ({token_address[:8]}...)\n\n"
+    else:
+        text = f"*Analysis for {token_address[:8]}...*\n\n"
     
     # First display pool information if available
     pool_info = []
@@ -9,31 +9,225 @@ TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 if not TELEGRAM_TOKEN:
     raise ValueError("TELEGRAM_TOKEN environment variable is not set")
 
+# How the bot receives updates: "polling" (getUpdates long polling) or "webhook"
+BOT_SETTINGS = {
+    "mode": os.getenv("BOT_MODE", "polling"),
+    "concurrent_updates": int(os.getenv("CONCURRENT_UPDATES", "256")),  # Updates handled at once per process
+    # Bot API endpoints; point these at a local fake Bot API for testing
+    "api_base": os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org/bot"),
+    "file_base": os.getenv("TELEGRAM_FILE_BASE", "https://api.telegram.org/file/bot"),
+}
+
+# Webhook mode: Telegram POSTs updates to `url`, which must reach host:port/path
+WEBHOOK_SETTINGS = {
+    "url": os.getenv("WEBHOOK_URL"),  # Public HTTPS URL, e.g. https://bot.example.com/telegram
+    "host": os.getenv("WEBHOOK_HOST", "0.0.0.0"),
+    "port": int(os.getenv("WEBHOOK_PORT", "8443")),
+    "path": os.getenv("WEBHOOK_PATH", "/telegram"),
+    "secret_token": os.getenv("WEBHOOK_SECRET"),  # Checked against the X-Telegram-Bot-Api-Secret-Token header
+    "workers": int(os.getenv("WEBHOOK_WORKERS", "1")),  # Processes sharing the port (SO_REUSEPORT)
+    "max_connections": int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40")),  # Parallel deliveries from Telegram
+    # Behind a load balancer, let only one instance register the webhook
+    "register": os.getenv("WEBHOOK_REGISTER", "true").lower() == "true",
+    "drop_pending_updates": os.getenv("WEBHOOK_DROP_PENDING", "false").lower() == "true",
+}
+
+# Bot processes on this host. They share one IP (so one API rate limit) and the CPUs,
+# so per-process budgets below are the configured totals divided by this
+BOT_PROCESSES = max(1, WEBHOOK_SETTINGS["workers"]) if BOT_SETTINGS["mode"] == "webhook" else 1
+
+# Process startup: heavy modules (scipy, matplotlib) are imported on first use. With
+# prewarm they are loaded, and the render workers started, in the background once the
+# bot is up, so the first chart doesn't pay for them
+STARTUP_SETTINGS = {
+    "prewarm": os.getenv("PREWARM", "true").lower() == "true",
+    "import_budget_ms": float(os.getenv("IMPORT_BUDGET_MS", "1000")),  # Warn when importing the bot takes longer
+}
+
 # GeckoTerminal API Base URL
 GECKO_API_BASE = os.getenv("GECKO_API_BASE", "https://api.geckoterminal.com/api/v2")
 
+# Shared async HTTP client settings (timeouts in seconds)
+HTTP_SETTINGS = {
+    "timeout": float(os.getenv("HTTP_TIMEOUT", "10")),  # Per-request read/write/pool timeout
+    "connect_timeout": float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+    "max_connections": 20,
+    "max_keepalive_connections": 10,
+    "keepalive_expiry": 30,  # Seconds an idle pooled connection is kept open
+    "http2": True,  # Used only when the optional `h2` package is installed
+}
+
 # Timeframes available for charts
 # The API supports 'minute', 'hour', 'day' with an aggregate parameter
 TIMEFRAMES = {
     "1h": {"name": "1 Hour", "endpoint": "hour", "aggregate": 1},
+    "2h": {"name": "2 Hours", "endpoint": "hour", "aggregate": 2},
     "4h": {"name": "4 Hours", "endpoint": "hour", "aggregate": 4},
+    "8h": {"name": "8 Hours", "endpoint": "hour", "aggregate": 8},
+    "12h": {"name": "12 Hours", "endpoint": "hour", "aggregate": 12},
     "1d": {"name": "1 Day", "endpoint": "day", "aggregate": 1},
+    "3d": {"name": "3 Days", "endpoint": "day", "aggregate": 3},
     "1w": {"name": "1 Week", "endpoint": "day", "aggregate": 7}
 }
 
+# Seconds per candle for each OHLCV endpoint
+ENDPOINT_SECONDS = {"minute": 60, "hour": 3600, "day": 86400}
+
+# Build aggregated timeframes locally from the base (aggregate=1) candles of their
+# endpoint instead of requesting each aggregate from the API separately. Only done
+# for periods that divide a day (2h-12h); a base series shorter than a chart needs
+# (window plus indicator warm-up, times the aggregate) is backfilled once first
+DERIVE_TIMEFRAMES = os.getenv("DERIVE_TIMEFRAMES", "true").lower() == "true"
+
 # Default timeframe
 DEFAULT_TIMEFRAME = "1h"
 
+# GeckoTerminal rate limit (free tier: 30 calls per minute) and retry policy. The
+# limits are for the whole host; each of the BOT_PROCESSES gets an equal share
+API_RATE_LIMIT = {
+    "calls_per_minute": float(os.getenv("API_CALLS_PER_MINUTE", "30")) / BOT_PROCESSES,
+    "burst": max(1, int(os.getenv("API_BURST", "5")) // BOT_PROCESSES),  # Calls that may be sent back to back
+    "max_retries": 3,  # Retries for 429/5xx responses and transport errors
+    "backoff_base": 1.0,  # Seconds, doubled on every retry
+    "backoff_max": 30.0,
+}
+
+# OHLCV pool fallback: the best pool is tried first and the next one is started as a hedge
+# when it is slow or fails; pools that keep failing are skipped by a circuit breaker
+POOL_FALLBACK_SETTINGS = {
+    "max_pools": 3,  # Pools tried per request
+    "hedge": os.getenv("POOL_HEDGING", "true").lower() == "true",
+    "hedge_delay": 1.0,  # Seconds before hedging a pool without latency history (also the upper bound)
+    "hedge_delay_min": 0.25,
+    "hedge_latency_factor": 3.0,  # Hedge once a pool takes this many times its typical fetch time
+    "min_candles": 20,  # Fewer candles count as a failure (still used if no pool returns more)
+    "failure_threshold": 3,  # Consecutive failures that open a pool's breaker
+    "cooldown": 60,  # Seconds an open breaker skips the pool, doubled on every failed probe
+    "max_cooldown": 900,
+    "max_tracked": 10000,  # Pools whose health is remembered
+}
+
+# Composite candles: merge the token's top pools into one series instead of charting a single pool
+COMPOSITE_SETTINGS = {
+    "enabled": os.getenv("COMPOSITE_CANDLES", "false").lower() == "true",
+    "max_pools": int(os.getenv("COMPOSITE_POOLS", "3")),
+    "weighting": os.getenv("COMPOSITE_WEIGHTING", "liquidity"),  # "liquidity" (reserve_in_usd) or "volume" (per candle)
+    "min_share": 0.02,  # Pools with less of the top pools' combined liquidity are left out
+}
+
+# Seconds a resolved token context (metadata + ranked pools) is reused
+TOKEN_CONTEXT_TTL = int(os.getenv("TOKEN_CONTEXT_TTL", "300"))
+
+# In-memory OHLCV cache: entries stay fresh for a fraction of the candle interval
+# (clamped to min/max TTL) and may be served stale up to stale_factor x TTL while refreshing
+OHLCV_CACHE_SETTINGS = {
+    "max_bytes": int(os.getenv("OHLCV_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    "ttl_fraction": 0.05,
+    "min_ttl": 30,
+    "max_ttl": 900,
+    "stale_factor": 10,
+}
+
 # Chart settings
 CHART_SETTINGS = {
     "window_size": 100,  # Number of candles to show (increased from 50)
+    "history_size": 300,  # Candles loaded for indicator warm-up (enough for SMA 200)
+    "indicator_warmup": 50,  # Candles before the window the plotted indicators need (SMA 50)
     "support_resistance_window": 5,  # Window for support/resistance detection
     "support_resistance_threshold": 0.02,  # Threshold for support/resistance clustering
+    "pattern_tolerance": 0.03,  # Relative tolerance for "equal" peaks and "flat" trendlines
+    "pattern_min_score": 0.5,  # Minimum score (0..1) for a chart pattern to be reported
+    "pattern_recent": 30,  # Patterns must end within this many candles of the latest one
+    "pattern_max": 3,  # Most patterns shown per chart
+    "renderer": os.getenv("CHART_RENDERER", "fast"),  # "fast" (prebuilt Agg template) or "mplfinance"
+    "png_colors": int(os.getenv("CHART_PNG_COLORS", "256")),  # Palette size of fast-renderer PNGs (0 for truecolor)
+    "png_compress_level": 6,  # zlib level 0-9; 9 is ~2x slower for a few percent
+}
+
+# Rendered chart cache (PNG bytes + Telegram file_id per distinct chart)
+CHART_CACHE_SETTINGS = {
+    "max_bytes": int(os.getenv("CHART_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+}
+
+# Chart rendering pool settings. RENDER_WORKERS is the total for the host, split
+# between the BOT_PROCESSES
+RENDER_SETTINGS = {
+    "workers": max(1, int(os.getenv("RENDER_WORKERS", str(max(1, (os.cpu_count() or 2) - 1)))) // BOT_PROCESSES),
+    "max_queue": int(os.getenv("RENDER_MAX_QUEUE", "32")),  # Max charts waiting or rendering at once
+}
+
+# Persistent candle history (embedded SQLite database)
+CANDLE_STORE_SETTINGS = {
+    "path": os.getenv("CANDLE_STORE_PATH", os.path.join("data", "candles.sqlite3")),
+    "page_size": 1000,  # API maximum candles per OHLCV request
+    "max_backfill_pages": 10,
+    "mmap_bytes": 256 * 1024 * 1024,
+}
+
+# Background alert engine
+ALERT_SETTINGS = {
+    # Run the checker in this instance; with several instances enable it in exactly one
+    "enabled": os.getenv("ALERTS_ENABLED", "true").lower() == "true",
+    "path": os.getenv("ALERT_STORE_PATH", os.path.join("data", "alerts.json")),
+    "close_grace": 15,  # Seconds after a candle closes before checking (API ingestion delay)
+    "retry_interval": 30,  # Seconds between re-checks while a closed candle hasn't shown up yet
+    "max_retries": 3,  # Re-checks per candle before waiting for the next close (pools without trades)
+    "max_concurrency": 8,  # Watches fetched in parallel per batch
+    "max_per_chat": 20,
+    "reload_interval": 10,  # Seconds between checks for subscriptions saved by other processes
+}
+
+# Speculative rendering of a token's other timeframes after /chart, so timeframe buttons answer from cache
+PREFETCH_SETTINGS = {
+    "enabled": os.getenv("PREFETCH_ENABLED", "true").lower() == "true",
+    "max_concurrency": 1,  # Prefetched charts fetched/rendered at once across all chats
+    "reserve_tokens": 2,  # Rate-limit tokens left for interactive requests before prefetching
+    "time_limit": 120,  # Seconds after /chart before the remaining timeframes are dropped
+    "poll_interval": 0.25,  # Seconds between checks for an idle scheduler and render pool
+}
+
+# /scan watchlist scanner
+SCAN_SETTINGS = {
+    "max_concurrency": 8,  # Tokens resolved and fetched in parallel
+    "max_tokens": 50,
+    "near_support": 0.03,  # Close within 3% above a support level counts as "near support"
+    "update_interval": 2.0,  # Seconds between progress edits of the results message
+}
+
+# Local HTTP server for operational endpoints (Prometheus metrics on /metrics)
+HTTP_SERVER_SETTINGS = {
+    "enabled": os.getenv("HTTP_SERVER_ENABLED", "true").lower() == "true",
+    "host": os.getenv("HTTP_SERVER_HOST", "127.0.0.1"),
+    "port": int(os.getenv("HTTP_SERVER_PORT", "9464")),
+    "idle_timeout": 30,  # Seconds a keep-alive connection may sit idle
+    "read_timeout": 10,  # Seconds to receive the rest of a request
+    "max_body": 1024 * 1024,
+}
+
+# JSON/PNG API for a web dashboard, served by the local HTTP server above
+DASHBOARD_SETTINGS = {
+    "enabled": os.getenv("DASHBOARD_ENABLED", "false").lower() == "true",
+    "cors_origin": os.getenv("DASHBOARD_CORS_ORIGIN"),  # Access-Control-Allow-Origin value, e.g. https://dash.example.com
+    "max_candles": 1000,  # Most candles returned by /api/ohlcv
+    "analysis_cache_entries": 256,  # Encoded /api/analysis responses kept in memory
 }
 
 # File paths
+# Charts are rendered in memory; set CHART_DEBUG=true to also write every PNG to CHART_DIR
 CHART_DIR = "charts"
-os.makedirs(CHART_DIR, exist_ok=True)
+CHART_DEBUG = os.getenv("CHART_DEBUG", "false").lower() == "true"
+
+# Solana token list, indexed locally for symbols, names and decimals (see token_index.py)
+SOLANA_TOKEN_LIST_URL = os.getenv(
+    "SOLANA_TOKEN_LIST_URL",
+    "https://raw.githubusercontent.com/solana-labs/token-list/main/src/tokens/solana.tokenlist.json"
+)
 
-# Solana token list URL (for future use to get token metadata)
-SOLANA_TOKEN_LIST_URL = "https://raw.githubusercontent.com/solana-labs/token-list/main/src/tokens/solana.tokenlist.json"
\ No newline at end of file
+TOKEN_INDEX_SETTINGS = {
+    "enabled": os.getenv("TOKEN_INDEX_ENABLED", "true").lower() == "true",
+    "source": os.getenv("TOKEN_LIST_PATH") or SOLANA_TOKEN_LIST_URL,  # Local JSON file or URL of the token list
+    "path": os.getenv("TOKEN_INDEX_PATH", os.path.join("data", "tokens.sqlite3")),
+    "refresh_interval": int(os.getenv("TOKEN_LIST_REFRESH", "86400")),  # Seconds between token list refreshes
+    "download_timeout": 60.0,
+    "mmap_bytes": 64 * 1024 * 1024,
+}
\ No newline at end of file
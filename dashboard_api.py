@@ -0,0 +1,297 @@
+"""
+JSON and PNG endpoints for a web dashboard.
+
+Served by the bot's local HTTP server, so responses come from the same
+token resolver, OHLCV cache, render pool and chart cache as the bot's
+replies. Every endpoint takes `address` and optional `timeframe` query
+parameters:
+
+    GET /api/ohlcv?address=<token>&timeframe=1h[&limit=100]   Candles
+    GET /api/analysis?address=<token>&timeframe=1h             Indicator series, signals, levels, patterns
+    GET /api/chart.png?address=<token>&timeframe=1h            Rendered chart (same image as the bot sends)
+
+Responses carry an ETag derived from the pool and last candle and a
+Last-Modified date from the last candle's timestamp. A request whose
+validators still match is answered with 304 before any indicators are
+computed or charts rendered.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import DASHBOARD_SETTINGS, TIMEFRAMES, DEFAULT_TIMEFRAME, CHART_SETTINGS
+from chart_cache import chart_key, ChartKey
+from charting import prepare_chart_data
+from data_fetcher import resolver, fetch_token_data, get_pool_chart, get_pool_address, TokenContext
+from http_server import HttpServer, Request, Response
+from indicator_engine import INDICATOR_COLUMNS
+from metrics import DASHBOARD_REQUEST_SECONDS, span
+from ohlcv_cache import candle_ttl
+from patterns import Pattern
+from render_pool import RenderQueueFull
+
+JSON_TYPE = "application/json"
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+class ApiError(Exception):
+    """Error answered to the client with an HTTP status and a JSON message."""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+class TokenFrame:
+    """Candles for one token and timeframe, with the pool that served them."""
+
+    def __init__(self, context: TokenContext, timeframe: str, df: pd.DataFrame, pool: Dict[str, Any]):
+        self.context = context
+        self.timeframe = timeframe
+        self.df = df
+        self.pool = pool
+        self.key: ChartKey = chart_key(get_pool_address(pool), context.token_address, timeframe, df)
+
+    @property
+    def last_candle_time(self) -> int:
+        return self.key[3][0]
+
+    def describe(self) -> Dict[str, Any]:
+        """Token, pool and timeframe fields shared by the JSON responses."""
+        return {
+            "token": {"address": self.context.token_address, "symbol": self.context.symbol},
+            "pool": {"address": get_pool_address(self.pool), "name": self.pool.get('attributes', {}).get('name')},
+            "timeframe": self.timeframe,
+        }
+
+def _param(request: Request, name: str, default: Optional[str] = None) -> Optional[str]:
+    values = request.query.get(name)
+    return values[0] if values else default
+
+def _series(values) -> List[Optional[float]]:
+    """Float values as a JSON-ready list with NaN as null."""
+    return [None if math.isnan(value) else value for value in np.asarray(values, dtype=float).tolist()]
+
+def _times(index: pd.DatetimeIndex) -> List[int]:
+    """Candle timestamps as Unix seconds."""
+    return index.as_unit("s").asi8.tolist()
+
+def _encode(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+def _error(status: int, message: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(status, _encode({"error": message}), JSON_TYPE, dict(headers or {}))
+
+async def load_frame(request: Request) -> TokenFrame:
+    """
+    Resolve the token in the request and fetch its candles.
+
+    Args:
+        request: Request with `address` and optional `timeframe` query parameters
+
+    Returns:
+        TokenFrame with the candles
+
+    Raises:
+        ApiError: For invalid parameters, unknown tokens or missing data
+    """
+    address = _param(request, "address", "").strip()
+    timeframe = _param(request, "timeframe", DEFAULT_TIMEFRAME)
+    if not address or len(address) > 64 or not address.isalnum():
+        raise ApiError(400, "Missing or invalid token address")
+    if timeframe not in TIMEFRAMES:
+        raise ApiError(400, f"Unknown timeframe, expected one of: {', '.join(TIMEFRAMES)}")
+
+    context = await resolver.resolve(address)
+    if not context.exists:
+        raise ApiError(404, "Token not found")
+    if not context.pools:
+        raise ApiError(404, "No liquidity pools found for token")
+
+    df, pool = await fetch_token_data(context, timeframe)
+    if df is None or df.empty:
+        raise ApiError(502, "No OHLCV data available from upstream")
+    return TokenFrame(context, timeframe, df, pool)
+
+def entity_tag(frame: TokenFrame, *variant: Any) -> str:
+    """Strong ETag for a representation of the frame's candles (variant distinguishes endpoints and options)."""
+    digest = hashlib.sha1(repr((frame.key,) + variant).encode()).hexdigest()[:24]
+    return f'"{digest}"'
+
+def is_not_modified(request: Request, etag: str, last_modified: int) -> bool:
+    """
+    Evaluate the request's conditional headers.
+
+    If-None-Match takes precedence; If-Modified-Since is only used without it,
+    as RFC 9110 requires. The ETag is the precise validator: the forming
+    candle keeps its timestamp while its close and volume move.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def cache_headers(frame: TokenFrame, etag: str) -> Dict[str, str]:
+    """Validators, plus a max-age matching how long the OHLCV cache treats the candles as fresh."""
+    settings = TIMEFRAMES[frame.timeframe]
+    max_age = int(candle_ttl(settings["endpoint"], settings.get("aggregate", 1)))
+    return {
+        "ETag": etag,
+        "Last-Modified": formatdate(frame.last_candle_time, usegmt=True),
+        "Cache-Control": f"public, max-age={max_age}",
+    }
+
+async def conditional(request: Request, frame: TokenFrame, etag: str,
+                      build: Callable[[], Awaitable[Tuple[bytes, str]]]) -> Response:
+    """Answer 304 if the client's copy is current, otherwise build the body."""
+    headers = cache_headers(frame, etag)
+    if is_not_modified(request, etag, frame.last_candle_time):
+        return Response(304, b"", headers=headers)
+    body, content_type = await build()
+    return Response(200, body, content_type, headers)
+
+def ohlcv_payload(frame: TokenFrame, limit: int) -> Dict[str, Any]:
+    """The most recent `limit` candles, column oriented."""
+    df = frame.df.iloc[-limit:]
+    payload = frame.describe()
+    payload["candles"] = {"time": _times(df.index), **{column: _series(df[column]) for column in OHLCV_COLUMNS}}
+    return payload
+
+def _pattern_payload(pattern: Pattern, times: List[int]) -> Dict[str, Any]:
+    step = times[-1] - times[-2] if len(times) > 1 else 0
+
+    def point(index: float, price: float) -> List[float]:
+        # Trendlines may be projected past the last candle; extend the time axis at the candle interval
+        last = len(times) - 1
+        if index > last:
+            return [times[-1] + round((index - last) * step), price]
+        return [times[max(int(round(index)), 0)], price]
+
+    return {
+        "name": pattern.name,
+        "bias": pattern.bias,
+        "score": round(pattern.score, 3),
+        "start": times[pattern.start],
+        "end": times[pattern.end],
+        "points": [point(index, price) for index, price in pattern.points],
+        "lines": [[point(*start), point(*end)] for start, end in pattern.lines],
+    }
+
+def analysis_payload(frame: TokenFrame) -> Dict[str, Any]:
+    """
+    Indicator series, signals, support/resistance levels and patterns for the chart window.
+
+    Computed exactly as for the rendered chart (prepare_chart_data), so the
+    dashboard and the bot's images always agree.
+    """
+    window_df, support, resistance, patterns, signals = prepare_chart_data(frame.df)
+    times = _times(window_df.index)
+    payload = frame.describe()
+    payload.update({
+        "time": times,
+        "indicators": {column: _series(window_df[column]) for column in INDICATOR_COLUMNS},
+        "signals": signals,
+        "support": support,
+        "resistance": resistance,
+        "patterns": [_pattern_payload(pattern, times) for pattern in patterns],
+    })
+    return payload
+
+class DashboardApi:
+    """
+    Route handlers for the dashboard endpoints.
+
+    Encoded /api/analysis bodies are kept in a small LRU keyed by ETag, since
+    a dashboard polls the same tokens repeatedly and the candles (and so the
+    analysis) only change when the OHLCV cache refreshes.
+    """
+
+    def __init__(self, analysis_entries: int = DASHBOARD_SETTINGS["analysis_cache_entries"]):
+        self.analysis_entries = analysis_entries
+        self._analysis: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def register(self, server: HttpServer):
+        """Add the dashboard routes to an HTTP server."""
+        server.route("GET", "/api/ohlcv", self._handler("ohlcv", self.ohlcv))
+        server.route("GET", "/api/analysis", self._handler("analysis", self.analysis))
+        server.route("GET", "/api/chart.png", self._handler("chart", self.chart))
+
+    def _handler(self, route: str, handle: Callable[[Request], Awaitable[Response]]):
+        async def wrapped(request: Request) -> Response:
+            start = time.perf_counter()
+            try:
+                response = await handle(request)
+            except ApiError as e:
+                response = _error(e.status, str(e), e.headers)
+            except Exception as e:
+                logging.error(f"Dashboard {route} request failed: {e}")
+                response = _error(500, "Internal error")
+            if DASHBOARD_SETTINGS["cors_origin"]:
+                response.headers["Access-Control-Allow-Origin"] = DASHBOARD_SETTINGS["cors_origin"]
+            DASHBOARD_REQUEST_SECONDS.observe(time.perf_counter() - start, route=route, status=str(response.status))
+            return response
+
+        return wrapped
+
+    async def ohlcv(self, request: Request) -> Response:
+        try:
+            limit = int(_param(request, "limit", str(CHART_SETTINGS["window_size"])))
+        except ValueError:
+            raise ApiError(400, "limit must be an integer")
+        limit = min(max(limit, 1), DASHBOARD_SETTINGS["max_candles"])
+        frame = await load_frame(request)
+
+        async def build() -> Tuple[bytes, str]:
+            return _encode(ohlcv_payload(frame, limit)), JSON_TYPE
+
+        return await conditional(request, frame, entity_tag(frame, "ohlcv", limit), build)
+
+    async def analysis(self, request: Request) -> Response:
+        frame = await load_frame(request)
+        etag = entity_tag(frame, "analysis")
+
+        async def build() -> Tuple[bytes, str]:
+            body = self._analysis.get(etag)
+            if body is None:
+                # Same stage as for charts; runs off the event loop like the render does
+                with span("dashboard_analysis"):
+                    body = _encode(await asyncio.to_thread(analysis_payload, frame))
+                self._analysis[etag] = body
+                while len(self._analysis) > self.analysis_entries:
+                    self._analysis.popitem(last=False)
+            else:
+                self._analysis.move_to_end(etag)
+            return body, JSON_TYPE
+
+        return await conditional(request, frame, etag, build)
+
+    async def chart(self, request: Request) -> Response:
+        frame = await load_frame(request)
+
+        async def build() -> Tuple[bytes, str]:
+            try:
+                chart = await get_pool_chart(frame.context.token_address, frame.timeframe, frame.df, frame.pool,
+                                             frame.context.symbol)
+            except RenderQueueFull:
+                raise ApiError(503, "Chart renderer is busy, retry shortly", {"Retry-After": "5"})
+            return chart.image, "image/png"
+
+        return await conditional(request, frame, entity_tag(frame, "chart"), build)
+
+dashboard_api = DashboardApi()
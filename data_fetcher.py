@@ -1,10 +1,25 @@
-import requests
+import asyncio
+import time
+import httpx
 import pandas as pd
 import logging
+from dataclasses import dataclass, field
 from typing import Dict, Optional, Tuple, List, Union, Any
 
-from config import GECKO_API_BASE, TIMEFRAMES, DEFAULT_TIMEFRAME, CHART_SETTINGS
-from charting import generate_token_chart, format_signals_text
+from config import (
+    GECKO_API_BASE, TIMEFRAMES, DEFAULT_TIMEFRAME, CHART_SETTINGS, TOKEN_CONTEXT_TTL, DERIVE_TIMEFRAMES,
+    POOL_FALLBACK_SETTINGS, COMPOSITE_SETTINGS, TOKEN_INDEX_SETTINGS
+)
+from charting import format_signals_text
+from request_scheduler import api_get, scheduler, request_priority, PRIORITY_INTERACTIVE
+from pool_health import pool_breakers
+from token_index import token_index
+from ohlcv_cache import ohlcv_cache, candle_ttl
+from candle_store import candle_store
+from timeframes import resample_ohlcv, candle_seconds, can_derive, merge_ohlcv
+from render_pool import render_chart, RenderQueueFull
+from chart_cache import chart_cache, chart_key, CachedChart
+from metrics import registry, span
 
 def get_token_symbol(token_data: Optional[Dict[str, Any]]) -> str:
     """
@@ -32,7 +47,7 @@ def get_token_symbol(token_data: Optional[Dict[str, Any]]) -> str:
     
     return "Unknown"
 
-def check_token_exists(token_address: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+async def check_token_exists(token_address: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
     """
     Check if a token exists on the network.
     
@@ -46,7 +61,7 @@ def check_token_exists(token_address: str) -> Tuple[bool, Optional[Dict[str, Any
         url = f"{GECKO_API_BASE}/networks/solana/tokens/{token_address}"
         logging.info(f"Checking if token exists: {url}")
         
-        response = requests.get(url, timeout=10)
+        response = await api_get(url)
         
         # If we get a 200 response, the token exists
         if response.status_code == 200:
@@ -64,17 +79,17 @@ def check_token_exists(token_address: str) -> Tuple[bool, Optional[Dict[str, Any
         logging.error(f"Error checking token: {response.status_code} - {response.text}")
         return False, None
         
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         logging.error(f"Timeout occurred while checking token: {token_address}")
         return False, None
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logging.error(f"Request error checking token: {e}")
         return False, None
     except Exception as e:
         logging.error(f"Unexpected error checking token: {e}")
         return False, None
 
-def get_top_pools_for_token(token_address: str) -> List[Dict]:
+async def get_top_pools_for_token(token_address: str) -> List[Dict]:
     """
     Get the top liquidity pools for a token.
     
@@ -88,36 +103,37 @@ def get_top_pools_for_token(token_address: str) -> List[Dict]:
         url = f"{GECKO_API_BASE}/networks/solana/tokens/{token_address}/pools"
         logging.info(f"Fetching pools from: {url}")
         
-        response = requests.get(url, timeout=10)
+        response = await api_get(url)
         response.raise_for_status()
         
         data = response.json()
         pools = data.get('data', [])
-        
-        # Log the first pool for debugging
-        if pools and len(pools) > 0:
-            logging.info(f"First pool data: {pools[0]}")
+        logging.info(f"Found {len(pools)} pools for token {token_address}")
         
         # Sort pools by liquidity (if available)
         if pools:
             pools.sort(key=lambda x: float(x.get('attributes', {}).get('reserve_in_usd', 0) or 0), reverse=True)
         
         return pools
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         logging.error(f"Timeout occurred while fetching pools for token: {token_address}")
         return []
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logging.error(f"Request error fetching pools: {e}")
         return []
     except Exception as e:
         logging.error(f"Unexpected error fetching pools: {e}")
         return []
 
-def fetch_pool_ohlcv_data(network: str, pool_address: str, timeframe: str,
-                          aggregate: int = 1, limit: int = 100) -> Optional[pd.DataFrame]:
+async def fetch_pool_ohlcv_data(network: str, pool_address: str, timeframe: str,
+                          aggregate: int = 1, limit: int = CHART_SETTINGS["history_size"]) -> Optional[pd.DataFrame]:
     """
     Fetch OHLCV data for a specific pool.
     
+    Frames are served from the in-memory OHLCV cache, which is filled from the
+    persistent candle store, which in turn only asks the API for candles it
+    doesn't have yet.
+    
     Args:
         network: Network name (e.g., 'solana')
         pool_address: Pool address
@@ -128,6 +144,78 @@ def fetch_pool_ohlcv_data(network: str, pool_address: str, timeframe: str,
     Returns:
         DataFrame with OHLCV data or None if fetch failed
     """
+    if DERIVE_TIMEFRAMES and can_derive(timeframe, aggregate):
+        # Build the aggregated candles from the stored base series so every
+        # aggregate of an endpoint shares a single API-backed series. A chart
+        # needs its window plus the indicator warm-up; a shorter base series is
+        # backfilled to that depth once (a page or two), deeper stored history
+        # is used up to `limit`.
+        base_key = (network, pool_address, timeframe, 1)
+        stored, _, _, complete = await asyncio.to_thread(candle_store.stats, base_key)
+        needed = min(limit, CHART_SETTINGS["window_size"] + CHART_SETTINGS["indicator_warmup"]) * aggregate
+        base_limit = min(limit * aggregate, max(stored, needed))
+        entry = ohlcv_cache.get(base_key)
+        if entry is not None and entry.is_fresh() and (stored >= base_limit or complete):
+            # The base series was synced within its TTL, so the deeper history is already stored
+            base = await asyncio.to_thread(candle_store.read, base_key, base_limit)
+        else:
+            base = await fetch_pool_ohlcv_data(network, pool_address, timeframe, aggregate=1, limit=base_limit)
+        if base is not None:
+            return resample_ohlcv(base, candle_seconds(timeframe, aggregate)).iloc[-limit:]
+    
+    key = (network, pool_address, timeframe, aggregate)
+    return await ohlcv_cache.get_or_fetch(
+        key, limit, candle_ttl(timeframe, aggregate),
+        lambda fetch_limit: load_pool_ohlcv_data(network, pool_address, timeframe,
+                                                 aggregate=aggregate, limit=fetch_limit)
+    )
+
+async def load_pool_ohlcv_data(network: str, pool_address: str, timeframe: str,
+                               aggregate: int = 1, limit: int = CHART_SETTINGS["history_size"]) -> Optional[pd.DataFrame]:
+    """
+    Sync a pool's candles into the local candle store and read the latest ones.
+    
+    Args:
+        network: Network name (e.g., 'solana')
+        pool_address: Pool address
+        timeframe: Timeframe (minute, hour, day)
+        aggregate: Number of units to aggregate
+        limit: Number of data points to return
+        
+    Returns:
+        DataFrame with OHLCV data or None if not enough data is available
+    """
+    async def fetch_page(page_limit: int, before_timestamp: Optional[int]):
+        return await request_ohlcv_list(network, pool_address, timeframe, aggregate=aggregate,
+                                        limit=page_limit, before_timestamp=before_timestamp)
+    
+    key = (network, pool_address, timeframe, aggregate)
+    df = await candle_store.load(key, limit, fetch_page)
+    
+    # Check if we have enough data
+    if df is None or len(df) < 5:  # Require at least 5 data points
+        logging.warning(f"Insufficient data points ({0 if df is None else len(df)}) for pool {pool_address}")
+        return None
+    
+    return df
+
+async def request_ohlcv_list(network: str, pool_address: str, timeframe: str, aggregate: int = 1,
+                             limit: int = 100, before_timestamp: Optional[int] = None) -> Optional[List[List[float]]]:
+    """
+    Request one page of raw OHLCV rows for a pool from the API.
+    
+    Args:
+        network: Network name (e.g., 'solana')
+        pool_address: Pool address
+        timeframe: Timeframe (minute, hour, day)
+        aggregate: Number of units to aggregate
+        limit: Number of data points to return (max 1000)
+        before_timestamp: Only return candles before this Unix timestamp (optional)
+        
+    Returns:
+        List of [timestamp, open, high, low, close, volume] rows (newest first),
+        an empty list if the pool has no candles in range, or None if the request failed
+    """
     try:
         # Construct the API URL
         url = f"{GECKO_API_BASE}/networks/{network}/pools/{pool_address}/ohlcv/{timeframe}"
@@ -136,60 +224,39 @@ def fetch_pool_ohlcv_data(network: str, pool_address: str, timeframe: str,
             'limit': limit,
             'currency': 'usd'
         }
+        if before_timestamp is not None:
+            params['before_timestamp'] = before_timestamp
         
         logging.info(f"Fetching OHLCV data from: {url} with params: {params}")
         
-        # Make the API request
-        response = requests.get(url, params=params)
+        # Make the API request through the rate-limited scheduler
+        response = await api_get(url, params=params)
         
-        # Log the response status and URL for debugging
-        logging.info(f"Response status: {response.status_code}, URL: {response.url}")
-        logging.debug(f"Response content: {response.text}")
+        # Log the response status and size for debugging
+        logging.info(f"Response status: {response.status_code} ({len(response.content)} bytes)")
         
         # Check if the response is successful
         if response.status_code != 200:
             logging.error(f"API error: {response.status_code} - {response.text}")
             return None
-            
-        response.raise_for_status()
         
         # Parse the response
         data = response.json()
         ohlcv_data = data.get('data', {}).get('attributes', {}).get('ohlcv_list', [])
         
         if not ohlcv_data:
-            logging.warning(f"No OHLCV data returned for pool {pool_address}")
-            return None
-        
-        # Create DataFrame
-        df = pd.DataFrame(ohlcv_data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        
-        # Check if we have enough data
-        if len(df) < 5:  # Require at least 5 data points
-            logging.warning(f"Insufficient data points ({len(df)}) for pool {pool_address}")
-            return None
-            
-        # Convert types
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            df[col] = pd.to_numeric(df[col])
-        
-        # Set timestamp as index
-        df.set_index('timestamp', inplace=True)
-        
-        # Limit to the window size
-        if len(df) > CHART_SETTINGS["window_size"]:
-            df = df.iloc[-CHART_SETTINGS["window_size"]:]
-            
-        # Check for NaN values
-        if df.isna().any().any():
-            logging.warning(f"NaN values detected in data for pool {pool_address}")
-            # Fill NaN values with forward fill then backward fill
-            df = df.fillna(method='ffill').fillna(method='bfill')
+            if before_timestamp is None:
+                logging.warning(f"No OHLCV data returned for pool {pool_address}")
+            else:
+                # A backfill page past the start of the pool's history
+                logging.debug(f"No OHLCV data before {before_timestamp} for pool {pool_address}")
         
-        return df
+        return ohlcv_data
     
-    except requests.exceptions.RequestException as e:
+    except httpx.TimeoutException:
+        logging.error(f"Timeout occurred while fetching OHLCV data for pool: {pool_address}")
+        return None
+    except httpx.HTTPError as e:
         logging.error(f"API request failed: {e}")
         return None
     except (KeyError, ValueError) as e:
@@ -199,127 +266,415 @@ def fetch_pool_ohlcv_data(network: str, pool_address: str, timeframe: str,
         logging.error(f"Unexpected error: {e}")
         return None
 
-def fetch_token_data(token_address: str, timeframe: str = DEFAULT_TIMEFRAME) -> Optional[pd.DataFrame]:
+def get_pool_address(pool: Dict[str, Any]) -> Optional[str]:
     """
-    Fetch token OHLCV data from GeckoTerminal API by finding the top pool and getting its data.
+    Extract the bare pool address from pool data.
+    
+    The pool ID in the API response includes the network prefix (e.g., "solana_address").
     
     Args:
-        token_address: Token address
-        timeframe: Timeframe for the data (e.g., "1h", "4h", "1d")
+        pool: Pool data from the API
         
     Returns:
-        DataFrame with OHLCV data or None if fetch failed
+        Pool address or None if the pool has no ID
     """
-    # Get the top pools for the token
-    pools = get_top_pools_for_token(token_address)
-    
-    if not pools:
-        logging.error(f"No pools found for token {token_address}")
+    pool_id = pool.get('id')
+    if not pool_id:
         return None
+    return pool_id.split('_', 1)[1] if '_' in pool_id else pool_id
+
+@dataclass
+class TokenContext:
+    """Everything needed to chart a token, resolved once and shared between requests."""
+    token_address: str
+    token_data: Optional[Dict[str, Any]]
+    symbol: str
+    pools: List[Dict[str, Any]]  # Ranked by liquidity, best first
+    chosen_pool: Optional[Dict[str, Any]] = None  # Pool that last served OHLCV data
+    resolved_at: float = field(default_factory=time.monotonic)
     
-    # Get the timeframe settings
-    timeframe_settings = TIMEFRAMES.get(timeframe, TIMEFRAMES[DEFAULT_TIMEFRAME])
-    endpoint = timeframe_settings["endpoint"]
-    aggregate = timeframe_settings.get("aggregate", 1)
+    @property
+    def exists(self) -> bool:
+        return self.token_data is not None
     
-    # Try each pool until we find one that works
-    for i, pool in enumerate(pools[:3]):  # Try up to 3 pools
-        pool_id = pool.get('id')
-        
-        if not pool_id:
-            logging.warning(f"Pool ID not found in pool data at index {i}")
-            continue
-        
-        # Log the pool ID for debugging
-        logging.info(f"Trying pool ID: {pool_id} (pool {i+1} of {min(3, len(pools))})")
+    def ranked_pools(self) -> List[Dict[str, Any]]:
+        """Pools in the order they should be tried, starting with the last pool that worked."""
+        if self.chosen_pool is None:
+            return list(self.pools)
+        return [self.chosen_pool] + [pool for pool in self.pools if pool is not self.chosen_pool]
+
+class TokenResolver:
+    """
+    Resolve token metadata and ranked pools once per token and memoize the result.
+    
+    Tokens in the local token list index skip the existence check; for
+    others it is issued concurrently with the pool listing. The resulting
+    TokenContext is reused by pool selection, timeframe switches and
+    the chart caption until it expires.
+    """
+    
+    def __init__(self, ttl: float = TOKEN_CONTEXT_TTL):
+        self.ttl = ttl
+        self._contexts: Dict[str, TokenContext] = {}
+    
+    def get_cached(self, token_address: str) -> Optional[TokenContext]:
+        """Return a memoized context if it has not expired yet."""
+        context = self._contexts.get(token_address)
+        if context is None:
+            return None
+        if time.monotonic() - context.resolved_at > self.ttl:
+            del self._contexts[token_address]
+            return None
+        return context
+    
+    async def resolve(self, token_address: str) -> TokenContext:
+        """
+        Get the context for a token, hitting the API only on a cache miss.
         
-        # The pool ID in the API response might include the network prefix (e.g., "solana_address")
-        # Extract just the address part if needed
-        if '_' in pool_id:
-            pool_address = pool_id.split('_', 1)[1]
+        Args:
+            token_address: Token address
+            
+        Returns:
+            TokenContext (check `exists` and `pools` before using it)
+        """
+        context = self.get_cached(token_address)
+        if context is not None:
+            logging.info(f"Using cached token context for {context.symbol}")
+            return context
+        
+        metadata = get_token_metadata(token_address)
+        if metadata is not None:
+            # Listed tokens exist, and the index already has their symbol: only the pools need the API
+            token_exists, token_data = True, token_data_from_metadata(metadata)
+            pools = await get_top_pools_for_token(token_address)
         else:
-            pool_address = pool_id
+            (token_exists, token_data), pools = await asyncio.gather(
+                check_token_exists(token_address),
+                get_top_pools_for_token(token_address)
+            )
+        context = TokenContext(
+            token_address=token_address,
+            token_data=token_data if token_exists else None,
+            symbol=get_token_symbol(token_data),
+            pools=pools
+        )
+        
+        # Only memoize complete contexts so transient API failures are retried
+        if context.exists and context.pools:
+            self._contexts[token_address] = context
+        
+        return context
+    
+    def invalidate(self, token_address: str):
+        """Drop the memoized context for a token."""
+        self._contexts.pop(token_address, None)
+
+resolver = TokenResolver()
+
+@dataclass
+class PoolFetcherStats:
+    hedges: int = 0  # Requests sent to a backup pool because the first was slow
+    fallbacks: int = 0  # Results served by a pool other than the first choice
+
+pool_fetcher_stats = PoolFetcherStats()
+
+registry.callback("pool_hedged_requests_total", "OHLCV fetches hedged with the next pool because the first was slow",
+                  lambda: pool_fetcher_stats.hedges, kind="counter")
+registry.callback("pool_fallbacks_total", "OHLCV results served by a pool other than the first choice",
+                  lambda: pool_fetcher_stats.fallbacks, kind="counter")
+
+async def fetch_token_data(context: TokenContext, timeframe: str = DEFAULT_TIMEFRAME) -> Tuple[Optional[pd.DataFrame], Optional[Dict[str, Any]]]:
+    """
+    Fetch token OHLCV data for a chart, analysis or alert.
+    
+    With COMPOSITE_SETTINGS["enabled"] the token's top pools are merged into
+    one series (see fetch_composite_data); otherwise, or if fewer than two
+    pools have data, the candles come from the best single pool.
+    
+    Args:
+        context: Resolved token context
+        timeframe: Timeframe for the data (e.g., "1h", "4h", "1d")
         
-        logging.info(f"Extracted pool address: {pool_address}")
+    Returns:
+        Tuple of (DataFrame, pool that served it) or (None, None) if fetch failed
+    """
+    if COMPOSITE_SETTINGS["enabled"]:
+        df, pool = await fetch_composite_data(context, timeframe)
+        if df is not None:
+            return df, pool
+    return await fetch_best_pool_data(context, timeframe)
+
+async def fetch_pool_candles(pool: Dict[str, Any], timeframe: str) -> Optional[pd.DataFrame]:
+    """
+    Fetch a pool's candles for a chart timeframe and record the outcome in its circuit breaker.
+    
+    Args:
+        pool: Pool data from the API
+        timeframe: Timeframe for the data (e.g., "1h", "4h", "1d")
         
-        # Fetch OHLCV data for this pool
-        df = fetch_pool_ohlcv_data('solana', pool_address, endpoint, aggregate=aggregate)
+    Returns:
+        DataFrame with OHLCV data or None if fetch failed
+    """
+    timeframe_settings = TIMEFRAMES.get(timeframe, TIMEFRAMES[DEFAULT_TIMEFRAME])
+    pool_address = get_pool_address(pool)
+    health_key = (pool_address, timeframe)
+    started = time.monotonic()
+    try:
+        df = await fetch_pool_ohlcv_data('solana', pool_address, timeframe_settings["endpoint"],
+                                         aggregate=timeframe_settings.get("aggregate", 1))
+    except asyncio.CancelledError:
+        pool_breakers.release(health_key)
+        raise
+    except Exception as e:
+        logging.error(f"Fetching pool {pool_address} failed: {e}")
+        df = None
+    if df is not None and len(df) >= POOL_FALLBACK_SETTINGS["min_candles"]:
+        pool_breakers.record_success(health_key, time.monotonic() - started)
+    else:
+        pool_breakers.record_failure(health_key)
+    return df
+
+def prices_token(pool: Dict[str, Any], token_address: str) -> bool:
+    """
+    Whether a pool's OHLCV prices are quoted for the token.
+    
+    GeckoTerminal returns the price of the pool's base token, so a pool that
+    has the token on the quote side would chart its counterpart instead.
+    Pools without relationship data are assumed to price the token.
+    """
+    base = ((pool.get('relationships') or {}).get('base_token') or {}).get('data') or {}
+    return base.get('id') in (None, f"solana_{token_address}")
+
+async def fetch_composite_data(context: TokenContext, timeframe: str = DEFAULT_TIMEFRAME) -> Tuple[Optional[pd.DataFrame], Optional[Dict[str, Any]]]:
+    """
+    Merge the token's top pools into one weighted candle series.
+    
+    Up to COMPOSITE_SETTINGS["max_pools"] of the most liquid pools that
+    price the token are fetched concurrently, leaving out pools with an open
+    circuit breaker or a negligible share of the liquidity, and merged with
+    merge_ohlcv: prices weighted by pool liquidity (or by each candle's
+    volume with weighting "volume"), volume summed across pools.
+    
+    Args:
+        context: Resolved token context
+        timeframe: Timeframe for the data (e.g., "1h", "4h", "1d")
         
-        # If we got data, return it
-        if df is not None and not df.empty:
-            logging.info(f"Successfully fetched data from pool {i+1}")
-            return df
+    Returns:
+        Tuple of (DataFrame, pseudo-pool describing the merged pools) or
+        (None, None) if fewer than two pools returned enough candles
+    """
+    settings = COMPOSITE_SETTINGS
+    pools = [pool for pool in context.pools
+             if get_pool_address(pool) and prices_token(pool, context.token_address)][:settings["max_pools"]]
+    liquidity = [float(pool.get('attributes', {}).get('reserve_in_usd') or 0) for pool in pools]
+    threshold = settings["min_share"] * sum(liquidity)
+    pools = [pool for pool, reserve in zip(pools, liquidity)
+             if reserve >= threshold and pool_breakers.allow((get_pool_address(pool), timeframe))]
+    if len(pools) < 2:
+        return None, None
+    
+    frames = await asyncio.gather(*(fetch_pool_candles(pool, timeframe) for pool in pools))
+    usable = [(df, pool) for df, pool in zip(frames, pools)
+              if df is not None and len(df) >= POOL_FALLBACK_SETTINGS["min_candles"]]
+    if len(usable) < 2:
+        logging.info(f"Only {len(usable)} of {len(pools)} pools have data for a composite, using a single pool")
+        return None, None
+    
+    weights = [float(pool.get('attributes', {}).get('reserve_in_usd') or 0) for _, pool in usable]
+    with span("composite_merge"):
+        df = merge_ohlcv([df for df, _ in usable], weights,
+                         volume_weighted=settings["weighting"] == "volume")
+    df = df.iloc[-CHART_SETTINGS["history_size"]:]
+    
+    # Stands in for a pool wherever one is described or keyed (caption, chart cache, dashboard)
+    addresses = [get_pool_address(pool) for _, pool in usable]
+    composite = {
+        'id': f"composite-{settings['weighting']}:{'+'.join(addresses)}",
+        'attributes': {
+            'name': f"Composite of {len(usable)} pools ({settings['weighting']}-weighted)",
+            'reserve_in_usd': sum(weights),
+        },
+    }
+    logging.info(f"Merged {len(df)} composite candles from pools {', '.join(addresses)}")
+    return df, composite
+
+async def fetch_best_pool_data(context: TokenContext, timeframe: str = DEFAULT_TIMEFRAME) -> Tuple[Optional[pd.DataFrame], Optional[Dict[str, Any]]]:
+    """
+    Fetch token OHLCV data from the best of the token's ranked pools.
+    
+    The first pool is started alone. If it fails, the next pool is started
+    right away; if it is merely slow (see PoolBreakers.hedge_delay), the next
+    pool is started as a hedge alongside it and the first good result wins.
+    Pools whose circuit breaker is open are skipped. A result with fewer than
+    POOL_FALLBACK_SETTINGS["min_candles"] candles is only used when no pool
+    returns more.
+    
+    Args:
+        context: Resolved token context
+        timeframe: Timeframe for the data (e.g., "1h", "4h", "1d")
         
-        logging.warning(f"Failed to get data from pool {i+1}, trying next pool if available")
+    Returns:
+        Tuple of (DataFrame, pool that served it) or (None, None) if fetch failed
+    """
+    if not context.pools:
+        logging.error(f"No pools found for token {context.token_address}")
+        return None, None
+    
+    settings = POOL_FALLBACK_SETTINGS
+    
+    ranked = [pool for pool in context.ranked_pools() if get_pool_address(pool)]
+    candidates = [pool for pool in ranked if pool_breakers.allow((get_pool_address(pool), timeframe))]
+    if not candidates:
+        # Every breaker is open: trying anyway beats failing outright
+        candidates = ranked
+    candidates = candidates[:settings["max_pools"]]
+    
+    # Hedging spends extra API calls, so only interactive requests do it, and only with budget to spare
+    hedge = settings["hedge"] and request_priority.get() == PRIORITY_INTERACTIVE
+    remaining = iter(candidates)
+    pending: Dict[asyncio.Task, Dict[str, Any]] = {}
+    best: Tuple[Optional[pd.DataFrame], Optional[Dict[str, Any]]] = (None, None)
+    last_started = None
+    
+    def start_next() -> bool:
+        nonlocal last_started
+        pool = next(remaining, None)
+        if pool is None:
+            return False
+        logging.info(f"Trying pool: {get_pool_address(pool)} (pool {candidates.index(pool) + 1} of {len(candidates)})")
+        pending[asyncio.create_task(fetch_pool_candles(pool, timeframe))] = pool
+        last_started = pool
+        return True
+    
+    start_next()
+    try:
+        while pending:
+            timeout = None
+            if hedge and len(pending) < len(candidates) and scheduler.available_tokens >= 1:
+                timeout = pool_breakers.hedge_delay((get_pool_address(last_started), timeframe))
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # The newest attempt is slow: race the next pool against it
+                if start_next():
+                    pool_fetcher_stats.hedges += 1
+                continue
+            
+            for task in done:
+                pool = pending.pop(task)
+                df = task.result()
+                if df is not None and len(df) >= settings["min_candles"]:
+                    if pool is not candidates[0]:
+                        pool_fetcher_stats.fallbacks += 1
+                    context.chosen_pool = pool
+                    return df, pool
+                if df is not None and not df.empty and (best[0] is None or len(df) > len(best[0])):
+                    best = (df, pool)
+                logging.warning(f"Pool {get_pool_address(pool)} returned {0 if df is None else len(df)} candles, trying next pool if available")
+                start_next()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    
+    if best[0] is not None:
+        logging.info(f"Using thin data ({len(best[0])} candles) from pool {get_pool_address(best[1])}")
+        context.chosen_pool = best[1]
+        return best
     
     # If we get here, all pools failed
     logging.error("All pools failed to provide OHLCV data")
-    return None
+    return None, None
+
+async def get_pool_chart(token_address: str, timeframe: str, df: pd.DataFrame, pool: Dict[str, Any],
+                         token_symbol: Optional[str] = None) -> CachedChart:
+    """
+    Get the rendered chart and caption for candles served by a pool.
+    
+    Charts are cached by pool, timeframe and last candle, so the bot and the
+    dashboard API share renders of the same data.
+    
+    Args:
+        token_address: Token address
+        timeframe: Chart timeframe
+        df: DataFrame with OHLCV data from fetch_token_data
+        pool: Pool that served the data
+        token_symbol: Token symbol for the title and caption (optional)
+        
+    Returns:
+        Cached chart with the PNG bytes and Markdown caption
+        
+    Raises:
+        RenderQueueFull: If the chart is not cached and the render pool is saturated
+    """
+    # Describe the pool that actually served the data
+    pool_info = pool.get('attributes', {})
+    pool_name = pool_info.get('name', 'Unknown Pool')
+    pool_liquidity = pool_info.get('reserve_in_usd', 'Unknown')
+    
+    async def render() -> Tuple[bytes, str]:
+        # Render chart in the worker pool and get signals
+        image, signals = await render_chart(df, token_address, timeframe, pool_name=pool_name,
+                                           token_symbol=token_symbol)
+        
+        # Add pool information to signals
+        signals['Pool'] = pool_name
+        if pool_liquidity != 'Unknown':
+            try:
+                liquidity_float = float(pool_liquidity)
+                signals['Liquidity'] = f"${liquidity_float:,.2f}"
+            except (ValueError, TypeError):
+                signals['Liquidity'] = pool_liquidity
+        
+        # Format signals into text
+        return image, format_signals_text(signals, token_address, token_symbol)
+    
+    # Reuse the rendered chart if these exact candles were already charted
+    key = chart_key(get_pool_address(pool), token_address, timeframe, df)
+    return await chart_cache.get_or_render(key, render)
 
-def get_token_chart_data(token_address: str, timeframe: str = DEFAULT_TIMEFRAME) -> Tuple[Optional[str], Optional[str]]:
+async def get_token_chart_data(token_address: str, timeframe: str = DEFAULT_TIMEFRAME) -> Tuple[Optional[CachedChart], Optional[str]]:
     """
-    Generate chart for a token and return the image path and analysis text.
+    Generate chart for a token and return the rendered chart and analysis text.
     
     Args:
         token_address: Token address
         timeframe: Timeframe for the chart
         
     Returns:
-        Tuple of (image_path, analysis_text) or (None, None) if failed
+        Tuple of (chart, analysis_text) or (None, None) if failed. The chart
+        carries the PNG bytes and, once uploaded, its Telegram file_id.
     """
     try:
-        # First check if the token exists
-        token_exists, token_data = check_token_exists(token_address)
-        if not token_exists:
+        # Resolve token metadata and pools (memoized per token)
+        with span("resolve"):
+            context = await resolver.resolve(token_address)
+        if not context.exists:
             logging.error(f"Token does not exist: {token_address}")
             return None, f"TOKEN_NOT_FOUND:{token_address[:8]}..."
         
-        # Get token symbol
-        token_symbol = get_token_symbol(token_data)
+        token_symbol = context.symbol
         logging.info(f"Token symbol: {token_symbol}")
         
-        # Get pool information
-        pools = get_top_pools_for_token(token_address)
-        if not pools:
+        if not context.pools:
             logging.error(f"No pools found for token {token_address} ({token_symbol})")
             return None, f"NO_POOLS_FOUND:{token_symbol}"
         
-        # Store all pools for reference
-        all_pools = {pool.get('id'): pool.get('attributes', {}) for pool in pools if pool.get('id')}
-        
         # Fetch token data (this will try multiple pools if needed)
-        df = fetch_token_data(token_address, timeframe)
+        with span("fetch_ohlcv"):
+            df, pool = await fetch_token_data(context, timeframe)
         if df is None or df.empty:
             logging.error(f"No data available for token {token_address} ({token_symbol})")
             return None, f"NO_DATA_AVAILABLE:{token_symbol}"
             
-        # Log data shape for debugging
-        logging.info(f"Data shape for {token_symbol}: {df.shape}")
-        logging.info(f"Data columns: {df.columns.tolist()}")
-        logging.info(f"Data index: {df.index[0]} to {df.index[-1]}")
-        logging.info(f"Data sample: {df.head(1).to_dict()}")
+        logging.info(f"Fetched {len(df)} candles for {token_symbol}: {df.index[0]} to {df.index[-1]}")
         
-        # Since we don't know which pool succeeded, we'll use the first pool's info as a fallback
-        pool_info = pools[0].get('attributes', {})
-        pool_name = pool_info.get('name', 'Unknown Pool')
-        pool_liquidity = pool_info.get('reserve_in_usd', 'Unknown')
+        try:
+            chart = await get_pool_chart(token_address, timeframe, df, pool, token_symbol)
+        except RenderQueueFull as e:
+            logging.warning(f"Render queue full, rejecting chart for {token_symbol}: {e}")
+            return None, f"RENDER_BUSY:{token_symbol}"
         
-        # Generate chart and get signals
-        img_path, signals = generate_token_chart(df, token_address, timeframe, pool_name=pool_name)
-        
-        # Add pool information to signals
-        signals['Pool'] = pool_name
-        if pool_liquidity != 'Unknown':
-            try:
-                liquidity_float = float(pool_liquidity)
-                signals['Liquidity'] = f"${liquidity_float:,.2f}"
-            except (ValueError, TypeError):
-                signals['Liquidity'] = pool_liquidity
-        
-        # Format signals into text
-        analysis_text = format_signals_text(signals, token_address)
-        
-        return img_path, analysis_text
+        return chart, chart.caption
     
     except Exception as e:
         logging.error(f"Chart generation failed: {e}")
@@ -327,19 +682,35 @@ def get_token_chart_data(token_address: str, timeframe: str = DEFAULT_TIMEFRAME)
 
 def get_token_metadata(token_address: str) -> Optional[Dict]:
     """
-    Get token metadata (symbol, name, etc.) from Solana token list.
-    This is a placeholder for future implementation.
+    Get token metadata (symbol, name, decimals) from the local token list index.
     
     Args:
         token_address: Token address
         
     Returns:
-        Dictionary with token metadata or None if not found
+        Dictionary with token metadata or None if the token is not listed
+    """
+    if not TOKEN_INDEX_SETTINGS["enabled"]:
+        return None
+    return token_index.lookup(token_address)
+
+def token_data_from_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Shape token list metadata like the token data returned by the API.
+    
+    Args:
+        metadata: Metadata from get_token_metadata
+        
+    Returns:
+        Token data with the same fields check_token_exists returns
     """
-    # TODO: Implement token metadata fetching
-    # For now, return a placeholder
     return {
-        "symbol": token_address[:5] + "...",
-        "name": "Unknown Token",
-        "address": token_address
+        'id': f"solana_{metadata['address']}",
+        'type': 'token',
+        'attributes': {
+            'address': metadata['address'],
+            'symbol': metadata['symbol'],
+            'name': metadata['name'],
+            'decimals': metadata['decimals'],
+        },
     }
@@ -0,0 +1,60 @@
+import logging
+from typing import Optional
+
+import httpx
+
+from config import HTTP_SETTINGS
+
+_client: Optional[httpx.AsyncClient] = None
+
+def _http2_available() -> bool:
+    """
+    Check whether the optional `h2` package is installed so httpx can speak HTTP/2.
+
+    Returns:
+        True if HTTP/2 can be enabled
+    """
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Get the shared keep-alive HTTP client, creating it on first use.
+
+    All GeckoTerminal calls go through this client so TLS connections are
+    pooled and reused instead of being opened for every request.
+
+    Returns:
+        Shared httpx.AsyncClient instance
+    """
+    global _client
+
+    if _client is None or _client.is_closed:
+        http2 = HTTP_SETTINGS["http2"] and _http2_available()
+        timeout = httpx.Timeout(HTTP_SETTINGS["timeout"], connect=HTTP_SETTINGS["connect_timeout"])
+        limits = httpx.Limits(
+            max_connections=HTTP_SETTINGS["max_connections"],
+            max_keepalive_connections=HTTP_SETTINGS["max_keepalive_connections"],
+            keepalive_expiry=HTTP_SETTINGS["keepalive_expiry"]
+        )
+        _client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=limits,
+            http2=http2,
+            headers={"Accept": "application/json"}
+        )
+        logging.info(f"Created shared HTTP client (http2={http2})")
+
+    return _client
+
+async def close_client():
+    """Close the shared HTTP client and release its pooled connections."""
+    global _client
+
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logging.info("Closed shared HTTP client")
+    _client = None
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from config import HTTP_SERVER_SETTINGS
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: Dict[str, List[str]]
+    headers: Dict[str, str]  # Lower-cased header names
+    body: bytes = b""
+
+@dataclass
+class Response:
+    status: int = 200
+    body: bytes = b""
+    content_type: str = "text/plain; charset=utf-8"
+    headers: Dict[str, str] = field(default_factory=dict)
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+class HttpServer:
+    """
+    Minimal asyncio HTTP/1.1 server for the bot's local endpoints.
+
+    Runs on the bot's event loop, so handlers can read the in-process caches
+    and metrics directly. Supports keep-alive connections and requests with
+    a Content-Length body; routes are matched on method and exact path.
+    """
+
+    def __init__(self, host: str = HTTP_SERVER_SETTINGS["host"], port: int = HTTP_SERVER_SETTINGS["port"],
+                 reuse_port: bool = False):
+        self.host = host
+        self.port = port
+        self.reuse_port = reuse_port  # Let several worker processes accept on the same port
+        self._routes: Dict[Tuple[str, str], Handler] = {}
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._connections = set()
+
+    def route(self, method: str, path: str, handler: Handler):
+        """Register a handler for a method and path."""
+        self._routes[(method.upper(), path)] = handler
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    async def start(self):
+        """Start listening. The actual port is stored in `port` (useful with port 0)."""
+        if self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._serve_connection, self.host, self.port,
+                                                  reuse_port=self.reuse_port or None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logging.info(f"HTTP server listening on {self.host}:{self.port}")
+
+    async def close(self):
+        """Stop accepting connections and close the open ones."""
+        if self._server is None:
+            return
+        server, self._server = self._server, None
+        server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await server.wait_closed()
+        logging.info("HTTP server stopped")
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Request]:
+        request_line = await asyncio.wait_for(reader.readline(), HTTP_SERVER_SETTINGS["idle_timeout"])
+        if not request_line:
+            return None
+        method, target, _ = request_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+
+        headers = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), HTTP_SERVER_SETTINGS["read_timeout"])
+            line = line.decode("latin-1").rstrip("\r\n")
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", "0"))
+        if length > HTTP_SERVER_SETTINGS["max_body"]:
+            raise ValueError(f"Request body too large ({length} bytes)")
+        body = await asyncio.wait_for(reader.readexactly(length), HTTP_SERVER_SETTINGS["read_timeout"]) if length else b""
+
+        url = urlsplit(target)
+        return Request(method.upper(), url.path, parse_qs(url.query), headers, body)
+
+    async def _handle(self, request: Request) -> Response:
+        handler = self._routes.get((request.method, request.path))
+        if handler is None:
+            if request.method == "HEAD":
+                handler = self._routes.get(("GET", request.path))
+            if handler is None:
+                status = HTTPStatus.METHOD_NOT_ALLOWED if any(
+                    path == request.path for _, path in self._routes) else HTTPStatus.NOT_FOUND
+                return Response(status, status.phrase.encode())
+        try:
+            return await handler(request)
+        except Exception as e:
+            logging.error(f"HTTP handler for {request.method} {request.path} failed: {e}")
+            return Response(500, b"Internal Server Error")
+
+    @staticmethod
+    def _encode(request: Optional[Request], response: Response, keep_alive: bool) -> bytes:
+        body = b"" if request is not None and request.method == "HEAD" else response.body
+        lines = [
+            f"HTTP/1.1 {response.status} {HTTPStatus(response.status).phrase}",
+            f"Content-Type: {response.content_type}",
+            f"Content-Length: {len(response.body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        lines.extend(f"{name}: {value}" for name, value in response.headers.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except ValueError as e:
+                    logging.warning(f"Rejected malformed HTTP request: {e}")
+                    writer.write(self._encode(None, Response(400, b"Bad Request"), keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                response = await self._handle(request)
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                writer.write(self._encode(request, response, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+
+http_server = HttpServer()
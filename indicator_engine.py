@@ -0,0 +1,186 @@
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Columns produced for every series, as expected by get_indicator_signals and the renderers
+INDICATOR_COLUMNS = [
+    'rsi', 'macd', 'macd_signal', 'macd_histogram',
+    'bb_upper', 'bb_middle', 'bb_lower',
+    'sma_20', 'sma_50', 'sma_200',
+]
+
+RSI_WINDOW = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+BB_WINDOW = 20
+BB_DEV = 2
+
+def _first_valid(values: np.ndarray) -> np.ndarray:
+    """Index of the first non-NaN value in each row (row length if none)."""
+    valid = ~np.isnan(values)
+    return np.where(valid.any(axis=1), valid.argmax(axis=1), values.shape[1])
+
+def _ewm(values: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """
+    Row-wise exponential moving average, equivalent to pandas
+    `ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean()`.
+
+    Rows may start with NaN padding. The padding is filled with each row's
+    first value, which leaves an `adjust=False` EMA seeded at that value
+    unchanged, so the whole batch runs through one linear filter.
+    """
+    from scipy.signal import lfilter  # Deferred: scipy.signal takes about a second to import
+
+    n_rows, n_cols = values.shape
+    out = np.full_like(values, np.nan)
+    start = _first_valid(values)
+    has_data = start < n_cols
+    if not has_data.any():
+        return out
+
+    rows = np.flatnonzero(has_data)
+    seeds = values[rows, start[rows]]
+    filled = values[rows]
+    filled = np.where(np.isnan(filled), seeds[:, None], filled)
+
+    smoothed, _ = lfilter([alpha], [1.0, alpha - 1.0], filled, axis=1, zi=((1.0 - alpha) * seeds)[:, None])
+
+    # Mask values before each row has min_periods observations
+    positions = np.arange(n_cols)
+    ready = positions[None, :] >= (start[rows] + min_periods - 1)[:, None]
+    out[rows] = np.where(ready, smoothed, np.nan)
+    return out
+
+def _rolling_moments(values: np.ndarray, window: int, with_std: bool = False):
+    """
+    Row-wise rolling mean (and population standard deviation) over full windows.
+
+    Windows containing NaN yield NaN, matching pandas `rolling(window)` with
+    the default min_periods. Sums run over values centered on each row's first
+    price, which keeps the cumulative sums well conditioned for tiny or large
+    prices.
+
+    Returns:
+        Rolling mean, or a (mean, std) tuple if with_std is set
+    """
+    n_rows, n_cols = values.shape
+    mean = np.full_like(values, np.nan)
+    std = np.full_like(values, np.nan)
+    if n_cols < window:
+        return (mean, std) if with_std else mean
+
+    valid = ~np.isnan(values)
+    offset = np.nan_to_num(values[np.arange(n_rows), np.minimum(_first_valid(values), n_cols - 1)])
+    centered = np.where(valid, values - offset[:, None], 0.0)
+
+    def window_sums(x: np.ndarray) -> np.ndarray:
+        sums = np.cumsum(x, axis=1)
+        sums[:, window:] -= sums[:, :-window].copy()
+        return sums[:, window - 1:]
+
+    full = window_sums(valid.astype(float)) == window
+    centered_mean = window_sums(centered) / window
+    mean[:, window - 1:] = np.where(full, centered_mean + offset[:, None], np.nan)
+
+    if not with_std:
+        return mean
+
+    variance = window_sums(centered * centered) / window - centered_mean ** 2
+    std[:, window - 1:] = np.where(full, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+    return mean, std
+
+def compute_indicators(closes: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Compute RSI, MACD, Bollinger Bands and SMAs for many series at once.
+
+    Matches the `ta` library defaults add_indicators used: Wilder RSI(14),
+    MACD(12, 26, 9) on adjust=False EMAs, Bollinger Bands(20, 2) with
+    population standard deviation, and SMA 20/50/200.
+
+    Args:
+        closes: Close prices, shape (tokens, candles) or (candles,). Shorter
+            series are left-padded with NaN so the latest candles line up.
+
+    Returns:
+        Dictionary mapping each name in INDICATOR_COLUMNS to an array shaped like `closes`
+    """
+    closes = np.asarray(closes, dtype=float)
+    squeeze = closes.ndim == 1
+    if squeeze:
+        closes = closes[None, :]
+
+    # RSI: Wilder smoothing of gains and losses; the first diff counts as no change
+    diff = np.diff(closes, axis=1, prepend=np.nan)
+    started = ~np.isnan(closes)
+    gains = np.where(started, np.where(diff > 0, diff, 0.0), np.nan)
+    losses = np.where(started, np.where(diff < 0, -diff, 0.0), np.nan)
+    avg_gain = _ewm(gains, 1.0 / RSI_WINDOW, RSI_WINDOW)
+    avg_loss = _ewm(losses, 1.0 / RSI_WINDOW, RSI_WINDOW)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+
+    # MACD
+    ema_fast = _ewm(closes, 2.0 / (MACD_FAST + 1), MACD_FAST)
+    ema_slow = _ewm(closes, 2.0 / (MACD_SLOW + 1), MACD_SLOW)
+    macd = ema_fast - ema_slow
+    macd_signal = _ewm(macd, 2.0 / (MACD_SIGNAL + 1), MACD_SIGNAL)
+
+    # Bollinger Bands
+    bb_middle, bb_std = _rolling_moments(closes, BB_WINDOW, with_std=True)
+
+    result = {
+        'rsi': rsi,
+        'macd': macd,
+        'macd_signal': macd_signal,
+        'macd_histogram': macd - macd_signal,
+        'bb_upper': bb_middle + BB_DEV * bb_std,
+        'bb_middle': bb_middle,
+        'bb_lower': bb_middle - BB_DEV * bb_std,
+        'sma_20': bb_middle,
+        'sma_50': _rolling_moments(closes, 50),
+        'sma_200': _rolling_moments(closes, 200),
+    }
+    if squeeze:
+        result = {name: values[0] for name, values in result.items()}
+    return result
+
+def stack_closes(frames: Sequence[pd.DataFrame]) -> np.ndarray:
+    """
+    Stack the close prices of several frames into one (tokens, candles) array.
+
+    Frames are right-aligned on their latest candle; shorter ones are left-padded with NaN.
+
+    Args:
+        frames: DataFrames with a 'close' column, oldest candle first
+
+    Returns:
+        2D array of close prices
+    """
+    length = max((len(df) for df in frames), default=0)
+    closes = np.full((len(frames), length), np.nan)
+    for i, df in enumerate(frames):
+        if len(df):
+            closes[i, length - len(df):] = df['close'].to_numpy(dtype=float)
+    return closes
+
+def add_indicators_batch(frames: Sequence[pd.DataFrame]) -> List[pd.DataFrame]:
+    """
+    Add indicator columns to many OHLCV frames in one vectorized pass.
+
+    Args:
+        frames: DataFrames with OHLC data, oldest candle first
+
+    Returns:
+        Copies of the frames with the INDICATOR_COLUMNS added
+    """
+    indicators = compute_indicators(stack_closes(frames))
+    length = indicators['rsi'].shape[1] if frames else 0
+
+    results = []
+    for i, df in enumerate(frames):
+        offset = length - len(df)
+        columns = {name: values[i, offset:] for name, values in indicators.items()}
+        results.append(df.assign(**columns))
+    return results
@@ -1,57 +1,24 @@
 import pandas as pd
 import numpy as np
-from ta.momentum import RSIIndicator
-from ta.trend import MACD
-from ta.volatility import BollingerBands
 from typing import Dict
 
+from indicator_engine import add_indicators_batch
+
 def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
     """
     Add technical indicators to the dataframe.
     
+    RSI (14), MACD (12/26/9), Bollinger Bands (20, 2) and SMA 20/50/200 are
+    computed by the vectorized indicator engine; indicators without enough
+    data are NaN.
+    
     Args:
         df: DataFrame with OHLC data
         
     Returns:
-        DataFrame with added indicators
+        Copy of the DataFrame with added indicators
     """
-    # Make a copy to avoid modifying the original
-    df = df.copy()
-    
-    # Add RSI (14 period)
-    # Make sure we have enough data for RSI calculation (at least 14 periods)
-    if len(df) >= 14:
-        rsi = RSIIndicator(close=df['close'], window=14)
-        df['rsi'] = rsi.rsi()
-    else:
-        # Not enough data for RSI
-        df['rsi'] = pd.Series([np.nan] * len(df), index=df.index)
-    
-    # Add MACD
-    # MACD requires at least 26 periods of data (for the slow period)
-    if len(df) >= 26:
-        macd = MACD(close=df['close'])
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        df['macd_histogram'] = macd.macd_diff()
-    else:
-        # Not enough data for MACD
-        df['macd'] = pd.Series([np.nan] * len(df), index=df.index)
-        df['macd_signal'] = pd.Series([np.nan] * len(df), index=df.index)
-        df['macd_histogram'] = pd.Series([np.nan] * len(df), index=df.index)
-    
-    # Add Bollinger Bands
-    bollinger = BollingerBands(close=df['close'])
-    df['bb_upper'] = bollinger.bollinger_hband()
-    df['bb_middle'] = bollinger.bollinger_mavg()
-    df['bb_lower'] = bollinger.bollinger_lband()
-    
-    # Add Moving Averages
-    df['sma_20'] = df['close'].rolling(window=20).mean()
-    df['sma_50'] = df['close'].rolling(window=50).mean()
-    df['sma_200'] = df['close'].rolling(window=200).mean()
-    
-    return df
+    return add_indicators_batch([df])[0]
 
 def plot_rsi(ax, df: pd.DataFrame):
     """
@@ -95,13 +62,36 @@ def get_indicator_signals(df: pd.DataFrame) -> Dict[str, str]:
     Args:
         df: DataFrame with indicators
         
+    Returns:
+        Dictionary of signals and their values
+    """
+    latest = {
+        'close': df['close'].iloc[-1],
+        'rsi': df['rsi'].iloc[-1],
+        'macd': df['macd'].iloc[-1],
+        'macd_signal': df['macd_signal'].iloc[-1],
+        'macd_histogram': df['macd_histogram'].iloc[-1],
+        'prev_macd_histogram': df['macd_histogram'].iloc[-2] if len(df) > 1 else 0,
+        'sma_20': df['sma_20'].iloc[-1],
+        'sma_50': df['sma_50'].iloc[-1],
+    }
+    return get_latest_signals(latest)
+
+def get_latest_signals(latest: Dict[str, float]) -> Dict[str, str]:
+    """
+    Generate trading signals from the latest indicator values.
+    
+    Args:
+        latest: Latest values keyed by indicator column name, plus
+            'close' and 'prev_macd_histogram' (e.g. from IndicatorState.latest())
+        
     Returns:
         Dictionary of signals and their values
     """
     signals = {}
     
     # RSI signals
-    latest_rsi = df['rsi'].iloc[-1]
+    latest_rsi = latest['rsi']
     if pd.isna(latest_rsi):
         signals['RSI'] = "Neutral (nan)"
     elif latest_rsi > 70:
@@ -112,10 +102,10 @@ def get_indicator_signals(df: pd.DataFrame) -> Dict[str, str]:
         signals['RSI'] = f"Neutral ({latest_rsi:.1f})"
     
     # MACD signals
-    latest_macd = df['macd'].iloc[-1]
-    latest_signal = df['macd_signal'].iloc[-1]
-    latest_hist = df['macd_histogram'].iloc[-1]
-    prev_hist = df['macd_histogram'].iloc[-2] if len(df) > 1 else 0
+    latest_macd = latest['macd']
+    latest_signal = latest['macd_signal']
+    latest_hist = latest['macd_histogram']
+    prev_hist = latest['prev_macd_histogram']
     
     if pd.isna(latest_macd) or pd.isna(latest_signal) or pd.isna(latest_hist):
         signals['MACD'] = "Insufficient Data"
@@ -131,9 +121,9 @@ def get_indicator_signals(df: pd.DataFrame) -> Dict[str, str]:
             signals['MACD'] = "Bearish"
     
     # Trend signals based on moving averages
-    latest_close = df['close'].iloc[-1]
-    latest_sma20 = df['sma_20'].iloc[-1]
-    latest_sma50 = df['sma_50'].iloc[-1]
+    latest_close = latest['close']
+    latest_sma20 = latest['sma_20']
+    latest_sma50 = latest['sma_50']
     
     # Check if we have enough data for at least SMA20
     if pd.notna(latest_sma20):
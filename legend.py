@@ -28,6 +28,7 @@ LEGEND_TEXT = """
 - *Head & Shoulders*: Reversal pattern with three peaks, middle one highest
 - *Bull/Bear Flags*: Continuation patterns after strong moves
 - *Triangles*: Consolidation patterns (ascending, descending, symmetrical)
+- Detected patterns are outlined on the price chart with their necklines/trendlines dotted (green: bullish, red: bearish, gray: neutral) and listed under *Patterns* with a 0-1 fit score
 
 Use `/chart <token_address>` to generate a chart with these indicators.
 """
\ No newline at end of file
@@ -0,0 +1,264 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Stages of a chart request are timed with `span`, which feeds the
+`chart_stage_seconds` histogram. Modules that own counters (caches, the
+request scheduler, the render pool) register callback metrics that are read
+when /metrics is scraped, so the hot paths only increment plain attributes.
+
+Render workers run in separate processes, so spans recorded there are
+collected with `collect_spans` and replayed in the bot process with
+`record_spans`.
+"""
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from http_server import Request, Response
+
+LabelValues = Tuple[str, ...]
+
+# Seconds; covers cache hits (sub-millisecond) up to slow API retries
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class Metric:
+    """Base class for a named metric family with a fixed set of label names."""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+class Counter(Metric):
+    """Monotonically increasing value per label set."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in values]
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram per label set."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (non-cumulative, last is +Inf), sum, count]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._label_values(labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, [list(counts), total, count])
+                            for key, (counts, total, count) in self._series.items())
+        lines = []
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class CallbackMetric(Metric):
+    """
+    Gauge or counter whose value is read from a callback at scrape time.
+
+    The callback returns a single number, or a dict mapping label value
+    tuples to numbers.
+    """
+
+    def __init__(self, name: str, documentation: str, func: Callable[[], Union[float, Dict[LabelValues, float]]],
+                 kind: str = "gauge", labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.func = func
+
+    def samples(self) -> List[str]:
+        values = self.func()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(values.items())]
+
+class Registry:
+    """Collection of metric families rendered together on /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, func: Callable, kind: str = "gauge",
+                 labelnames: Sequence[str] = ()) -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, func, kind, labelnames))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        blocks = []
+        for metric in self._metrics.values():
+            try:
+                blocks.append(metric.render())
+            except Exception as e:
+                logging.warning(f"Failed to collect metric {metric.name}: {e}")
+        return "\n".join(blocks) + "\n"
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "chart_stage_seconds", "Duration of each stage of a chart request", ("stage",)
+)
+API_REQUEST_SECONDS = registry.histogram(
+    "gecko_api_request_seconds", "GeckoTerminal API request duration by endpoint and status",
+    ("endpoint", "status")
+)
+API_RESPONSE_BYTES = registry.counter(
+    "gecko_api_response_bytes_total", "Bytes received from the GeckoTerminal API", ("endpoint",)
+)
+API_QUEUE_SECONDS = registry.histogram(
+    "gecko_api_queue_wait_seconds", "Time API requests waited for a rate-limit token"
+)
+TELEGRAM_SEND_SECONDS = registry.histogram(
+    "telegram_send_seconds", "Duration of sending a chart to Telegram", ("method",)
+)
+DASHBOARD_REQUEST_SECONDS = registry.histogram(
+    "dashboard_request_seconds", "Dashboard API request duration by route and status", ("route", "status")
+)
+
+# Spans recorded while collecting (inside render workers) instead of being observed directly
+_collected: Optional[List[Tuple[str, float]]] = None
+
+@contextmanager
+def span(stage: str):
+    """
+    Time a block as one stage of a chart request.
+
+    Example:
+        with span("indicators"):
+            df = add_indicators(df)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if _collected is not None:
+            _collected.append((stage, elapsed))
+        else:
+            STAGE_SECONDS.observe(elapsed, stage=stage)
+
+@contextmanager
+def timed(histogram: Histogram, **labels: str):
+    """Observe the duration of a block in `histogram` with the given labels."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+@contextmanager
+def collect_spans():
+    """
+    Collect the spans recorded inside the block into a list instead of the registry.
+
+    Used in render worker processes, whose registry is never scraped; the
+    list is sent back with the result and replayed with `record_spans`.
+    """
+    global _collected
+
+    previous, _collected = _collected, []
+    try:
+        yield _collected
+    finally:
+        _collected = previous
+
+def hit_ratio(hits: int, misses: int) -> float:
+    """Share of lookups that were hits (0 before the first lookup)."""
+    total = hits + misses
+    return hits / total if total else 0.0
+
+def record_spans(spans: Sequence[Tuple[str, float]]):
+    """Observe spans collected in another process."""
+    for stage, elapsed in spans:
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+
+async def metrics_handler(request: Request) -> Response:
+    """Serve the registry in the Prometheus text format."""
+    return Response(body=registry.render().encode(), content_type=CONTENT_TYPE)
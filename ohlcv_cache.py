@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+import pandas as pd
+
+from config import OHLCV_CACHE_SETTINGS, ENDPOINT_SECONDS
+from request_scheduler import priority, PRIORITY_BACKGROUND
+from metrics import registry, hit_ratio
+
+# (network, pool_address, endpoint, aggregate)
+CacheKey = Tuple[str, str, str, int]
+
+def candle_ttl(endpoint: str, aggregate: int) -> float:
+    """
+    Get how long a cached frame stays fresh for a given candle interval.
+
+    Args:
+        endpoint: OHLCV endpoint (minute, hour, day)
+        aggregate: Number of units per candle
+
+    Returns:
+        Freshness TTL in seconds
+    """
+    interval = ENDPOINT_SECONDS.get(endpoint, 3600) * aggregate
+    ttl = interval * OHLCV_CACHE_SETTINGS["ttl_fraction"]
+    return min(max(ttl, OHLCV_CACHE_SETTINGS["min_ttl"]), OHLCV_CACHE_SETTINGS["max_ttl"])
+
+@dataclass
+class CacheEntry:
+    df: pd.DataFrame
+    limit: int
+    fetched_at: float
+    ttl: float
+    nbytes: int
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def is_fresh(self) -> bool:
+        return self.age() <= self.ttl
+
+    def is_servable_stale(self) -> bool:
+        return self.age() <= self.ttl * OHLCV_CACHE_SETTINGS["stale_factor"]
+
+class OhlcvCache:
+    """
+    Bounded in-memory cache of OHLCV frames with stale-while-revalidate.
+
+    Fresh entries are served directly. Entries past their TTL but inside the
+    stale window are served immediately while a single background refresh
+    runs. Older entries are refetched inline, but are still served if the
+    refetch fails (e.g. while rate limited). Least recently used entries are
+    evicted once the total frame size exceeds the memory budget.
+    """
+
+    def __init__(self, max_bytes: int = OHLCV_CACHE_SETTINGS["max_bytes"]):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self._size = 0
+        self._refreshing: Dict[CacheKey, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        """Look up an entry and mark it as recently used."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: CacheKey, df: pd.DataFrame, limit: int, ttl: float):
+        """Store a frame, evicting least recently used entries if over budget."""
+        self.discard(key)
+        nbytes = int(df.memory_usage(index=True).sum())
+        if nbytes > self.max_bytes:
+            logging.warning(f"OHLCV frame for {key} ({nbytes} bytes) exceeds cache budget, not cached")
+            return
+
+        self._entries[key] = CacheEntry(df, limit, time.monotonic(), ttl, nbytes)
+        self._size += nbytes
+
+        while self._size > self.max_bytes:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.nbytes
+            logging.debug("Evicted OHLCV cache entry %s", evicted_key)
+
+    def discard(self, key: CacheKey):
+        """Remove an entry if present."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.nbytes
+
+    def _refresh_in_background(self, key: CacheKey, limit: int, ttl: float,
+                               fetch: Callable[[int], Awaitable[Optional[pd.DataFrame]]]):
+        """Start a refresh for a key unless one is already running."""
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                with priority(PRIORITY_BACKGROUND):
+                    df = await fetch(limit)
+                if df is not None and not df.empty:
+                    self.put(key, df, limit, ttl)
+            except Exception as e:
+                logging.error(f"Background OHLCV refresh failed for {key}: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        task = asyncio.create_task(refresh())
+        self._refreshing[key] = task
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def get_or_fetch(self, key: CacheKey, limit: int, ttl: float,
+                           fetch: Callable[[int], Awaitable[Optional[pd.DataFrame]]]) -> Optional[pd.DataFrame]:
+        """
+        Serve a frame from the cache, fetching or revalidating it as needed.
+
+        Returned frames are shared with the cache and must be treated as read-only.
+
+        Args:
+            key: Cache key (network, pool_address, endpoint, aggregate)
+            limit: Number of candles the caller asked for
+            ttl: Freshness TTL in seconds
+            fetch: Coroutine factory that loads the given number of candles
+
+        Returns:
+            DataFrame with OHLCV data or None if nothing could be loaded
+        """
+        entry = self.get(key)
+        # Refetches keep the deepest history any caller asked for, so shorter
+        # and longer requests for the same series don't evict each other
+        fetch_limit = max(limit, entry.limit) if entry is not None else limit
+        covered = entry is not None and entry.limit >= limit
+
+        if covered and entry.is_fresh():
+            self.hits += 1
+            return entry.df.iloc[-limit:]
+
+        if covered and entry.is_servable_stale():
+            self.stale_hits += 1
+            self._refresh_in_background(key, fetch_limit, ttl, fetch)
+            return entry.df.iloc[-limit:]
+
+        self.misses += 1
+        df = await fetch(fetch_limit)
+        if df is not None and not df.empty:
+            self.put(key, df, fetch_limit, ttl)
+            return df.iloc[-limit:]
+
+        if entry is not None:
+            logging.warning(f"Serving expired OHLCV data for {key} ({entry.age():.0f}s old) after failed fetch")
+            return entry.df.iloc[-limit:]
+
+        return df
+
+    async def close(self):
+        """Cancel any background refreshes that are still running."""
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+
+ohlcv_cache = OhlcvCache()
+
+registry.callback("ohlcv_cache_requests_total", "OHLCV cache lookups by result",
+                  lambda: {("hit",): ohlcv_cache.hits, ("stale",): ohlcv_cache.stale_hits,
+                           ("miss",): ohlcv_cache.misses},
+                  kind="counter", labelnames=("result",))
+registry.callback("ohlcv_cache_hit_ratio", "Share of OHLCV cache lookups served from memory (fresh or stale)",
+                  lambda: hit_ratio(ohlcv_cache.hits + ohlcv_cache.stale_hits, ohlcv_cache.misses))
+registry.callback("ohlcv_cache_bytes", "Memory used by cached OHLCV frames", lambda: ohlcv_cache.size_bytes)
@@ -0,0 +1,290 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from support_resistance import find_pivots
+
+Point = Tuple[int, float]
+
+BULLISH = "Bullish"
+BEARISH = "Bearish"
+NEUTRAL = "Neutral"
+
+@dataclass
+class Pattern:
+    name: str
+    bias: str  # BULLISH, BEARISH or NEUTRAL
+    score: float  # 0..1, how cleanly the pivots fit the pattern
+    start: int  # Candle index of the first pivot
+    end: int  # Candle index of the last pivot
+    points: List[Point]  # Pivot outline, drawn as a polyline
+    lines: List[Tuple[Point, Point]] = field(default_factory=list)  # Necklines and trendlines
+
+def alternating_pivots(highs: np.ndarray, lows: np.ndarray, window: int = 5,
+                       pivots: Optional[Tuple[np.ndarray, np.ndarray]] = None):
+    """
+    Merge pivot lows and highs into one alternating swing sequence.
+
+    Runs of consecutive pivots of the same kind are reduced to their
+    extreme (highest high / lowest low), so highs and lows strictly alternate.
+
+    Args:
+        highs: High prices, oldest first
+        lows: Low prices, oldest first
+        window: Pivot window, if pivots are not given
+        pivots: (pivot_low_indices, pivot_high_indices) from find_pivots, to reuse
+
+    Returns:
+        Tuple of (indices, prices, is_high) arrays ordered by index
+    """
+    low_idx, high_idx = pivots if pivots is not None else find_pivots(highs, lows, window)
+    idx = np.r_[low_idx, high_idx]
+    is_high = np.r_[np.zeros(len(low_idx), bool), np.ones(len(high_idx), bool)]
+    price = np.r_[lows[low_idx], highs[high_idx]]
+    if idx.size == 0:
+        return idx, price, is_high
+
+    order = np.lexsort((is_high, idx))
+    idx, price, is_high = idx[order], price[order], is_high[order]
+
+    # Keep the extreme pivot of each run of same-kind pivots
+    run = np.cumsum(np.r_[True, is_high[1:] != is_high[:-1]])
+    signed = np.where(is_high, price, -price)
+    best = np.lexsort((-signed, run))
+    first_of_run = np.r_[True, run[best][1:] != run[best][:-1]]
+    keep = np.sort(best[first_of_run])
+    return idx[keep], price[keep], is_high[keep]
+
+def _windows(values: np.ndarray, size: int) -> np.ndarray:
+    """Sliding windows of `size` consecutive values, one row per start position."""
+    if len(values) < size:
+        return np.empty((0, size), dtype=values.dtype)
+    return np.lib.stride_tricks.sliding_window_view(values, size)
+
+def _closeness(a: np.ndarray, b: np.ndarray, tolerance: float) -> np.ndarray:
+    """1 when two prices are equal, falling linearly to 0 at `tolerance` relative difference."""
+    return np.clip(1 - np.abs(a - b) / np.maximum(a, b) / tolerance, 0, 1)
+
+def _double(idx, price, is_high, tolerance: float, top: bool) -> List[Pattern]:
+    """Double tops (high, low, high) or bottoms (low, high, low) with matching extremes."""
+    I, P, H = _windows(idx, 3), _windows(price, 3), _windows(is_high, 3)
+    candidates = H[:, 0] == top
+    if top:
+        depth = (np.minimum(P[:, 0], P[:, 2]) - P[:, 1]) / np.minimum(P[:, 0], P[:, 2])
+    else:
+        depth = (P[:, 1] - np.maximum(P[:, 0], P[:, 2])) / P[:, 1]
+    match = _closeness(P[:, 0], P[:, 2], tolerance)
+    # Peaks must match and the valley between them must be clearly deeper than the tolerance
+    score = match * np.clip(depth / (2 * tolerance), 0, 1)
+    valid = candidates & (match > 0) & (depth > tolerance)
+
+    name, bias = ("Double Top", BEARISH) if top else ("Double Bottom", BULLISH)
+    patterns = []
+    for k in np.flatnonzero(valid):
+        points = [(int(i), float(p)) for i, p in zip(I[k], P[k])]
+        neckline = (points[1], (points[2][0], points[1][1]))
+        patterns.append(Pattern(name, bias, float(score[k]), points[0][0], points[2][0], points, [neckline]))
+    return patterns
+
+def _head_and_shoulders(idx, price, is_high, tolerance: float, inverse: bool) -> List[Pattern]:
+    """Head and shoulders (five swings, middle extreme highest) or its inverse on lows."""
+    I, P, H = _windows(idx, 5), _windows(price, 5), _windows(is_high, 5)
+    sign = -1.0 if inverse else 1.0
+    S = P * sign  # Mirror the inverse pattern so both are "highest head" checks
+    candidates = H[:, 0] == (not inverse)
+    shoulders = np.maximum(S[:, 0], S[:, 4])
+    head_gain = (S[:, 2] - shoulders) / np.abs(shoulders)
+    shoulder_match = _closeness(np.abs(S[:, 0]), np.abs(S[:, 4]), 2 * tolerance)
+    neck_match = _closeness(np.abs(S[:, 1]), np.abs(S[:, 3]), 2 * tolerance)
+    score = shoulder_match * (0.5 + 0.5 * neck_match) * np.clip(head_gain / (2 * tolerance), 0, 1)
+    valid = candidates & (head_gain > tolerance / 2) & (shoulder_match > 0) & \
+        (np.minimum(S[:, 0], S[:, 4]) > np.maximum(S[:, 1], S[:, 3]))
+
+    name, bias = ("Inverse Head & Shoulders", BULLISH) if inverse else ("Head & Shoulders", BEARISH)
+    patterns = []
+    for k in np.flatnonzero(valid):
+        points = [(int(i), float(p)) for i, p in zip(I[k], P[k])]
+        neckline = (points[1], points[3])
+        patterns.append(Pattern(name, bias, float(score[k]), points[0][0], points[4][0], points, [neckline]))
+    return patterns
+
+def _triangles(idx, price, is_high, tolerance: float) -> List[Pattern]:
+    """
+    Triangles over five alternating swings: lines through the first and last
+    high and the first and last low, classified by their slopes.
+    """
+    I, P, H = _windows(idx, 5), _windows(price, 5), _windows(is_high, 5)
+    if not len(I):
+        return []
+    # With five alternating swings, one side has pivots 0, 2, 4 and the other 1, 3
+    outer_high = H[:, 0]
+    hi_first = np.where(outer_high, 0, 1)
+    hi_last = np.where(outer_high, 4, 3)
+    lo_first = 1 - hi_first
+    lo_last = 7 - hi_last
+    rows = np.arange(len(I))
+
+    def line(first, last):
+        x0, y0 = I[rows, first].astype(float), P[rows, first]
+        x1, y1 = I[rows, last].astype(float), P[rows, last]
+        return x0, y0, x1, y1, (y1 - y0) / np.maximum(x1 - x0, 1)
+
+    hx0, hy0, hx1, hy1, high_slope = line(hi_first, hi_last)
+    lx0, ly0, lx1, ly1, low_slope = line(lo_first, lo_last)
+
+    # Relative change of each line over the pattern
+    start, end = I[:, 0].astype(float), I[:, 4].astype(float)
+    mean_price = P.mean(axis=1)
+    high_change = high_slope * (end - start) / mean_price
+    low_change = low_slope * (end - start) / mean_price
+
+    # The middle pivot of the three-pivot side should sit on its line
+    mid = np.full(len(I), 2)
+    mx, my = I[rows, mid].astype(float), P[rows, mid]
+    expected = np.where(outer_high, hy0 + high_slope * (mx - hx0), ly0 + low_slope * (mx - lx0))
+    fit = np.clip(1 - np.abs(my - expected) / my / tolerance, 0, 1)
+
+    range_start = (hy0 + high_slope * (start - hx0)) - (ly0 + low_slope * (start - lx0))
+    range_end = (hy0 + high_slope * (end - hx0)) - (ly0 + low_slope * (end - lx0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        convergence = np.clip(1 - range_end / range_start, 0, 1)
+    converging = (range_start > 0) & (range_end > 0) & (range_end < range_start)
+
+    flat_high = np.abs(high_change) <= tolerance
+    flat_low = np.abs(low_change) <= tolerance
+    kinds = [
+        ("Ascending Triangle", BULLISH, flat_high & (low_change > tolerance)),
+        ("Descending Triangle", BEARISH, flat_low & (high_change < -tolerance)),
+        ("Symmetrical Triangle", NEUTRAL, (high_change < -tolerance) & (low_change > tolerance)),
+    ]
+    score = fit * (0.4 + 0.6 * convergence)
+
+    patterns = []
+    for name, bias, mask in kinds:
+        for k in np.flatnonzero(mask & converging & (fit > 0)):
+            points = [(int(i), float(p)) for i, p in zip(I[k], P[k])]
+            lines = [((int(start[k]), float(hy0[k] + high_slope[k] * (start[k] - hx0[k]))),
+                      (int(end[k]), float(hy0[k] + high_slope[k] * (end[k] - hx0[k])))),
+                     ((int(start[k]), float(ly0[k] + low_slope[k] * (start[k] - lx0[k]))),
+                      (int(end[k]), float(ly0[k] + low_slope[k] * (end[k] - lx0[k]))))]
+            patterns.append(Pattern(name, bias, float(score[k]), int(start[k]), int(end[k]), points, lines))
+    return patterns
+
+def _flags(idx, price, is_high, tolerance: float) -> List[Pattern]:
+    """
+    Bull/bear flags: a sharp swing (the pole) followed by a shallow pullback
+    swing that retraces less than half of it and doesn't exceed the pole's end.
+    """
+    I, P, H = _windows(idx, 4), _windows(price, 4), _windows(is_high, 4)
+    bull = ~H[:, 0]  # low, high, low, high
+    sign = np.where(bull, 1.0, -1.0)[:, None]
+    S = P * sign
+    pole = (S[:, 1] - S[:, 0]) / np.abs(P[:, 0])
+    pole_candles = (I[:, 1] - I[:, 0]).astype(float)
+    flag_candles = (I[:, 3] - I[:, 1]).astype(float)
+    retrace = (S[:, 1] - S[:, 2]) / np.maximum(S[:, 1] - S[:, 0], 1e-12)
+    # The flag's second swing stays at or below the pole's end (counter-trend drift)
+    drift = (S[:, 3] - S[:, 1]) / np.abs(P[:, 1])
+
+    min_pole = 3 * tolerance
+    valid = (pole > min_pole) & (retrace > 0) & (retrace < 0.5) & (drift <= tolerance / 2) & \
+        (flag_candles >= pole_candles / 2)
+    score = np.clip(pole / (2 * min_pole), 0, 1) * np.clip(1 - retrace, 0, 1)
+
+    patterns = []
+    for k in np.flatnonzero(valid):
+        points = [(int(i), float(p)) for i, p in zip(I[k], P[k])]
+        name, bias = ("Bull Flag", BULLISH) if bull[k] else ("Bear Flag", BEARISH)
+        channel = [(points[1], points[3]), (points[2], (points[3][0], points[2][1] + points[3][1] - points[1][1]))]
+        patterns.append(Pattern(name, bias, float(score[k]), points[0][0], points[3][0], points, channel))
+    return patterns
+
+def _overlap(a: Pattern, b: Pattern) -> float:
+    """Overlap of two patterns as a fraction of the shorter one's span."""
+    shared = min(a.end, b.end) - max(a.start, b.start)
+    return shared / max(min(a.end - a.start, b.end - b.start), 1)
+
+def _best_non_overlapping(patterns: List[Pattern], max_overlap: float = 0.5) -> List[Pattern]:
+    """Greedily keep the best-scoring patterns, dropping any that mostly overlap a better one."""
+    selected: List[Pattern] = []
+    for pattern in sorted(patterns, key=lambda p: -p.score):
+        if all(_overlap(pattern, p) <= max_overlap for p in selected):
+            selected.append(pattern)
+    return selected
+
+def detect_patterns(highs: np.ndarray, lows: np.ndarray, window: int = 5, tolerance: float = 0.03,
+                    min_score: float = 0.5,
+                    pivots: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> List[Pattern]:
+    """
+    Detect double tops/bottoms, (inverse) head & shoulders, triangles and flags.
+
+    All candidate pivot sequences of each pattern are scored at once on
+    sliding windows over the alternating swing points, so the cost is a few
+    array operations per pattern type regardless of the number of candles.
+
+    Args:
+        highs: High prices, oldest first
+        lows: Low prices, oldest first
+        window: Pivot window (as for support/resistance detection)
+        tolerance: Relative price tolerance for "equal" and "flat"
+        min_score: Minimum score for a pattern to be reported
+        pivots: Pivots from find_pivots to reuse instead of recomputing them
+
+    Returns:
+        Patterns sorted by score, best first
+    """
+    highs = np.asarray(highs, dtype=float)
+    lows = np.asarray(lows, dtype=float)
+    idx, price, is_high = alternating_pivots(highs, lows, window, pivots)
+
+    patterns = (
+        _double(idx, price, is_high, tolerance, top=True)
+        + _double(idx, price, is_high, tolerance, top=False)
+        + _head_and_shoulders(idx, price, is_high, tolerance, inverse=False)
+        + _head_and_shoulders(idx, price, is_high, tolerance, inverse=True)
+        + _triangles(idx, price, is_high, tolerance)
+        + _flags(idx, price, is_high, tolerance)
+    )
+    patterns = [p for p in patterns if p.score >= min_score]
+    return _best_non_overlapping(patterns)
+
+def recent_patterns(patterns: Sequence[Pattern], length: int, recent: int) -> List[Pattern]:
+    """
+    Patterns whose last pivot lies within the newest `recent` of `length` candles,
+    keeping only the best-scoring one of each name (input is sorted best first).
+    """
+    seen = set()
+    result = []
+    for pattern in patterns:
+        if pattern.end >= length - recent and pattern.name not in seen:
+            seen.add(pattern.name)
+            result.append(pattern)
+    return result
+
+def format_patterns(patterns: Sequence[Pattern], limit: int = 3) -> str:
+    """Summarize patterns for the signals dict, e.g. 'Double Bottom (Bullish, 0.82)'."""
+    if not patterns:
+        return "None detected"
+    return ", ".join(f"{p.name} ({p.bias}, {p.score:.2f})" for p in patterns[:limit])
+
+PATTERN_COLORS: Dict[str, str] = {BULLISH: 'green', BEARISH: 'red', NEUTRAL: 'gray'}
+
+def plot_patterns(ax, patterns: Sequence[Pattern], x_values: Sequence):
+    """
+    Plot pattern outlines, necklines/trendlines and labels on the given axis.
+
+    Args:
+        ax: Matplotlib axis to plot on
+        patterns: Detected patterns
+        x_values: X coordinate for each candle index (e.g. the DataFrame index)
+    """
+    for pattern in patterns:
+        color = PATTERN_COLORS[pattern.bias]
+        xs = [x_values[i] for i, _ in pattern.points]
+        ys = [p for _, p in pattern.points]
+        ax.plot(xs, ys, color=color, linewidth=1.2, alpha=0.8)
+        for (i0, y0), (i1, y1) in pattern.lines:
+            ax.plot([x_values[i0], x_values[i1]], [y0, y1], ':', color=color, linewidth=1, alpha=0.8)
+        ax.annotate(pattern.name, (xs[-1], ys[-1]), textcoords='offset points', xytext=(0, 6),
+                    ha='center', fontsize=8, color=color)
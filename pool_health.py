@@ -0,0 +1,131 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+from config import POOL_FALLBACK_SETTINGS
+from metrics import registry
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+@dataclass
+class PoolHealth:
+    failures: int = 0  # Consecutive failed fetches
+    trips: int = 0  # Consecutive times the breaker opened without a successful probe since
+    opened_until: float = 0.0
+    probing: bool = False  # A half-open trial fetch is in flight
+    latency: Optional[float] = None  # EWMA of successful fetch times in seconds
+
+class PoolBreakers:
+    """
+    Circuit breakers and latency estimates for OHLCV pools.
+
+    A pool whose fetches fail (errors, no data or too few candles)
+    `failure_threshold` times in a row is skipped for `cooldown` seconds.
+    After that a single trial fetch is let through (half-open); success
+    closes the breaker, failure opens it again for twice as long, up to
+    `max_cooldown`.
+
+    Health is tracked per (pool address, timeframe) key, since a pool can
+    have plenty of hourly candles but too few weekly ones.
+    """
+
+    def __init__(self, failure_threshold: int = POOL_FALLBACK_SETTINGS["failure_threshold"],
+                 cooldown: float = POOL_FALLBACK_SETTINGS["cooldown"],
+                 max_cooldown: float = POOL_FALLBACK_SETTINGS["max_cooldown"],
+                 max_tracked: int = POOL_FALLBACK_SETTINGS["max_tracked"]):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_tracked = max_tracked
+        self._pools: "OrderedDict[Hashable, PoolHealth]" = OrderedDict()
+        self.latency: Optional[float] = None  # EWMA of successful fetch times across all pools
+        self.skipped = 0
+
+    def _health(self, key: Hashable) -> PoolHealth:
+        health = self._pools.get(key)
+        if health is None:
+            health = self._pools[key] = PoolHealth()
+            while len(self._pools) > self.max_tracked:
+                self._pools.popitem(last=False)
+        else:
+            self._pools.move_to_end(key)
+        return health
+
+    def state(self, key: Hashable) -> str:
+        """Breaker state of a pool: closed, open or half_open."""
+        health = self._pools.get(key)
+        if health is None or health.failures < self.failure_threshold:
+            return CLOSED
+        return OPEN if time.monotonic() < health.opened_until else HALF_OPEN
+
+    def allow(self, key: Hashable) -> bool:
+        """
+        Whether a fetch from the pool should be attempted now.
+
+        In the half-open state only one caller gets True (the trial fetch)
+        until its outcome is recorded or released.
+        """
+        state = self.state(key)
+        if state == CLOSED:
+            return True
+        health = self._health(key)
+        if state == HALF_OPEN and not health.probing:
+            health.probing = True
+            return True
+        self.skipped += 1
+        return False
+
+    def record_success(self, key: Hashable, seconds: float):
+        """Close the pool's breaker and update its latency estimate."""
+        health = self._health(key)
+        health.failures = 0
+        health.trips = 0
+        health.probing = False
+        health.latency = seconds if health.latency is None else 0.8 * health.latency + 0.2 * seconds
+        self.latency = seconds if self.latency is None else 0.9 * self.latency + 0.1 * seconds
+
+    def record_failure(self, key: Hashable):
+        """Count a failed fetch, opening the breaker at the threshold or after a failed trial."""
+        health = self._health(key)
+        health.failures += 1
+        if health.probing or health.failures == self.failure_threshold:
+            cooldown = min(self.cooldown * 2 ** health.trips, self.max_cooldown)
+            health.opened_until = time.monotonic() + cooldown
+            health.trips += 1
+        health.probing = False
+
+    def release(self, key: Hashable):
+        """Forget an attempt whose outcome is unknown (it was cancelled)."""
+        health = self._pools.get(key)
+        if health is not None:
+            health.probing = False
+
+    def hedge_delay(self, key: Hashable) -> float:
+        """
+        Seconds to wait for the pool before hedging with the next one.
+
+        A multiple of the pool's typical fetch time (or of all pools' for a
+        pool without history), so fast pools are hedged early and
+        slow-but-healthy ones aren't hedged on every request.
+        """
+        settings = POOL_FALLBACK_SETTINGS
+        health = self._pools.get(key)
+        latency = health.latency if health is not None and health.latency is not None else self.latency
+        if latency is None:
+            return settings["hedge_delay"]
+        delay = settings["hedge_latency_factor"] * latency
+        return min(max(delay, settings["hedge_delay_min"]), settings["hedge_delay"])
+
+    @property
+    def open_count(self) -> int:
+        return sum(1 for key in self._pools if self.state(key) != CLOSED)
+
+pool_breakers = PoolBreakers()
+
+registry.callback("pool_breakers_open", "Pools currently skipped (or on trial) by their circuit breaker",
+                  lambda: pool_breakers.open_count)
+registry.callback("pool_breaker_skips_total", "Pool fetches skipped because the pool's breaker was open",
+                  lambda: pool_breakers.skipped, kind="counter")
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Set
+
+from config import DERIVE_TIMEFRAMES, PREFETCH_SETTINGS, TIMEFRAMES
+from data_fetcher import get_token_chart_data
+from metrics import registry
+from render_pool import render_queue_depth
+from request_scheduler import scheduler, priority, PRIORITY_BACKGROUND
+from timeframes import can_derive
+
+def prefetch_order(shown: str) -> List[str]:
+    """
+    Timeframes to prefetch after `shown`, cheapest first.
+
+    Timeframes built from the same endpoint's base candles as `shown` (the
+    base timeframe and those derived from it) cost at most a one-time
+    backfill of that series, usually just a render since its candles were
+    just fetched; the others need their own API requests.
+    """
+    endpoint = TIMEFRAMES[shown]["endpoint"]
+
+    def shares_base(tf: str) -> bool:
+        aggregate = TIMEFRAMES[tf]["aggregate"]
+        return (DERIVE_TIMEFRAMES and TIMEFRAMES[tf]["endpoint"] == endpoint
+                and (aggregate == 1 or can_derive(endpoint, aggregate)))
+
+    others = [tf for tf in TIMEFRAMES if tf != shown]
+    if not shares_base(shown):
+        return others
+    return sorted(others, key=lambda tf: not shares_base(tf))
+
+class ChartPrefetcher:
+    """
+    Fetch and render a token's other timeframes in the background after /chart.
+
+    Charts land in the chart cache, so a timeframe button press only has to
+    send the image. Prefetching never competes with interactive work: its
+    API requests use the background priority lane and each step waits until
+    no request is queued, enough rate-limit tokens are left and the render
+    pool is idle. At most one prefetch runs per chat; it is cancelled when
+    the chat charts another token or blocks the bot, and gives up after
+    PREFETCH_SETTINGS["time_limit"] seconds.
+    """
+
+    def __init__(self, max_concurrency: int = PREFETCH_SETTINGS["max_concurrency"]):
+        self.max_concurrency = max_concurrency
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._steps: Set[asyncio.Task] = set()
+        self._semaphore = None
+        self.prefetched = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def start(self, chat_id: int, token_address: str, shown: str):
+        """
+        Prefetch the timeframes of a token other than the one just shown.
+
+        Replaces any prefetch still running for the chat.
+
+        Args:
+            chat_id: Chat the chart was sent to
+            token_address: Charted token
+            shown: Timeframe of the chart already sent
+        """
+        self.cancel(chat_id)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        task = asyncio.create_task(self._run(token_address, prefetch_order(shown)), name=f"prefetch-{chat_id}")
+        self._tasks[chat_id] = task
+        task.add_done_callback(lambda finished: self._forget(chat_id, finished))
+
+    def cancel(self, chat_id: int):
+        """Stop the chat's prefetch, if any."""
+        task = self._tasks.pop(chat_id, None)
+        if task is not None and not task.done():
+            task.cancel()
+            self.cancelled += 1
+
+    def _forget(self, chat_id: int, task: asyncio.Task):
+        if self._tasks.get(chat_id) is task:
+            del self._tasks[chat_id]
+
+    async def close(self):
+        """Cancel all running prefetches, including charts being fetched or rendered."""
+        tasks = list(self._tasks.values()) + list(self._steps)
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    def _idle() -> bool:
+        """Whether interactive work leaves room for a prefetch step."""
+        return (scheduler.queue_depth == 0
+                and scheduler.available_tokens >= PREFETCH_SETTINGS["reserve_tokens"]
+                and render_queue_depth() == 0)
+
+    async def _run(self, token_address: str, timeframes: List[str]):
+        deadline = time.monotonic() + PREFETCH_SETTINGS["time_limit"]
+        with priority(PRIORITY_BACKGROUND):
+            for timeframe in timeframes:
+                async with self._semaphore:
+                    while True:
+                        if time.monotonic() > deadline:
+                            logging.info(f"Prefetch for {token_address[:8]}... ran out of time")
+                            return
+                        if self._idle():
+                            break
+                        await asyncio.sleep(PREFETCH_SETTINGS["poll_interval"])
+
+                    # Shielded: other chats may be waiting on the same render, and a
+                    # cancelled prefetch should only stop before its next timeframe
+                    step = asyncio.create_task(get_token_chart_data(token_address, timeframe))
+                    self._steps.add(step)
+                    step.add_done_callback(self._steps.discard)
+                    chart, _ = await asyncio.shield(step)
+                    if chart is None:
+                        # Unknown token, no data or a saturated render pool: don't keep trying
+                        self.failed += 1
+                        return
+                    self.prefetched += 1
+        logging.info(f"Prefetched {len(timeframes)} timeframes for {token_address[:8]}...")
+
+prefetcher = ChartPrefetcher()
+
+registry.callback("chart_prefetch_total", "Speculatively prefetched timeframe charts by result",
+                  lambda: {("prefetched",): prefetcher.prefetched, ("failed",): prefetcher.failed,
+                           ("cancelled",): prefetcher.cancelled},
+                  kind="counter", labelnames=("result",))
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from config import RENDER_SETTINGS, CHART_SETTINGS
+from metrics import registry, collect_spans, record_spans, span
+
+class RenderQueueFull(Exception):
+    """Raised when the render pool already has the maximum number of pending charts."""
+
+_executor: Optional[ProcessPoolExecutor] = None
+_pending = 0
+
+def _warm_worker():
+    """
+    Initialize a render worker process.
+
+    Selects the non-interactive Agg backend and imports matplotlib, mplfinance
+    and the charting module up front, resolves the default font so the font
+    cache is loaded, and builds the chart template before the first real
+    chart arrives.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot  # noqa: F401
+    import mplfinance  # noqa: F401
+    from matplotlib import font_manager
+    font_manager.findfont(font_manager.FontProperties())
+    import charting  # noqa: F401
+    from renderer import get_template
+    get_template()
+
+def _render_in_worker(df: pd.DataFrame, token_address: str, timeframe: str,
+                      pool_name: Optional[str], token_symbol: Optional[str]) -> Tuple[bytes, Dict[str, str], List[Tuple[str, float]]]:
+    """
+    Render a chart inside a worker process and return the encoded image.
+
+    Stage timings recorded in the worker are returned with the result,
+    since the worker's own metrics are never scraped.
+
+    Args:
+        df: DataFrame with OHLCV data
+        token_address: Token address
+        timeframe: Chart timeframe
+        pool_name: Name of the liquidity pool (optional)
+        token_symbol: Token symbol for the title (optional)
+
+    Returns:
+        Tuple of (png_bytes, signals_dict, spans)
+    """
+    from charting import generate_token_chart, render_token_chart
+
+    render = render_token_chart if CHART_SETTINGS["renderer"] == "fast" else generate_token_chart
+    with collect_spans() as spans:
+        image, signals = render(df, token_address, timeframe, pool_name=pool_name, token_symbol=token_symbol)
+    return image, signals, spans
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared render pool, starting the worker processes on first use.
+
+    Returns:
+        ProcessPoolExecutor with warm render workers
+    """
+    global _executor
+
+    if _executor is None:
+        workers = RENDER_SETTINGS["workers"]
+        _executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker
+        )
+        logging.info(f"Started render pool with {workers} workers")
+
+    return _executor
+
+async def start_render_pool():
+    """Start the render pool and wait until every worker has been warmed up."""
+    executor = get_render_pool()
+    loop = asyncio.get_running_loop()
+    # Each no-op task forces a worker process to spawn and run its initializer
+    await asyncio.gather(*[
+        loop.run_in_executor(executor, int)
+        for _ in range(RENDER_SETTINGS["workers"])
+    ])
+
+async def shutdown_render_pool():
+    """Stop the render pool, cancelling charts that have not started yet."""
+    global _executor
+
+    if _executor is not None:
+        executor, _executor = _executor, None
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+        logging.info("Render pool shut down")
+
+def render_queue_depth() -> int:
+    """Number of charts waiting for or being rendered in the worker pool."""
+    return _pending
+
+async def render_chart(df: pd.DataFrame, token_address: str, timeframe: str,
+                       pool_name: Optional[str] = None,
+                       token_symbol: Optional[str] = None) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Render a chart in the worker pool without blocking the event loop.
+
+    Cancelling the awaiting task cancels the job if a worker has not picked it up yet.
+
+    Args:
+        df: DataFrame with OHLCV data
+        token_address: Token address
+        timeframe: Chart timeframe
+        pool_name: Name of the liquidity pool (optional)
+        token_symbol: Token symbol for the title (optional)
+
+    Returns:
+        Tuple of (png_bytes, signals_dict)
+
+    Raises:
+        RenderQueueFull: If too many charts are already waiting to be rendered
+    """
+    global _executor, _pending
+
+    if _pending >= RENDER_SETTINGS["max_queue"]:
+        raise RenderQueueFull(f"{_pending} charts already pending")
+
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        executor = get_render_pool()
+        try:
+            with span("render"):
+                image, signals, spans = await loop.run_in_executor(
+                    executor, _render_in_worker, df, token_address, timeframe, pool_name,
+                    token_symbol
+                )
+            record_spans(spans)
+            return image, signals
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); replace the pool so later charts can still render.
+            # Other charts submitted to the same pool fail too, but only the first resets it,
+            # so a pool that was already rebuilt is kept.
+            if _executor is executor:
+                logging.error("Render pool broken, restarting workers")
+                _executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+    finally:
+        _pending -= 1
+
+registry.callback("render_queue_depth", "Charts waiting for or being rendered in the worker pool",
+                  render_queue_depth)
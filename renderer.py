@@ -0,0 +1,289 @@
+import io
+import threading
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter, MaxNLocator
+from PIL import Image
+
+from config import CHART_SETTINGS
+from patterns import Pattern, PATTERN_COLORS
+from metrics import span
+
+# Colors of mplfinance's 'yahoo' style, which the original chart used
+UP_COLOR = '#00b060'
+DOWN_COLOR = '#fe3032'
+WICK_COLOR = '#606060'
+VOLUME_UP_COLOR = '#4dc790'
+VOLUME_DOWN_COLOR = '#fd6b6c'
+
+FIGSIZE = (12, 10)
+DPI = 100
+
+# Fixed panel rectangles [left, bottom, width, height] in figure coordinates
+# for price, volume, RSI and MACD (height ratios 3 : 1 : 1 : 0.5 like the GridSpec layout)
+PANEL_RECTS = [
+    [0.07, 0.505, 0.91, 0.445],
+    [0.07, 0.35, 0.91, 0.14],
+    [0.07, 0.195, 0.91, 0.14],
+    [0.07, 0.11, 0.91, 0.07],
+]
+
+def _bar_vertices(x: np.ndarray, bottom: np.ndarray, top: np.ndarray, width: float) -> np.ndarray:
+    """Build an (n, 4, 2) array of rectangle vertices for a PolyCollection."""
+    left = x - width / 2
+    right = x + width / 2
+    return np.stack([
+        np.column_stack([left, bottom]),
+        np.column_stack([left, top]),
+        np.column_stack([right, top]),
+        np.column_stack([right, bottom]),
+    ], axis=1)
+
+def _padded_limits(low: float, high: float, pad: float = 0.05):
+    if not np.isfinite(low) or not np.isfinite(high):
+        return 0.0, 1.0
+    if high == low:
+        span = abs(high) * pad or 1.0
+    else:
+        span = (high - low) * pad
+    return low - span, high + span
+
+class ChartTemplate:
+    """
+    Prebuilt four-panel chart figure that is reused for every render.
+
+    The figure, axes, fixed layout and static decorations (labels, grids,
+    RSI bands, MACD zero line) are created once. Each render adds candles,
+    volume and histogram bars as single batched collections on integer x
+    positions, sets axis limits explicitly, encodes the PNG on the Agg
+    canvas and then removes its artists again. No pyplot state, autoscaling
+    or layout engine is involved.
+    """
+
+    def __init__(self):
+        self.figure = Figure(figsize=FIGSIZE, dpi=DPI)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self._lock = threading.Lock()
+        self._artists: List = []
+        self._dates: Optional[pd.DatetimeIndex] = None
+
+        self.ax_price = self.figure.add_axes(PANEL_RECTS[0])
+        self.ax_volume = self.figure.add_axes(PANEL_RECTS[1], sharex=self.ax_price)
+        self.ax_rsi = self.figure.add_axes(PANEL_RECTS[2], sharex=self.ax_price)
+        self.ax_macd = self.figure.add_axes(PANEL_RECTS[3], sharex=self.ax_price)
+
+        self.title = self.ax_price.set_title("", fontsize=14)
+        self.ax_price.set_ylabel('Price')
+        self.ax_price.grid(True, alpha=0.3)
+        self.ax_volume.set_ylabel('Volume')
+        self.ax_rsi.set_ylabel('RSI')
+        self.ax_rsi.set_ylim(0, 100)
+        self.ax_rsi.axhline(y=70, color='r', linestyle='--', alpha=0.5)
+        self.ax_rsi.axhline(y=30, color='g', linestyle='--', alpha=0.5)
+        self.ax_macd.set_ylabel('MACD')
+        self.ax_macd.axhline(y=0, color='black', linestyle='-', alpha=0.2)
+
+        for ax in (self.ax_price, self.ax_volume, self.ax_rsi, self.ax_macd):
+            ax.autoscale(False)
+        for ax in (self.ax_price, self.ax_volume, self.ax_rsi):
+            ax.tick_params(labelbottom=False)
+
+        self.ax_macd.xaxis.set_major_locator(MaxNLocator(nbins=10, integer=True))
+        self.ax_macd.xaxis.set_major_formatter(FuncFormatter(self._format_date))
+        self.ax_macd.tick_params(axis='x', labelrotation=45)
+
+    def _format_date(self, x: float, pos=None) -> str:
+        if self._dates is None:
+            return ''
+        i = int(round(x))
+        if i < 0 or i >= len(self._dates):
+            return ''
+        return self._dates[i].strftime('%m-%d %H:%M')
+
+    def _add(self, ax, collection):
+        ax.add_collection(collection, autolim=False)
+        self._artists.append(collection)
+        return collection
+
+    def _line(self, ax, x: np.ndarray, y: np.ndarray, **kwargs):
+        line, = ax.plot(x, y, scalex=False, scaley=False, **kwargs)
+        self._artists.append(line)
+        return line
+
+    def _clear(self):
+        for artist in self._artists:
+            artist.remove()
+        self._artists = []
+        for ax in (self.ax_price, self.ax_macd):
+            legend = ax.get_legend()
+            if legend is not None:
+                legend.remove()
+
+    def render(self, df: pd.DataFrame, title: str, support_levels: List[float],
+               resistance_levels: List[float], patterns: Sequence[Pattern] = ()) -> bytes:
+        """
+        Render candles, indicators, levels and chart patterns into PNG bytes.
+
+        Args:
+            df: DataFrame with OHLCV data and indicator columns, oldest first
+            title: Chart title
+            support_levels: Support price levels
+            resistance_levels: Resistance price levels
+            patterns: Chart patterns indexed by row position in df
+
+        Returns:
+            PNG image bytes
+        """
+        with self._lock:
+            try:
+                with span("draw"):
+                    self._draw(df, title, support_levels, resistance_levels, patterns)
+                return encode_png(self.figure)
+            finally:
+                self._clear()
+
+    def _draw(self, df: pd.DataFrame, title: str, support_levels: List[float],
+              resistance_levels: List[float], patterns: Sequence[Pattern]):
+        n = len(df)
+        x = np.arange(n, dtype=float)
+        opens = df['open'].to_numpy(dtype=float)
+        highs = df['high'].to_numpy(dtype=float)
+        lows = df['low'].to_numpy(dtype=float)
+        closes = df['close'].to_numpy(dtype=float)
+        volumes = df['volume'].to_numpy(dtype=float)
+        up = closes >= opens
+        self._dates = df.index
+        self.title.set_text(title)
+
+        # Price panel: wicks and bodies as two batched collections
+        wicks = np.stack([np.column_stack([x, lows]), np.column_stack([x, highs])], axis=1)
+        self._add(self.ax_price, LineCollection(wicks, colors=WICK_COLOR, linewidths=0.8))
+        body_colors = np.where(up, UP_COLOR, DOWN_COLOR)
+        bodies = _bar_vertices(x, np.minimum(opens, closes), np.maximum(opens, closes), 0.6)
+        self._add(self.ax_price, PolyCollection(bodies, facecolors=body_colors, edgecolors=body_colors,
+                                                linewidths=0.5, alpha=0.9))
+
+        price_low, price_high = np.nanmin(lows), np.nanmax(highs)
+        if 'sma_20' in df and not df['sma_20'].isna().all():
+            self._line(self.ax_price, x, df['sma_20'].to_numpy(), color='blue', linewidth=1, label='SMA 20')
+        if 'sma_50' in df and not df['sma_50'].isna().all():
+            self._line(self.ax_price, x, df['sma_50'].to_numpy(), color='orange', linewidth=1, label='SMA 50')
+        if 'bb_upper' in df and not df['bb_upper'].isna().all():
+            self._line(self.ax_price, x, df['bb_upper'].to_numpy(), color='k', linestyle='--', alpha=0.3)
+            self._line(self.ax_price, x, df['bb_middle'].to_numpy(), color='k', linestyle='-', alpha=0.3)
+            self._line(self.ax_price, x, df['bb_lower'].to_numpy(), color='k', linestyle='--', alpha=0.3)
+            price_low = min(price_low, np.nanmin(df['bb_lower'].to_numpy()))
+            price_high = max(price_high, np.nanmax(df['bb_upper'].to_numpy()))
+
+        levels = [(level, 'green') for level in support_levels] + [(level, 'red') for level in resistance_levels]
+        if levels:
+            segments = [[(0, level), (n - 1, level)] for level, _ in levels]
+            self._add(self.ax_price, LineCollection(segments, colors=[color for _, color in levels],
+                                                    linestyles='--', linewidths=1, alpha=0.7))
+
+        # Pattern outlines (solid) and their necklines/trendlines (dotted), one collection each
+        if patterns:
+            colors = [PATTERN_COLORS[pattern.bias] for pattern in patterns]
+            self._add(self.ax_price, LineCollection([pattern.points for pattern in patterns], colors=colors,
+                                                    linewidths=1.2, alpha=0.8))
+            lines = [(line, PATTERN_COLORS[pattern.bias]) for pattern in patterns for line in pattern.lines]
+            if lines:
+                self._add(self.ax_price, LineCollection([line for line, _ in lines], colors=[c for _, c in lines],
+                                                        linestyles=':', linewidths=1, alpha=0.8))
+            for pattern, color in zip(patterns, colors):
+                x_end, y_end = pattern.points[-1]
+                self._artists.append(self.ax_price.annotate(
+                    pattern.name, (x_end, y_end), textcoords='offset points', xytext=(0, 6),
+                    ha='center', fontsize=8, color=color, annotation_clip=True))
+
+        self.ax_price.set_xlim(-1, n)
+        self.ax_price.set_ylim(*_padded_limits(price_low, price_high))
+        self.ax_price.legend(loc='upper left')
+
+        # Volume panel, colored by close-to-close direction like mplfinance
+        prev_closes = np.r_[opens[0], closes[:-1]]
+        volume_colors = np.where(closes >= prev_closes, VOLUME_UP_COLOR, VOLUME_DOWN_COLOR)
+        volume_bars = _bar_vertices(x, np.zeros(n), volumes, 0.6)
+        self._add(self.ax_volume, PolyCollection(volume_bars, facecolors=volume_colors, edgecolors=volume_colors))
+        max_volume = np.nanmax(volumes) if n else 0
+        self.ax_volume.set_ylim(0, max_volume * 1.1 if max_volume > 0 else 1)
+
+        # RSI panel
+        rsi = df['rsi'].to_numpy(dtype=float)
+        self._line(self.ax_rsi, x, rsi, color='purple', linewidth=1)
+        with np.errstate(invalid='ignore'):
+            self._artists.append(self.ax_rsi.fill_between(x, rsi, 70, where=(rsi >= 70), color='r', alpha=0.3))
+            self._artists.append(self.ax_rsi.fill_between(x, rsi, 30, where=(rsi <= 30), color='g', alpha=0.3))
+
+        # MACD panel
+        macd = df['macd'].to_numpy(dtype=float)
+        signal = df['macd_signal'].to_numpy(dtype=float)
+        hist = df['macd_histogram'].to_numpy(dtype=float)
+        self._line(self.ax_macd, x, macd, color='blue', linewidth=1, label='MACD')
+        self._line(self.ax_macd, x, signal, color='red', linewidth=1, label='Signal')
+        hist_values = np.nan_to_num(hist)
+        hist_colors = np.where(hist_values >= 0, 'g', 'r')
+        hist_bars = _bar_vertices(x, np.zeros(n), hist_values, 0.8)
+        self._add(self.ax_macd, PolyCollection(hist_bars, facecolors=hist_colors, edgecolors='none', alpha=0.5))
+        macd_values = np.concatenate([macd, signal, hist])
+        macd_values = macd_values[np.isfinite(macd_values)]
+        if macd_values.size:
+            self.ax_macd.set_ylim(*_padded_limits(min(macd_values.min(), 0), max(macd_values.max(), 0), 0.1))
+        else:
+            self.ax_macd.set_ylim(-1, 1)
+        self.ax_macd.legend(loc='upper left', fontsize='small')
+
+_template: Optional[ChartTemplate] = None
+
+def encode_png(figure: Figure) -> bytes:
+    """
+    Rasterize a figure and encode it as PNG.
+
+    Charts are a few flat colors plus anti-aliasing shades, so a 256-color
+    palette (CHART_SETTINGS["png_colors"]) looks the same as truecolor at
+    about a third of the size, and is quicker to compress.
+
+    Args:
+        figure: Figure attached to an Agg canvas
+
+    Returns:
+        PNG image bytes
+    """
+    with span("rasterize"):
+        figure.canvas.draw()
+    with span("encode"):
+        image = Image.fromarray(np.asarray(figure.canvas.buffer_rgba())).convert("RGB")
+        colors = CHART_SETTINGS["png_colors"]
+        if colors:
+            image = image.quantize(colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", compress_level=CHART_SETTINGS["png_compress_level"])
+        return buffer.getvalue()
+
+def get_template() -> ChartTemplate:
+    """Get this process's chart template, building it on first use."""
+    global _template
+    if _template is None:
+        _template = ChartTemplate()
+    return _template
+
+def render_message_image(message: str, fontsize: int = 14) -> bytes:
+    """
+    Render a plain text message (e.g. for insufficient data) as a PNG image.
+
+    Args:
+        message: Text to show
+        fontsize: Font size
+
+    Returns:
+        PNG image bytes
+    """
+    figure = Figure(figsize=FIGSIZE, dpi=DPI)
+    FigureCanvasAgg(figure)
+    figure.text(0.5, 0.5, message, horizontalalignment='center', verticalalignment='center', fontsize=fontsize)
+    return encode_png(figure)
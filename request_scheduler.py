@@ -0,0 +1,273 @@
+import asyncio
+import contextvars
+import itertools
+import logging
+import random
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from config import API_RATE_LIMIT
+from http_client import get_client
+from metrics import registry, API_REQUEST_SECONDS, API_RESPONSE_BYTES, API_QUEUE_SECONDS
+
+# Priority lanes: lower values are dispatched first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+# Priority for requests issued from the current task (inherited by tasks it creates)
+request_priority: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "request_priority", default=PRIORITY_INTERACTIVE
+)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+@contextmanager
+def priority(level: int):
+    """
+    Issue API requests made inside the block at the given priority.
+
+    Example:
+        with priority(PRIORITY_BACKGROUND):
+            await fetch_pool_ohlcv_data(...)
+    """
+    token = request_priority.set(level)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+def endpoint_label(url: str) -> str:
+    """Low-cardinality name of the API endpoint a URL points at (addresses stripped)."""
+    path = httpx.URL(url).path
+    if "/ohlcv/" in path:
+        return "ohlcv_" + path.rsplit("/", 1)[-1]
+    if path.endswith("/pools"):
+        return "pools"
+    if "/tokens/" in path:
+        return "token"
+    return "other"
+
+RequestKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+
+@dataclass
+class _Job:
+    key: RequestKey
+    url: str
+    params: Optional[Dict[str, Any]]
+    priority: int
+    future: asyncio.Future
+    attempt: int = 0
+    dispatched: bool = False
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+class RequestScheduler:
+    """
+    Central scheduler for GeckoTerminal API calls.
+
+    - A token bucket keeps the process within the API's calls-per-minute budget.
+    - Queued requests are dispatched by priority, so interactive commands
+      overtake background refreshes.
+    - Identical requests already queued or in flight share one response.
+    - 429 and 5xx responses (and transport errors) are retried with
+      exponential backoff; a 429 also pauses all dispatching for its
+      Retry-After period.
+
+    Under load, requests wait in the queue instead of hitting the rate limit.
+    """
+
+    def __init__(self, calls_per_minute: float = API_RATE_LIMIT["calls_per_minute"],
+                 burst: int = API_RATE_LIMIT["burst"]):
+        self.rate = calls_per_minute / 60.0
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Dict[RequestKey, _Job] = {}
+        self._tasks = set()
+        self._seq = itertools.count()
+        self.coalesced = 0
+        self.retries = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for a rate-limit token."""
+        return sum(1 for job in self._inflight.values() if not job.dispatched)
+
+    @property
+    def available_tokens(self) -> float:
+        """Requests that could be sent right now without waiting (0 while paused after a 429)."""
+        now = time.monotonic()
+        if now < self._paused_until:
+            return 0.0
+        return min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.PriorityQueue()
+            for job in self._inflight.values():
+                if not job.dispatched:
+                    self._queue.put_nowait((job.priority, next(self._seq), job))
+            self._worker = asyncio.create_task(self._dispatch())
+
+    def _enqueue(self, job: _Job):
+        job.dispatched = False
+        self._queue.put_nowait((job.priority, next(self._seq), job))
+
+    async def _take_token(self):
+        """Wait until a request may be sent under the rate limit and any 429 pause."""
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+            elif self._tokens >= 1:
+                self._tokens -= 1
+                return
+            else:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def _dispatch(self):
+        while True:
+            job_priority, _, job = await self._queue.get()
+            # Skip stale queue entries (job was re-queued at a higher priority or already sent)
+            if job.dispatched or job.future.done() or job_priority != job.priority:
+                continue
+            await self._take_token()
+            if job.attempt == 0:
+                API_QUEUE_SECONDS.observe(time.monotonic() - job.enqueued_at)
+            job.dispatched = True
+            task = asyncio.create_task(self._execute(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _backoff(self, job: _Job, response: Optional[httpx.Response] = None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), API_RATE_LIMIT["backoff_max"])
+            except ValueError:
+                pass
+        delay = API_RATE_LIMIT["backoff_base"] * (2 ** job.attempt)
+        return min(delay, API_RATE_LIMIT["backoff_max"]) * (0.5 + random.random() / 2)
+
+    async def _retry_later(self, job: _Job, delay: float, reason: str):
+        self.retries += 1
+        job.attempt += 1
+        logging.warning(f"Retrying {job.url} in {delay:.1f}s ({reason}, attempt {job.attempt})")
+        await asyncio.sleep(delay)
+        self._enqueue(job)
+
+    async def _execute(self, job: _Job):
+        endpoint = endpoint_label(job.url)
+        start = time.perf_counter()
+        try:
+            response = await get_client().get(job.url, params=job.params)
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            API_REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint, status=type(e).__name__)
+            if job.attempt < API_RATE_LIMIT["max_retries"]:
+                await self._retry_later(job, self._backoff(job), type(e).__name__)
+            else:
+                self._finish(job, exception=e)
+            return
+        except Exception as e:
+            API_REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint, status=type(e).__name__)
+            self._finish(job, exception=e)
+            return
+
+        API_REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint,
+                                    status=str(response.status_code))
+        API_RESPONSE_BYTES.inc(len(response.content), endpoint=endpoint)
+
+        if response.status_code in RETRYABLE_STATUS and job.attempt < API_RATE_LIMIT["max_retries"]:
+            delay = self._backoff(job, response)
+            if response.status_code == 429:
+                # Everyone shares the same budget, so hold all requests back
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                self._tokens = 0
+            await self._retry_later(job, delay, f"HTTP {response.status_code}")
+            return
+
+        self._finish(job, response=response)
+
+    def _finish(self, job: _Job, response: Optional[httpx.Response] = None,
+                exception: Optional[BaseException] = None):
+        self._inflight.pop(job.key, None)
+        if job.future.done():
+            return
+        if exception is not None:
+            job.future.set_exception(exception)
+            # Avoid "exception never retrieved" warnings when every caller was cancelled
+            job.future.add_done_callback(lambda f: f.exception())
+        else:
+            job.future.set_result(response)
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+                  priority: Optional[int] = None) -> httpx.Response:
+        """
+        Send a GET request through the scheduler.
+
+        Args:
+            url: Request URL
+            params: Query parameters (optional)
+            priority: Priority lane; defaults to the caller's `request_priority`
+
+        Returns:
+            The final httpx.Response (possibly a 429/5xx once retries are exhausted)
+
+        Raises:
+            httpx.HTTPError: If the request still fails at the transport level after retries
+        """
+        if priority is None:
+            priority = request_priority.get()
+        key = (url, tuple(sorted((params or {}).items())))
+
+        self._ensure_worker()
+        job = self._inflight.get(key)
+        if job is not None:
+            self.coalesced += 1
+            if priority < job.priority and not job.dispatched:
+                job.priority = priority
+                self._enqueue(job)
+        else:
+            job = _Job(key, url, params, priority, asyncio.get_running_loop().create_future())
+            self._inflight[key] = job
+            self._enqueue(job)
+
+        # Shield the shared future so one cancelled caller doesn't cancel it for the others
+        return await asyncio.shield(job.future)
+
+    async def close(self):
+        """Stop dispatching and fail any requests that are still waiting."""
+        tasks = list(self._tasks)
+        if self._worker is not None:
+            tasks.append(self._worker)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker = None
+        for job in list(self._inflight.values()):
+            self._finish(job, exception=httpx.RequestError("Request scheduler closed"))
+
+scheduler = RequestScheduler()
+
+registry.callback("gecko_api_queue_depth", "API requests waiting for a rate-limit token",
+                  lambda: scheduler.queue_depth)
+registry.callback("gecko_api_inflight_requests", "Distinct API requests queued or in flight",
+                  lambda: len(scheduler._inflight))
+registry.callback("gecko_api_coalesced_total", "API requests answered by an identical in-flight request",
+                  lambda: scheduler.coalesced, kind="counter")
+registry.callback("gecko_api_retries_total", "API requests retried after a 429, 5xx or transport error",
+                  lambda: scheduler.retries, kind="counter")
+
+async def api_get(url: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+    """Send a rate-limited, coalesced GET request to the GeckoTerminal API."""
+    return await scheduler.get(url, params=params)
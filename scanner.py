@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List, Optional, Sequence
+
+from config import SCAN_SETTINGS, CHART_SETTINGS, DEFAULT_TIMEFRAME
+from data_fetcher import resolver, fetch_token_data
+from indicators import add_indicators, get_indicator_signals
+from support_resistance import detect_support_resistance
+
+@dataclass
+class ScanResult:
+    token_address: str
+    symbol: str = ""
+    close: float = math.nan
+    rsi: float = math.nan
+    macd: str = ""
+    trend: str = ""
+    nearest_support: Optional[float] = None
+    support_distance: Optional[float] = None  # Fraction above the nearest support below the close
+    flags: List[str] = field(default_factory=list)
+    score: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return self.symbol or f"{self.token_address[:8]}..."
+
+def score_result(result: ScanResult) -> float:
+    """
+    Rank a scanned token: oversold RSI, fresh bullish MACD crossovers and a
+    close just above support score highest.
+    """
+    score = 0.0
+    result.flags = []
+    if not math.isnan(result.rsi):
+        if result.rsi < 30:
+            result.flags.append("oversold")
+            score += 3 + (30 - result.rsi) / 10
+        else:
+            # Lower RSI ranks higher among the rest
+            score += (50 - result.rsi) / 50
+    if result.macd == "Bullish Crossover":
+        result.flags.append("bull-x")
+        score += 3
+    elif result.macd == "Bullish":
+        score += 0.5
+    if result.support_distance is not None and result.support_distance <= SCAN_SETTINGS["near_support"]:
+        result.flags.append("support")
+        score += 2 * (1 - result.support_distance / SCAN_SETTINGS["near_support"])
+    return score
+
+async def scan_token(token_address: str, timeframe: str = DEFAULT_TIMEFRAME) -> ScanResult:
+    """
+    Fetch a token's candles and evaluate its signals and support levels, without rendering a chart.
+
+    Args:
+        token_address: Token address
+        timeframe: Timeframe key from TIMEFRAMES
+
+    Returns:
+        ScanResult (with `error` set if the token could not be scanned)
+    """
+    result = ScanResult(token_address)
+    context = await resolver.resolve(token_address)
+    if not context.exists:
+        result.error = "not found"
+        return result
+    result.symbol = context.symbol
+    if not context.pools:
+        result.error = "no pools"
+        return result
+
+    df, _ = await fetch_token_data(context, timeframe)
+    if df is None or df.empty:
+        result.error = "no data"
+        return result
+
+    df = add_indicators(df)
+    signals = get_indicator_signals(df)
+    result.close = float(df['close'].iloc[-1])
+    result.rsi = float(df['rsi'].iloc[-1])
+    result.macd = signals.get('MACD', '')
+    result.trend = signals.get('Trend', '')
+
+    support_levels, _ = detect_support_resistance(
+        df.iloc[-CHART_SETTINGS["window_size"]:],
+        window=CHART_SETTINGS["support_resistance_window"],
+        threshold=CHART_SETTINGS["support_resistance_threshold"]
+    )
+    below = [level for level in support_levels if level <= result.close]
+    if below:
+        result.nearest_support = max(below)
+        result.support_distance = (result.close - result.nearest_support) / result.nearest_support
+
+    result.score = score_result(result)
+    return result
+
+async def scan_tokens(token_addresses: Sequence[str], timeframe: str = DEFAULT_TIMEFRAME,
+                      max_concurrency: int = SCAN_SETTINGS["max_concurrency"]) -> AsyncIterator[ScanResult]:
+    """
+    Scan many tokens concurrently, yielding each result as soon as it is ready.
+
+    At most `max_concurrency` tokens are in flight at once; API calls still go
+    through the shared rate-limited scheduler and caches.
+
+    Args:
+        token_addresses: Token addresses (duplicates are scanned once)
+        timeframe: Timeframe key from TIMEFRAMES
+        max_concurrency: Maximum number of tokens scanned in parallel
+
+    Yields:
+        ScanResult per token, in completion order
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(token_address: str) -> ScanResult:
+        async with semaphore:
+            try:
+                return await scan_token(token_address, timeframe)
+            except Exception as e:
+                logging.error(f"Scan failed for {token_address}: {e}")
+                return ScanResult(token_address, error="failed")
+
+    tasks = [asyncio.create_task(run(address)) for address in dict.fromkeys(token_addresses)]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def rank_results(results: Sequence[ScanResult]) -> List[ScanResult]:
+    """Sort results best first; tokens that failed to scan go last."""
+    return sorted(results, key=lambda r: (r.error is not None, -r.score))
+
+def format_scan_table(results: Sequence[ScanResult], total: int, timeframe_name: str) -> str:
+    """
+    Format ranked results as a Markdown message with a monospace table.
+
+    Args:
+        results: Results scanned so far
+        total: Number of tokens in the watchlist
+        timeframe_name: Display name of the timeframe
+
+    Returns:
+        Message text
+    """
+    ranked = rank_results(results)
+    status = "done" if len(results) >= total else "scanning..."
+    lines = [f"{'#':>2} {'Token':<10} {'RSI':>5} {'MACD':<9} {'Sup%':>5} Flags"]
+    for i, r in enumerate(ranked, 1):
+        if r.error:
+            lines.append(f"{i:>2} {r.name[:10]:<10} {r.error}")
+            continue
+        rsi = f"{r.rsi:5.1f}" if not math.isnan(r.rsi) else "    -"
+        macd = r.macd.replace("Insufficient Data", "-").replace(" Crossover", "-X")
+        support = f"{r.support_distance * 100:5.1f}" if r.support_distance is not None else "    -"
+        lines.append(f"{i:>2} {r.name[:10]:<10} {rsi} {macd[:9]:<9} {support} {','.join(r.flags)}")
+    table = "\n".join(lines)
+    return f"🔎 *Scan* ({timeframe_name}) {len(results)}/{total} {status}\n```\n{table}\n```"
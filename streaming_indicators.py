@@ -0,0 +1,290 @@
+import math
+from collections import deque
+from typing import Any, Dict, Iterable, Optional
+
+import pandas as pd
+
+from indicator_engine import (
+    INDICATOR_COLUMNS, RSI_WINDOW, MACD_FAST, MACD_SLOW, MACD_SIGNAL, BB_WINDOW, BB_DEV,
+)
+from indicators import get_latest_signals
+
+NAN = float('nan')
+
+class StreamingEMA:
+    """
+    Exponential moving average updated one value at a time.
+
+    Matches pandas `ewm(alpha=alpha, adjust=False, min_periods=min_periods)`:
+    seeded with the first value and NaN until min_periods values were seen.
+    """
+
+    def __init__(self, alpha: float, min_periods: int):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.count = 0
+
+    def peek(self, x: float) -> float:
+        """EMA after `x` without committing it."""
+        value = x if self.count == 0 else self.value + self.alpha * (x - self.value)
+        return value if self.count + 1 >= self.min_periods else NAN
+
+    def update(self, x: float) -> float:
+        """Commit `x` and return the new EMA."""
+        self.value = x if self.count == 0 else self.value + self.alpha * (x - self.value)
+        self.count += 1
+        return self.current
+
+    @property
+    def current(self) -> float:
+        return self.value if self.count >= self.min_periods else NAN
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'value': self.value, 'count': self.count}
+
+    def restore(self, state: Dict[str, Any]):
+        self.value = state['value']
+        self.count = state['count']
+
+class RollingWindow:
+    """
+    Rolling mean and population standard deviation over the last `window` values.
+
+    Keeps running sums of the values (centered on the first value seen, to
+    stay well conditioned for very small or large prices) and re-sums the
+    window once per `window` updates so floating point drift cannot build up.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: deque = deque(maxlen=window)
+        self.offset: Optional[float] = None
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._since_resum = 0
+
+    def _resum(self):
+        centered = [v - self.offset for v in self.values]
+        self._sum = math.fsum(centered)
+        self._sumsq = math.fsum(c * c for c in centered)
+        self._since_resum = 0
+
+    def _moments(self, total: float, total_sq: float):
+        mean = total / self.window
+        variance = max(total_sq / self.window - mean * mean, 0.0)
+        return mean + self.offset, math.sqrt(variance)
+
+    def peek(self, x: float):
+        """(mean, std) after `x` without committing it; NaN until the window is full."""
+        if len(self.values) + 1 < self.window:
+            return NAN, NAN
+        if self.offset is None:
+            return x, 0.0
+        c = x - self.offset
+        total, total_sq = self._sum + c, self._sumsq + c * c
+        if len(self.values) == self.window:
+            dropped = self.values[0] - self.offset
+            total -= dropped
+            total_sq -= dropped * dropped
+        return self._moments(total, total_sq)
+
+    def update(self, x: float):
+        """Commit `x` and return the new (mean, std)."""
+        if self.offset is None:
+            self.offset = x
+        if len(self.values) == self.window:
+            dropped = self.values[0] - self.offset
+            self._sum -= dropped
+            self._sumsq -= dropped * dropped
+        self.values.append(x)
+        c = x - self.offset
+        self._sum += c
+        self._sumsq += c * c
+        self._since_resum += 1
+        if self._since_resum >= self.window:
+            self._resum()
+        return self.current
+
+    @property
+    def current(self):
+        if len(self.values) < self.window:
+            return NAN, NAN
+        return self._moments(self._sum, self._sumsq)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'values': list(self.values), 'offset': self.offset}
+
+    def restore(self, state: Dict[str, Any]):
+        self.values = deque(state['values'], maxlen=self.window)
+        self.offset = state['offset']
+        if self.offset is not None:
+            self._resum()
+
+class IndicatorState:
+    """
+    Incremental indicator state for one candle series.
+
+    Produces the same values as indicator_engine.compute_indicators (Wilder
+    RSI, MACD with signal and histogram, Bollinger Bands, SMA 20/50/200) but
+    costs O(1) per candle instead of recomputing the whole history:
+
+    - `update(close)` commits a closed candle.
+    - `tick(close)` evaluates the still-forming candle without committing it.
+    - `snapshot()` / `from_snapshot()` persist and restore the state.
+    - `signals()` returns get_indicator_signals-style text without a DataFrame.
+    """
+
+    def __init__(self):
+        self.prev_close = NAN
+        self.avg_gain = StreamingEMA(1.0 / RSI_WINDOW, RSI_WINDOW)
+        self.avg_loss = StreamingEMA(1.0 / RSI_WINDOW, RSI_WINDOW)
+        self.ema_fast = StreamingEMA(2.0 / (MACD_FAST + 1), MACD_FAST)
+        self.ema_slow = StreamingEMA(2.0 / (MACD_SLOW + 1), MACD_SLOW)
+        self.macd_signal = StreamingEMA(2.0 / (MACD_SIGNAL + 1), MACD_SIGNAL)
+        self.bb = RollingWindow(BB_WINDOW)
+        self.sma_50 = RollingWindow(50)
+        self.sma_200 = RollingWindow(200)
+        self.count = 0
+        self.last_timestamp: Optional[int] = None
+        self._latest: Dict[str, float] = self._empty()
+
+    @staticmethod
+    def _empty() -> Dict[str, float]:
+        latest = {name: NAN for name in INDICATOR_COLUMNS}
+        latest.update(close=NAN, prev_macd_histogram=0)
+        return latest
+
+    @classmethod
+    def from_closes(cls, closes: Iterable[float]) -> "IndicatorState":
+        """Build a state by replaying a history of closed candles, oldest first."""
+        state = cls()
+        for close in closes:
+            state.update(float(close))
+        return state
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "IndicatorState":
+        """
+        Build a state from an OHLCV frame of closed candles.
+
+        Args:
+            df: DataFrame with a 'close' column and a timestamp index, oldest first
+
+        Returns:
+            IndicatorState positioned after the frame's last candle
+        """
+        state = cls.from_closes(df['close'].to_numpy(dtype=float))
+        if len(df):
+            state.last_timestamp = int(df.index[-1].timestamp())
+        return state
+
+    def _evaluate(self, close: float, commit: bool) -> Dict[str, float]:
+        step = (lambda component, x: component.update(x)) if commit else (lambda component, x: component.peek(x))
+
+        # RSI; the first candle counts as no change
+        diff = 0.0 if math.isnan(self.prev_close) else close - self.prev_close
+        avg_gain = step(self.avg_gain, max(diff, 0.0))
+        avg_loss = step(self.avg_loss, max(-diff, 0.0))
+        if avg_loss == 0:
+            rsi = 100.0
+        elif math.isnan(avg_gain) or math.isnan(avg_loss):
+            rsi = NAN
+        else:
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+        # MACD; the signal line only starts once MACD itself is defined
+        macd = step(self.ema_fast, close) - step(self.ema_slow, close)
+        macd_signal = NAN if math.isnan(macd) else step(self.macd_signal, macd)
+
+        bb_middle, bb_std = step(self.bb, close)
+        sma_50, _ = step(self.sma_50, close)
+        sma_200, _ = step(self.sma_200, close)
+
+        return {
+            'rsi': rsi,
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_histogram': macd - macd_signal,
+            'bb_upper': bb_middle + BB_DEV * bb_std,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_middle - BB_DEV * bb_std,
+            'sma_20': bb_middle,
+            'sma_50': sma_50,
+            'sma_200': sma_200,
+            'close': close,
+            'prev_macd_histogram': self._latest['macd_histogram'] if self.count else 0,
+        }
+
+    def update(self, close: float, timestamp: Optional[int] = None) -> Dict[str, float]:
+        """
+        Commit a closed candle.
+
+        Args:
+            close: Close price of the candle
+            timestamp: Candle open time in epoch seconds (optional, tracked as last_timestamp)
+
+        Returns:
+            Latest indicator values (see latest())
+        """
+        self._latest = self._evaluate(close, commit=True)
+        self.prev_close = close
+        self.count += 1
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+        return self._latest
+
+    def tick(self, close: float) -> Dict[str, float]:
+        """
+        Evaluate the indicators for a forming candle without changing the state.
+
+        Args:
+            close: Current price of the forming candle
+
+        Returns:
+            Indicator values as they would be if the candle closed at `close`
+        """
+        return self._evaluate(close, commit=False)
+
+    def latest(self) -> Dict[str, float]:
+        """
+        Indicator values after the last committed candle.
+
+        Returns:
+            Dictionary with every name in INDICATOR_COLUMNS plus 'close' and
+            'prev_macd_histogram' (the histogram one candle earlier)
+        """
+        return dict(self._latest)
+
+    def signals(self, latest: Optional[Dict[str, float]] = None) -> Dict[str, str]:
+        """Trading signals for the last committed candle, or for values returned by tick()."""
+        return get_latest_signals(latest if latest is not None else self._latest)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Serialize the state into plain (JSON-compatible) values."""
+        return {
+            'prev_close': self.prev_close,
+            'count': self.count,
+            'last_timestamp': self.last_timestamp,
+            'latest': dict(self._latest),
+            'avg_gain': self.avg_gain.snapshot(),
+            'avg_loss': self.avg_loss.snapshot(),
+            'ema_fast': self.ema_fast.snapshot(),
+            'ema_slow': self.ema_slow.snapshot(),
+            'macd_signal': self.macd_signal.snapshot(),
+            'bb': self.bb.snapshot(),
+            'sma_50': self.sma_50.snapshot(),
+            'sma_200': self.sma_200.snapshot(),
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> "IndicatorState":
+        """Restore a state saved with snapshot()."""
+        state = cls()
+        state.prev_close = snapshot['prev_close']
+        state.count = snapshot['count']
+        state.last_timestamp = snapshot['last_timestamp']
+        state._latest = dict(snapshot['latest'])
+        for name in ('avg_gain', 'avg_loss', 'ema_fast', 'ema_slow', 'macd_signal', 'bb', 'sma_50', 'sma_200'):
+            getattr(state, name).restore(snapshot[name])
+        return state
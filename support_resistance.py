@@ -1,59 +1,265 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Sequence, Tuple
+
 import numpy as np
 import pandas as pd
-from scipy.signal import argrelextrema
-from typing import Tuple, List
+
+@dataclass
+class Level:
+    price: float  # Volume-weighted mean price of the touches
+    strength: float  # Sum of the touches' relative volumes (equals touches when volume is flat)
+    touches: int
+
+def find_pivots(highs: np.ndarray, lows: np.ndarray, window: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find pivot lows and highs in one linear pass.
+
+    A candle is a pivot low if its low is the lowest within `window` candles
+    on either side (windows are clipped at the ends), and a pivot high
+    likewise for highs. This is the same rule as
+    `argrelextrema(..., order=window)`, evaluated with scipy's sliding
+    min/max filters, which keep a monotonic deque of candidates and so run
+    in O(n) regardless of the window size.
+
+    Args:
+        highs: High prices, oldest first
+        lows: Low prices, oldest first
+        window: Candles on each side a pivot must dominate
+
+    Returns:
+        Tuple of (pivot_low_indices, pivot_high_indices)
+    """
+    from scipy.ndimage import maximum_filter1d, minimum_filter1d  # Deferred to keep bot startup fast
+
+    size = 2 * window + 1
+    lows = np.asarray(lows, dtype=float)
+    highs = np.asarray(highs, dtype=float)
+    if lows.size == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    low_pivots = np.flatnonzero(lows == minimum_filter1d(lows, size, mode='nearest'))
+    high_pivots = np.flatnonzero(highs == maximum_filter1d(highs, size, mode='nearest'))
+    return low_pivots, high_pivots
+
+def relative_volumes(volumes: Optional[np.ndarray], n: int) -> np.ndarray:
+    """Volumes divided by their mean, or ones if volume is missing or zero."""
+    if volumes is None:
+        return np.ones(n)
+    volumes = np.nan_to_num(np.asarray(volumes, dtype=float))
+    mean = volumes.mean() if volumes.size else 0.0
+    if mean <= 0:
+        return np.ones(n)
+    return volumes / mean
+
+def cluster_levels(prices: Sequence[float], weights: Sequence[float], threshold: float = 0.02) -> List[Level]:
+    """
+    Group pivot prices into levels.
+
+    Prices are visited in ascending order and a cluster only accepts prices
+    within `threshold` of its lowest member, so no cluster spans more than
+    `threshold` (unlike chaining each price to its neighbour, which lets a
+    cluster drift arbitrarily far). Each level is priced at the
+    weight-averaged mean of its touches.
+
+    Args:
+        prices: Pivot prices
+        weights: Weight per pivot (e.g. relative volume)
+        threshold: Maximum relative distance from a cluster's lowest price
+
+    Returns:
+        Levels sorted by price
+    """
+    if len(prices) == 0:
+        return []
+    order = np.argsort(prices, kind='stable')
+    prices = np.asarray(prices, dtype=float)[order]
+    weights = np.asarray(weights, dtype=float)[order]
+
+    # Start a new cluster wherever a price is too far above the current cluster's lowest price
+    starts = [0]
+    base = prices[0]
+    for i in range(1, len(prices)):
+        if base <= 0 or (prices[i] - base) / base > threshold:
+            starts.append(i)
+            base = prices[i]
+
+    starts = np.asarray(starts)
+    touches = np.diff(np.r_[starts, len(prices)])
+    weight_sums = np.add.reduceat(weights, starts)
+    price_sums = np.add.reduceat(prices * weights, starts)
+    plain_means = np.add.reduceat(prices, starts) / touches
+    with np.errstate(divide='ignore', invalid='ignore'):
+        centers = np.where(weight_sums > 0, price_sums / weight_sums, plain_means)
+
+    return [Level(float(price), float(strength), int(count))
+            for price, strength, count in zip(centers, weight_sums, touches)]
+
+def detect_levels(df: pd.DataFrame, window: int = 5, threshold: float = 0.02,
+                  pivots: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Tuple[List[Level], List[Level]]:
+    """
+    Detect weighted support and resistance levels without modifying `df`.
+
+    Args:
+        df: DataFrame with 'high' and 'low' (and optionally 'volume') columns, oldest first
+        window: Window size for pivot detection
+        threshold: Percentage threshold for clustering levels
+        pivots: Pivots from find_pivots to reuse instead of recomputing them
+
+    Returns:
+        Tuple of (support_levels, resistance_levels) as Level lists sorted by price
+    """
+    highs = df['high'].to_numpy(dtype=float)
+    lows = df['low'].to_numpy(dtype=float)
+    volumes = df['volume'].to_numpy(dtype=float) if 'volume' in df else None
+    weights = relative_volumes(volumes, len(df))
+
+    low_pivots, high_pivots = pivots if pivots is not None else find_pivots(highs, lows, window)
+    support = cluster_levels(lows[low_pivots], weights[low_pivots], threshold)
+    resistance = cluster_levels(highs[high_pivots], weights[high_pivots], threshold)
+    return support, resistance
 
 def detect_support_resistance(df: pd.DataFrame, window: int = 5, threshold: float = 0.02) -> Tuple[List[float], List[float]]:
     """
     Detect support and resistance levels using peak/trough clustering.
-    
+
     Args:
-        df: DataFrame with OHLC data
+        df: DataFrame with OHLC data (not modified)
         window: Window size for peak/trough detection
         threshold: Percentage threshold for clustering levels
-        
+
     Returns:
         Tuple of (support_levels, resistance_levels)
     """
-    # Find local maxima and minima
-    df['min'] = df.iloc[argrelextrema(df['low'].values, np.less_equal, order=window)[0]]['low']
-    df['max'] = df.iloc[argrelextrema(df['high'].values, np.greater_equal, order=window)[0]]['high']
-    
-    # Collect all levels
-    supports = df['min'].dropna().tolist()
-    resistances = df['max'].dropna().tolist()
-    
-    # Cluster levels that are within threshold% of each other
-    def cluster_levels(levels: List[float], threshold: float) -> List[float]:
-        if not levels:
-            return []
-            
-        levels = sorted(levels)
-        clusters = [[levels[0]]]
-        
-        for level in levels[1:]:
-            last_cluster = clusters[-1]
-            last_level = last_cluster[-1]
-            
-            # If within threshold% of the last level, add to the same cluster
-            if abs(level - last_level) / last_level <= threshold:
-                last_cluster.append(level)
-            else:
-                clusters.append([level])
-        
-        # Calculate the average of each cluster
-        return [sum(cluster) / len(cluster) for cluster in clusters]
-    
-    support_levels = cluster_levels(supports, threshold)
-    resistance_levels = cluster_levels(resistances, threshold)
-    
-    return support_levels, resistance_levels
-
-def plot_support_resistance(ax, support_levels: List[float], resistance_levels: List[float], 
+    support, resistance = detect_levels(df, window, threshold)
+    return [level.price for level in support], [level.price for level in resistance]
+
+class LevelTracker:
+    """
+    Support/resistance levels over the last `capacity` candles, updated one candle at a time.
+
+    Each candle costs amortized O(1): monotonic deques hold the candidates
+    for the sliding min of lows and max of highs over `2 * window + 1`
+    candles, and a candle is confirmed as a pivot once `window` newer
+    candles have arrived. The newest `window` candles are checked against
+    the (shorter) window that exists so far when levels are requested, like
+    the batch detector does at the end of a frame. Clustering only runs on
+    the pivots, which are few.
+    """
+
+    def __init__(self, window: int = 5, threshold: float = 0.02, capacity: int = 100):
+        self.window = window
+        self.threshold = threshold
+        self.capacity = capacity
+        self.count = 0  # Candles seen so far; also the index of the next candle
+        self.last_timestamp: Optional[int] = None
+        self._highs: Deque[float] = deque(maxlen=capacity)
+        self._lows: Deque[float] = deque(maxlen=capacity)
+        self._volumes: Deque[float] = deque(maxlen=capacity)
+        self._min_candidates: Deque[Tuple[int, float]] = deque()  # Increasing lows
+        self._max_candidates: Deque[Tuple[int, float]] = deque()  # Decreasing highs
+        self._low_pivots: Deque[int] = deque()
+        self._high_pivots: Deque[int] = deque()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, window: int = 5, threshold: float = 0.02,
+                   capacity: int = 100) -> "LevelTracker":
+        """Build a tracker from an OHLCV frame, oldest first."""
+        tracker = cls(window, threshold, capacity)
+        tracker.update_frame(df)
+        return tracker
+
+    def _value(self, index: int, values: Deque[float]) -> float:
+        return values[index - (self.count - len(values))]
+
+    def update(self, high: float, low: float, volume: float = 1.0, timestamp: Optional[int] = None):
+        """
+        Add one closed candle.
+
+        Args:
+            high: Candle high
+            low: Candle low
+            volume: Candle volume
+            timestamp: Candle open time in epoch seconds (optional, tracked as last_timestamp)
+        """
+        i = self.count
+        self._highs.append(float(high))
+        self._lows.append(float(low))
+        self._volumes.append(float(volume))
+        self.count += 1
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+
+        # Keep candidates that could still be the window min/max; ties keep the older candle
+        while self._min_candidates and self._min_candidates[-1][1] > low:
+            self._min_candidates.pop()
+        self._min_candidates.append((i, low))
+        while self._max_candidates and self._max_candidates[-1][1] < high:
+            self._max_candidates.pop()
+        self._max_candidates.append((i, high))
+
+        # Window [center - window, center + window] is now complete
+        center = i - self.window
+        oldest = center - self.window
+        for candidates in (self._min_candidates, self._max_candidates):
+            while candidates[0][0] < oldest:
+                candidates.popleft()
+        if center >= 0:
+            if self._value(center, self._lows) == self._min_candidates[0][1]:
+                self._low_pivots.append(center)
+            if self._value(center, self._highs) == self._max_candidates[0][1]:
+                self._high_pivots.append(center)
+
+        # Forget pivots that fell out of the retained history
+        first = self.count - len(self._lows)
+        for pivots in (self._low_pivots, self._high_pivots):
+            while pivots and pivots[0] < first:
+                pivots.popleft()
+
+    def update_frame(self, df: pd.DataFrame):
+        """Add the candles of `df` newer than the last one seen (all of them if timestamps are unknown)."""
+        if df.empty:
+            return
+        timestamps = df.index.values.astype('datetime64[s]').astype(np.int64)
+        new = timestamps > self.last_timestamp if self.last_timestamp is not None else np.ones(len(df), bool)
+        volumes = df['volume'].to_numpy(dtype=float) if 'volume' in df else np.ones(len(df))
+        for ts, high, low, volume in zip(timestamps[new], df['high'].to_numpy(dtype=float)[new],
+                                         df['low'].to_numpy(dtype=float)[new], volumes[new]):
+            self.update(high, low, volume, timestamp=int(ts))
+
+    def _tail_pivots(self, values: np.ndarray, is_low: bool) -> List[int]:
+        """Pivots among the newest `window` candles, whose right-hand window is still incomplete."""
+        pivots = []
+        n = len(values)
+        for i in range(max(n - self.window, 0), n):
+            segment = values[max(i - self.window, 0):]
+            extreme = segment.min() if is_low else segment.max()
+            if values[i] == extreme:
+                pivots.append(i)
+        return pivots
+
+    def levels(self) -> Tuple[List[Level], List[Level]]:
+        """
+        Current support and resistance levels.
+
+        Returns:
+            Tuple of (support_levels, resistance_levels) as Level lists sorted by price
+        """
+        highs = np.asarray(self._highs)
+        lows = np.asarray(self._lows)
+        weights = relative_volumes(np.asarray(self._volumes), len(lows))
+        first = self.count - len(lows)
+
+        low_idx = [i - first for i in self._low_pivots] + self._tail_pivots(lows, True)
+        high_idx = [i - first for i in self._high_pivots] + self._tail_pivots(highs, False)
+        support = cluster_levels(lows[low_idx], weights[low_idx], self.threshold)
+        resistance = cluster_levels(highs[high_idx], weights[high_idx], self.threshold)
+        return support, resistance
+
+def plot_support_resistance(ax, support_levels: List[float], resistance_levels: List[float],
                            min_x: pd.Timestamp, max_x: pd.Timestamp):
     """
     Plot support and resistance levels on the given axis.
-    
+
     Args:
         ax: Matplotlib axis to plot on
         support_levels: List of support price levels
@@ -64,7 +270,7 @@ def plot_support_resistance(ax, support_levels: List[float], resistance_levels:
     # Plot support levels
     for level in support_levels:
         ax.plot([min_x, max_x], [level, level], '--', color='green', linewidth=1, alpha=0.7)
-    
+
     # Plot resistance levels
     for level in resistance_levels:
-        ax.plot([min_x, max_x], [level, level], '--', color='red', linewidth=1, alpha=0.7)
\ No newline at end of file
+        ax.plot([min_x, max_x], [level, level], '--', color='red', linewidth=1, alpha=0.7)
@@ -0,0 +1,139 @@
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from config import ENDPOINT_SECONDS
+
+def candle_seconds(endpoint: str, aggregate: int = 1) -> int:
+    """
+    Get the length of one candle in seconds.
+
+    Args:
+        endpoint: OHLCV endpoint (minute, hour, day)
+        aggregate: Number of units per candle
+
+    Returns:
+        Candle length in seconds
+    """
+    return ENDPOINT_SECONDS[endpoint] * aggregate
+
+def can_derive(endpoint: str, aggregate: int) -> bool:
+    """
+    Whether candles of this length can be built from the endpoint's base candles.
+
+    Only periods that divide a day qualify: their epoch-aligned buckets start
+    at UTC midnight and every `period` after it (00:00, 04:00, ... for 4h),
+    like hourly aggregates everywhere. Multi-day buckets aligned to the epoch
+    would start on arbitrary weekdays (1970-01-01 was a Thursday), so 3d and
+    1w candles are always requested from the API.
+
+    Args:
+        endpoint: OHLCV endpoint (minute, hour, day)
+        aggregate: Number of units per candle
+
+    Returns:
+        True if resample_ohlcv produces the same buckets as the API
+    """
+    period = candle_seconds(endpoint, aggregate)
+    return aggregate > 1 and ENDPOINT_SECONDS["day"] % period == 0
+
+def resample_ohlcv(df: pd.DataFrame, period: int) -> pd.DataFrame:
+    """
+    Aggregate base-resolution candles into longer candles.
+
+    Buckets start at multiples of `period` seconds since the Unix epoch,
+    which for periods that divide a day means UTC-day-aligned buckets (see
+    can_derive). Base candles missing from the input (no trades) are simply
+    absent from their bucket, as they are upstream.
+
+    Args:
+        df: DataFrame with OHLCV data indexed by timestamp, oldest first
+        period: Target candle length in seconds
+
+    Returns:
+        DataFrame with one row per non-empty bucket, indexed by bucket start
+    """
+    if df.empty:
+        return df
+
+    ts = df.index.values.astype('datetime64[s]').astype(np.int64)
+    buckets = ts - ts % period
+
+    # Input is sorted, so each bucket is a contiguous run starting where the bucket value changes
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+
+    result = pd.DataFrame({
+        'open': df['open'].values[starts],
+        'high': np.maximum.reduceat(df['high'].values, starts),
+        'low': np.minimum.reduceat(df['low'].values, starts),
+        'close': df['close'].values[ends],
+        'volume': np.add.reduceat(df['volume'].values, starts),
+    }, index=pd.to_datetime(buckets[starts], unit='s'))
+    result.index.name = 'timestamp'
+    return result
+
+def merge_ohlcv(frames: Sequence[pd.DataFrame], weights: Sequence[float],
+                volume_weighted: bool = False) -> pd.DataFrame:
+    """
+    Merge several pools' candles for one token into a composite series.
+
+    Timestamps are aligned on the union of all frames. A pool without a
+    candle at some timestamp (no trades) keeps its last close, as a flat
+    candle with zero volume; before its first candle it is left out.
+    Prices are weighted averages over the pools present at each timestamp,
+    with the same weights for open, high, low and close so every composite
+    candle stays consistent (low <= open, close <= high). Volume is the sum
+    over all pools.
+
+    Args:
+        frames: DataFrames with OHLCV data indexed by timestamp, oldest first
+        weights: Static weight per frame, e.g. pool liquidity in USD
+        volume_weighted: Weight each timestamp by the pools' volume in that
+            candle instead, falling back to `weights` where no pool traded
+
+    Returns:
+        Composite DataFrame indexed by timestamp, oldest first
+    """
+    stamps = [frame.index.values.astype('datetime64[s]').astype(np.int64) for frame in frames]
+    ts = np.unique(np.concatenate(stamps))
+    n, t = len(frames), len(ts)
+
+    # (field, pool, time) grids; each frame is scattered into its rows with one searchsorted
+    prices = np.full((4, n, t), np.nan)
+    volume = np.zeros((n, t))
+    for i, (frame, frame_ts) in enumerate(zip(frames, stamps)):
+        positions = np.searchsorted(ts, frame_ts)
+        for field, column in enumerate(('open', 'high', 'low', 'close')):
+            prices[field, i, positions] = frame[column].to_numpy(dtype=float)
+        volume[i, positions] = frame['volume'].to_numpy(dtype=float)
+
+    # Forward-fill each pool's close into the gaps between its candles
+    close = prices[3]
+    last = np.where(np.isnan(close), 0, np.arange(t))
+    np.maximum.accumulate(last, axis=1, out=last)
+    carried = np.take_along_axis(close, last, axis=1)
+    prices = np.where(np.isnan(prices[0]), carried, prices)
+    present = ~np.isnan(prices[3])
+
+    static = np.asarray(weights, dtype=float)
+    if not (static > 0).any():
+        static = np.ones(n)
+    w = np.where(present, static[:, None], 0.0)
+    if volume_weighted:
+        traded = np.where(present, volume, 0.0)
+        w = np.where(traded.sum(axis=0) > 0, traded, w)
+
+    total = w.sum(axis=0)
+    merged = (np.where(present, prices, 0.0) * w).sum(axis=1) / np.where(total > 0, total, np.nan)
+
+    valid = ~np.isnan(merged[3])
+    index = pd.DatetimeIndex(ts[valid].astype('datetime64[s]').astype(frames[0].index.dtype), name='timestamp')
+    return pd.DataFrame({
+        'open': merged[0, valid],
+        'high': merged[1, valid],
+        'low': merged[2, valid],
+        'close': merged[3, valid],
+        'volume': volume.sum(axis=0)[valid],
+    }, index=index)
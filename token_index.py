@@ -0,0 +1,247 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import TOKEN_INDEX_SETTINGS
+from http_client import get_client
+from metrics import registry
+
+SOLANA_MAINNET_CHAIN_ID = 101
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tokens (
+    address TEXT PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    name TEXT NOT NULL,
+    decimals INTEGER
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# (address, symbol, name, decimals)
+TokenRow = Tuple[str, str, str, Optional[int]]
+
+def parse_token_list(payload: Any) -> List[TokenRow]:
+    """
+    Extract Solana mainnet tokens from a token list.
+
+    Accepts the solana-labs format ({"tokens": [...]} with a chainId per
+    token) as well as a bare list of tokens (e.g. Jupiter's), and skips
+    entries without an address or symbol.
+
+    Args:
+        payload: Decoded token list JSON
+
+    Returns:
+        List of (address, symbol, name, decimals) rows
+    """
+    tokens = payload.get("tokens", []) if isinstance(payload, dict) else payload
+    rows = []
+    for token in tokens or []:
+        if not isinstance(token, dict):
+            continue
+        if token.get("chainId", SOLANA_MAINNET_CHAIN_ID) != SOLANA_MAINNET_CHAIN_ID:
+            continue
+        address, symbol = token.get("address"), token.get("symbol")
+        if not address or not symbol:
+            continue
+        decimals = token.get("decimals")
+        rows.append((address, symbol, token.get("name") or symbol,
+                     decimals if isinstance(decimals, int) else None))
+    return rows
+
+class TokenIndex:
+    """
+    Local index of token symbols, names and decimals by address.
+
+    The token list is loaded from a local file or downloaded (revalidated
+    with its ETag) into an embedded SQLite file, keyed by address and
+    memory-mapped, so a lookup is a single B-tree probe without any API
+    request. Lookups use their own connection and keep working while a
+    refresh rewrites the table in the background (WAL mode), and every
+    process sharing the file sees the refreshed list.
+    """
+
+    def __init__(self, path: str = TOKEN_INDEX_SETTINGS["path"],
+                 source: str = TOKEN_INDEX_SETTINGS["source"],
+                 refresh_interval: float = TOKEN_INDEX_SETTINGS["refresh_interval"]):
+        self.path = path
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self._reader: Optional[sqlite3.Connection] = None
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _open(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={TOKEN_INDEX_SETTINGS['mmap_bytes']}")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def lookup(self, token_address: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a token in the index.
+
+        Fast enough (a few microseconds) to call from the event loop.
+
+        Args:
+            token_address: Token address
+
+        Returns:
+            Dictionary with address, symbol, name and decimals, or None if the token is not listed
+        """
+        try:
+            if self._reader is None:
+                self._reader = self._open()
+            row = self._reader.execute(
+                "SELECT symbol, name, decimals FROM tokens WHERE address = ?", (token_address,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"Token index lookup failed: {e}")
+            return None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {"address": token_address, "symbol": row[0], "name": row[1], "decimals": row[2]}
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._writer.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def replace(self, rows: Iterable[TokenRow], etag: Optional[str] = None):
+        """
+        Replace the indexed tokens in one transaction.
+
+        Args:
+            rows: (address, symbol, name, decimals) rows
+            etag: ETag of the downloaded list, used to revalidate the next refresh
+        """
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._open()
+            with self._writer:
+                self._writer.execute("DELETE FROM tokens")
+                self._writer.executemany("INSERT OR REPLACE INTO tokens VALUES (?, ?, ?, ?)", rows)
+                self._writer.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                    ("source", self.source), ("refreshed_at", str(time.time())), ("etag", etag or ""),
+                ])
+
+    def touch(self):
+        """Mark the index as fresh without changing its tokens (the list was not modified)."""
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._open()
+            with self._writer:
+                self._writer.execute("INSERT OR REPLACE INTO meta VALUES ('refreshed_at', ?)", (str(time.time()),))
+
+    def state(self) -> Tuple[float, Optional[str], Optional[str]]:
+        """Time of the last refresh, its source and the list's ETag (0.0 and None if never refreshed)."""
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._open()
+            refreshed_at = self._meta("refreshed_at")
+            return float(refreshed_at or 0.0), self._meta("source"), self._meta("etag") or None
+
+    @property
+    def size(self) -> int:
+        try:
+            if self._reader is None:
+                self._reader = self._open()
+            return self._reader.execute("SELECT COUNT(*) FROM tokens").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    async def refresh(self, force: bool = False) -> bool:
+        """
+        Reload the token list if the index is older than `refresh_interval` or came from another source.
+
+        Args:
+            force: Reload even if the index is fresh
+
+        Returns:
+            True if the index is up to date afterwards
+        """
+        refreshed_at, source, etag = await asyncio.to_thread(self.state)
+        same_source = source == self.source
+        if not force and same_source and time.time() - refreshed_at < self.refresh_interval:
+            return True
+
+        started = time.perf_counter()
+        try:
+            if self.source.startswith(("http://", "https://")):
+                headers = {"If-None-Match": etag} if etag and same_source else {}
+                response = await get_client().get(self.source, headers=headers,
+                                                  timeout=TOKEN_INDEX_SETTINGS["download_timeout"])
+                if response.status_code == 304:
+                    await asyncio.to_thread(self.touch)
+                    logging.info("Token list not modified since the last refresh")
+                    return True
+                response.raise_for_status()
+                content, etag = response.content, response.headers.get("ETag")
+            else:
+                content, etag = await asyncio.to_thread(_read_file, self.source), None
+
+            rows = await asyncio.to_thread(lambda: parse_token_list(json.loads(content)))
+            if not rows:
+                logging.warning(f"Token list from {self.source} has no Solana tokens, keeping the current index")
+                return False
+            await asyncio.to_thread(self.replace, rows, etag)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Token list refresh from {self.source} failed: {e}")
+            return False
+
+        logging.info(f"Indexed {len(rows)} tokens from {self.source} in {time.perf_counter() - started:.2f}s")
+        return True
+
+    async def _run(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        """Refresh the index in the background now (if stale) and every `refresh_interval` seconds."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="token-index")
+
+    async def close(self):
+        """Stop refreshing and close the database connections."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        with self._write_lock:
+            for conn in (self._reader, self._writer):
+                if conn is not None:
+                    conn.close()
+            self._reader = self._writer = None
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+token_index = TokenIndex()
+
+registry.callback("token_index_entries", "Tokens in the local metadata index", lambda: token_index.size)
+registry.callback("token_index_lookups_total", "Token metadata lookups in the local index by result",
+                  lambda: {("hit",): token_index.hits, ("miss",): token_index.misses},
+                  kind="counter", labelnames=("result",))
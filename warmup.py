@@ -0,0 +1,66 @@
+import asyncio
+import importlib
+import logging
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from render_pool import start_render_pool
+
+# Modules the bot process defers until first use, in the order they are needed
+DEFERRED_MODULES = ("scipy.signal", "scipy.ndimage")
+
+_task: Optional[asyncio.Task] = None
+
+def _warm_compute():
+    """
+    Import the deferred compute modules and run the indicator and level code once.
+
+    Runs in a thread; a handler that needs one of these modules meanwhile
+    simply waits for the import to finish.
+    """
+    for name in DEFERRED_MODULES:
+        importlib.import_module(name)
+
+    from indicators import add_indicators
+    from support_resistance import detect_support_resistance
+
+    prices = 1.0 + 0.01 * np.sin(np.arange(250) / 5.0)
+    df = pd.DataFrame({
+        "open": prices, "high": prices * 1.01, "low": prices * 0.99, "close": prices, "volume": 1.0,
+    }, index=pd.date_range("2024-01-01", periods=len(prices), freq="h"))
+    detect_support_resistance(add_indicators(df))
+
+async def _prewarm():
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(start_render_pool(), asyncio.to_thread(_warm_compute))
+        logging.info(f"Prewarm finished in {time.perf_counter() - started:.2f}s")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        # Everything is loaded on first use anyway
+        logging.warning(f"Prewarm failed: {e}")
+
+def start_prewarm():
+    """
+    Start the render workers and load the deferred modules in the background.
+
+    Returns immediately, so the bot starts taking updates while the warm-up
+    runs. Calling it again while a warm-up is running does nothing.
+    """
+    global _task
+
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_prewarm(), name="prewarm")
+
+async def stop_prewarm():
+    """Cancel a warm-up that is still running."""
+    global _task
+
+    if _task is not None:
+        task, _task = _task, None
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import signal
+from typing import Callable
+
+from telegram import Update
+from telegram.ext import Application
+
+from config import WEBHOOK_SETTINGS
+from http_server import HttpServer, Request, Response
+
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+
+def webhook_handler(application: Application, secret_token: str = None):
+    """
+    Build the HTTP handler that feeds webhook updates into the application.
+
+    Updates are acknowledged as soon as they are queued; the application
+    processes them concurrently (up to its `concurrent_updates` limit), so a
+    slow chart never delays Telegram's next delivery.
+    """
+    async def handle(request: Request) -> Response:
+        if secret_token and request.headers.get(SECRET_HEADER) != secret_token:
+            return Response(403, b"Forbidden")
+        try:
+            update = Update.de_json(json.loads(request.body), application.bot)
+        except (ValueError, TypeError, KeyError) as e:
+            logging.warning(f"Ignoring malformed webhook update: {e}")
+            return Response(400, b"Bad Request")
+        await application.update_queue.put(update)
+        return Response(200)
+
+    return handle
+
+async def serve_webhook(application: Application, worker: int = 0):
+    """
+    Run the application on the embedded HTTP server until SIGINT or SIGTERM.
+
+    Mirrors the lifecycle of Application.run_polling: initialize, post_init,
+    start, then stop, post_stop, shutdown and post_shutdown on the way out.
+
+    Args:
+        application: Configured application (not yet initialized)
+        worker: Index of this worker process; only worker 0 registers the webhook
+    """
+    settings = WEBHOOK_SETTINGS
+    server = HttpServer(settings["host"], settings["port"], reuse_port=settings["workers"] > 1)
+    server.route("POST", settings["path"], webhook_handler(application, settings["secret_token"]))
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await application.initialize()
+    try:
+        if application.post_init:
+            await application.post_init(application)
+        await application.start()
+        await server.start()
+
+        if worker == 0 and settings["register"]:
+            if not settings["url"]:
+                raise ValueError("WEBHOOK_URL must be set to register the webhook")
+            await application.bot.set_webhook(
+                url=settings["url"],
+                secret_token=settings["secret_token"],
+                max_connections=settings["max_connections"],
+                allowed_updates=Update.ALL_TYPES,
+                drop_pending_updates=settings["drop_pending_updates"]
+            )
+            logging.info(f"Registered webhook {settings['url']}")
+
+        logging.info(f"Worker {worker} serving webhook updates on {settings['host']}:{server.port}{settings['path']}")
+        await stop.wait()
+    finally:
+        logging.info(f"Worker {worker} shutting down")
+        # Stop taking deliveries first, then let queued updates finish
+        await server.close()
+        if application.running:
+            await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+
+def _run_worker(build_application: Callable[[int], Application], worker: int):
+    asyncio.run(serve_webhook(build_application(worker), worker))
+
+def run_webhook(build_application: Callable[[int], Application]):
+    """
+    Serve webhook updates with WEBHOOK_SETTINGS["workers"] processes.
+
+    A single worker runs in this process. With more, each worker process
+    builds its own application and accepts connections on the shared port
+    (SO_REUSEPORT, so the kernel balances connections between them); this
+    process only forwards SIGINT/SIGTERM and waits for them to exit.
+
+    Args:
+        build_application: Builds the application for a worker index
+    """
+    workers = WEBHOOK_SETTINGS["workers"]
+    if workers <= 1:
+        _run_worker(build_application, 0)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_run_worker, args=(build_application, worker), name=f"webhook-worker-{worker}")
+        for worker in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    logging.info(f"Started {workers} webhook workers")
+
+    def forward(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGINT, forward)
+    signal.signal(signal.SIGTERM, forward)
+    for process in processes:
+        process.join()